@@ -1,181 +1,125 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import os
 import plotly.graph_objects as go
 
-# --- CONFIGURAÇÃO GERAL ---
-st.set_page_config(
-    page_title="Dashboard Consolidado - KPIs",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# --- LOGO E TÍTULO ---
-st.image("logo.png", width=200)
-st.markdown("## Indicadores Consolidados")
-
-st.sidebar.markdown("### Relatório de Indicadores")
-st.sidebar.markdown("Atualizado semanalmente com base no histórico.")
-
-# --- CAMINHO DO ARQUIVO ---
-ARQUIVO = "historico_recap.xlsx"
-
-# --- FUNÇÃO DE EXTRAÇÃO SEGURA ---
-def extrair_kpi(aba, campo_valor, campo_meta):
-    df = pd.read_excel(ARQUIVO, sheet_name=aba)
-    df.columns = df.columns.str.strip().str.upper()
-    df = df.dropna(subset=[campo_valor, campo_meta])
-    ultimo = df.iloc[-1]
-    valor = float(ultimo[campo_valor])
-    meta = float(ultimo[campo_meta])
-    return valor, meta
-
-# --- GRUPOS DE INDICADORES ---
-grupos = {
-    "Indicadores Contratuais": [
-        {
-            "nome": "Realização Semanal", "aba": "REALIZACAO SEMANAL",
-            "campo_valor": "REALIZAÇÃO  SEMANAL", "campo_meta": "META",
-            "tipo": "maior", "unidade": "%"
-        },
-        {
-            "nome": "Tempo de Planejamento", "aba": "TEMPO DE PLANEJAMENTO",
-            "campo_valor": "TEMPO DE PLANEJAMENTO", "campo_meta": "META",
-            "tipo": "menor", "unidade": " dias"
-        },
-        {
-            "nome": "Disp. Equipamentos", "aba": "DISP.EQUIPAMENTOS",
-            "campo_valor": "DISPONIBILIDADE", "campo_meta": "META",
-            "tipo": "maior", "unidade": "%"
-        },
-    ],
-    "Indicadores Cliente": [
-        {
-            "nome": "IARI", "aba": "IARI", "campo_valor": "% INDICADOR ATUAL",
-            "campo_meta": "META", "tipo": "maior", "unidade": "%"
-        },
-        {
-            "nome": "IAZF", "aba": "IAZF", "campo_valor": "IMPACTO PREVISTO",
-            "campo_meta": "META", "tipo": "maior", "unidade": "%"
-        },
-        {
-            "nome": "PFCEO", "aba": "PFCEO", "campo_valor": "EQUIPAMENTOS NO PAINEL",
-            "campo_meta": "META", "tipo": "menor", "unidade": ""
-        },
-        {
-            "nome": "Vazamentos Totais", "aba": "VAZAMENTOS GERAL",
-            "campo_valor": "VAZAMENTOS TOTAIS", "campo_meta": "META",
-            "tipo": "menor", "unidade": ""
-        },
-        {
-            "nome": "Vazamentos Vapor/Condens", "aba": "VAZAMENTOS VC",
-            "campo_valor": "VAZAMENTOS VP", "campo_meta": "META",
-            "tipo": "menor", "unidade": ""
-        },
-        {
-            "nome": "Disp. Purgadores", "aba": "DISP.PURGADORES",
-            "campo_valor": "IDP", "campo_meta": "META",
-            "tipo": "maior", "unidade": "%"
-        }
-    ]
-}
-
-# --- GERAR DASHBOARD POR GRUPO ---
-for titulo, indicadores in grupos.items():
-    st.markdown(f"###  {titulo}")
-    colunas = st.columns(3)
-
-    for i, ind in enumerate(indicadores):
-        with colunas[i % 3]:
-            valor, meta = extrair_kpi(ind["aba"], ind["campo_valor"], ind["campo_meta"])
-            tipo = ind["tipo"]
-            unidade = ind.get("unidade", "")
-
-            if unidade == "%" and valor > 1.5:
-                valor = valor / 100
-            if unidade == "%" and meta > 1.5:
-                meta = meta / 100
-
-            status_ok = valor >= meta if tipo == "maior" else valor <= meta
-            cor = "#1f77b4" if status_ok else "red"
-            emoji = "✅" if status_ok else "⚠️"
-            status = "Dentro da meta" if status_ok else "Fora da meta"
-
-            valor_formatado = f"{valor * 100:.2f}%" if unidade == "%" else f"{valor:.2f}{unidade}"
-            meta_formatada = f"{meta * 100:.2f}%" if unidade == "%" else f"{meta:.2f}{unidade}"
-
-            espaco_extra = ""
-            if titulo == "Indicadores Cliente" and i in [3, 4, 5]:
-                espaco_extra = "<div style='margin-top: 24px;'></div>"
-
-            st.markdown(f"""{espaco_extra}<p style='font-size:18px; font-weight:bold'>{ind['nome']}</p>""", unsafe_allow_html=True)
-            st.markdown(f"""
-            <div style="background-color:#f5f5f5;padding:10px;border-radius:10px;text-align:center">
-                <h1 style="color:{cor};font-size:32px;margin:4px 0">{valor_formatado}</h1>
-                <p style="color:{cor};font-size:15px;margin:0">{emoji} {status}</p>
-                <p style="color:#333;font-size:12px;margin:0">Meta: {meta_formatada}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-    if titulo == "Indicadores Contratuais":
-        st.markdown("<hr style='border: 1px solid #ccc;'>", unsafe_allow_html=True)
-
-# --- KPI CIRCULAR DE ANDAIMES ---
-df_andaimes = pd.read_excel(ARQUIVO, sheet_name="CONTROLE DE ANDAIMES")
-df_andaimes.columns = df_andaimes.columns.str.strip().str.upper()
-df_andaimes = df_andaimes.sort_values("SEMANA")
-linha_atual = df_andaimes.iloc[-1]
-
-inventario = linha_atual["IVENTARIO (LINEAR)"]
-campo = linha_atual["EM CAMPO (LINEAR)"]
-gaveteiro = linha_atual["SALDO GAVETEIRO LINEAR"]
-minimo = linha_atual["MÍNIMO"]
-
-st.markdown("<hr style='border: 1px solid #ccc;'>", unsafe_allow_html=True)
-
-st.markdown("### Controle de Andaimes")
-
-col1, col2 = st.columns([1, 1])
-with col1:
-    fig = go.Figure(go.Pie(
-        values=[campo, gaveteiro],
-        labels=["Em Campo", "Gaveteiro"],
-        hole=0.6,
-        marker_colors=["#1f77b4", "#6baed6"],
-        textinfo="none"
-    ))
-
-    fig.update_layout(
-        annotations=[
-            dict(text=f"{inventario:.0f} m", x=0.5, y=0.5, font_size=18, showarrow=False)
-        ],
-        showlegend=True,
-        legend=dict(orientation="h", y=-0.25),
-        height=270,
-        margin=dict(t=0, b=0, l=0, r=0),
-        paper_bgcolor="#f5f5f5"
+from recap.ativos import LARGURA_LOGO, LOGO, exibir
+from recap.cartoes import cartao_consolidado, consolidado, status_gaveteiro
+from recap.dados import derivado, estatisticas, indice_kpi
+from recap.indicadores import GRUPO_CONTRATUAIS, grupos
+from recap.metricas import execucao, painel_desenvolvedor
+from recap.telemetria import painel_memoria, painel_versao
+from recap.unidades import historico_consolidado, seletor_unidade
+
+with execucao("DASHBOARD"):
+    # --- CONFIGURAÇÃO GERAL ---
+    st.set_page_config(
+        page_title="Dashboard Consolidado - KPIs",
+        layout="wide",
+        initial_sidebar_state="expanded"
     )
 
-    st.markdown("<p style='font-size:14px; font-weight:bold'>Inventário Andaimes</p>", unsafe_allow_html=True)
-    st.plotly_chart(fig, use_container_width=True)
-
-with col2:
-    valor = gaveteiro
-    meta = minimo
-    status_ok = valor >= meta
-    cor = "#1f77b4" if status_ok else "red"
-    emoji = "✅" if status_ok else "⚠️"
-    status = "Dentro da meta" if status_ok else "Fora da meta"
-    valor_formatado = f"{valor:.0f} m"
-    meta_formatada = f"{meta:.0f} m"
-
-    st.markdown("<p style='font-size:14px; font-weight:bold'>Saldo Gaveteiro</p>", unsafe_allow_html=True)
-    st.markdown(f"""
-    <div style="background-color:#f5f5f5;padding:10px;border-radius:10px;text-align:center">
-        <h1 style="color:{cor};font-size:32px;margin:4px 0">{valor_formatado}</h1>
-        <p style="color:{cor};font-size:15px;margin:0">{emoji} {status}</p>
-        <p style="color:#333;font-size:11px;margin:0">Meta: {meta_formatada}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    # --- LOGO E TÍTULO ---
+    exibir(LOGO, LARGURA_LOGO)
+    st.markdown("## Indicadores Consolidados")
+
+    st.sidebar.markdown("### Relatório de Indicadores")
+    st.sidebar.markdown("Atualizado semanalmente com base no histórico.")
+    unidade, caminho, comparar, planilhas = seletor_unidade()
+
+    # --- ÍNDICE DE KPIS E STATUS DE TODOS OS CARTÕES ---
+    indice = indice_kpi(caminho)
+    painel_versao(caminho)
+    cartoes = consolidado(indice, derivado("grupos", grupos, caminho))
+
+    # --- CARTÕES DE CADA UNIDADE, POR INDICADOR (MODO COMPARAÇÃO) ---
+    por_unidade = {}
+    if comparar:
+        for nome, planilha in planilhas.items():
+            grupos_unidade = consolidado(indice_kpi(planilha), derivado("grupos", grupos, planilha))
+            por_unidade[nome] = {ind["aba"]: cartao for lista in grupos_unidade.values() for ind, cartao in lista}
+        st.sidebar.download_button(
+            "Histórico consolidado (CSV)",
+            lambda: historico_consolidado(planilhas).to_csv(index=False).encode("utf-8"),
+            file_name="historico_consolidado.csv",
+            mime="text/csv",
+        )
+
+    # --- GERAR DASHBOARD POR GRUPO ---
+    for titulo, indicadores in cartoes.items():
+        st.markdown(f"###  {titulo}")
+
+        if comparar:
+            for ind, _ in indicadores:
+                st.markdown(f"<p style='font-size:18px; font-weight:bold'>{ind['nome']}</p>", unsafe_allow_html=True)
+                for coluna, (nome, cartoes_unidade) in zip(st.columns(len(por_unidade)), por_unidade.items()):
+                    with coluna:
+                        st.caption(nome)
+                        if ind["aba"] in cartoes_unidade:
+                            st.markdown(cartao_consolidado(**cartoes_unidade[ind["aba"]]), unsafe_allow_html=True)
+                        else:
+                            st.caption("Indicador ausente nesta unidade.")
+        else:
+            colunas = st.columns(3)
+
+            for i, (ind, cartao) in enumerate(indicadores):
+                with colunas[i % 3]:
+                    espaco_extra = ""
+                    if i >= 3:
+                        espaco_extra = "<div style='margin-top: 24px;'></div>"
+
+                    st.markdown(f"""{espaco_extra}<p style='font-size:18px; font-weight:bold'>{ind['nome']}</p>""", unsafe_allow_html=True)
+                    st.markdown(cartao_consolidado(**cartao), unsafe_allow_html=True)
+
+        if titulo == GRUPO_CONTRATUAIS:
+            st.markdown("<hr style='border: 1px solid #ccc;'>", unsafe_allow_html=True)
+
+    # --- KPI CIRCULAR DE ANDAIMES ---
+    andaimes = indice["andaimes"]
+
+    inventario = andaimes["inventario"]
+    campo = andaimes["em_campo"]
+    gaveteiro = andaimes["gaveteiro"]
+    minimo = andaimes["minimo"]
+
+    st.markdown("<hr style='border: 1px solid #ccc;'>", unsafe_allow_html=True)
+
+    st.markdown("### Controle de Andaimes" + (f" · {unidade}" if comparar else ""))
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        fig = go.Figure(go.Pie(
+            values=[campo, gaveteiro],
+            labels=["Em Campo", "Gaveteiro"],
+            hole=0.6,
+            marker_colors=["#1f77b4", "#6baed6"],
+            textinfo="none"
+        ))
+
+        fig.update_layout(
+            annotations=[
+                dict(text=f"{inventario:.0f} m", x=0.5, y=0.5, font_size=18, showarrow=False)
+            ],
+            showlegend=True,
+            legend=dict(orientation="h", y=-0.25),
+            height=270,
+            margin=dict(t=0, b=0, l=0, r=0),
+            paper_bgcolor="#f5f5f5"
+        )
+
+        st.markdown("<p style='font-size:14px; font-weight:bold'>Inventário Andaimes</p>", unsafe_allow_html=True)
+        st.plotly_chart(fig, width="stretch")
+
+    with col2:
+        st.markdown("<p style='font-size:14px; font-weight:bold'>Saldo Gaveteiro</p>", unsafe_allow_html=True)
+        st.markdown(cartao_consolidado(**status_gaveteiro(andaimes), tamanho_meta=11), unsafe_allow_html=True)
+
+    # --- CACHE DA PLANILHA ---
+    cache = estatisticas()
+    st.sidebar.caption(
+        f"Cache da planilha: {cache['acertos']} acertos / {cache['falhas']} recargas · "
+        f"abas lidas do xlsx: {cache['abas_xlsx']}, do snapshot: {cache['abas_snapshot']}, "
+        f"reaproveitadas: {cache['abas_reaproveitadas']}"
+    )
+
+    # --- TELEMETRIA DE MEMÓRIA ---
+    painel_memoria()
+    painel_desenvolvedor()
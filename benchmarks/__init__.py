@@ -0,0 +1 @@
+"""Benchmarks dos dashboards sobre planilhas sintéticas (ver `medir`)."""
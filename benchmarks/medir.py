@@ -0,0 +1,246 @@
+"""Mede o custo de cada etapa dos dashboards conforme a planilha cresce.
+
+    python -m benchmarks.medir [--anos 1 5 10] [--copias 1 6] [--app] [--salvar]
+
+Para cada cenário (anos de histórico x cópias de cada indicador) gera uma
+planilha sintética (ver `benchmarks.planilha`, guardadas em
+benchmarks/.planilhas/) e mede, pela mediana de algumas repetições:
+
+- leitura: hash das abas, leitura do xlsx (pd.read_excel e o leitor em
+  fluxo de `recap.xlsx`, inteiro, só com as colunas usadas, em paralelo e
+  só com as últimas linhas), normalização das colunas, gravação e leitura do snapshot;
+- cálculo: índice de KPIs, avaliação do histórico e cartões do DASHBOARD;
+- gráficos: PNG (matplotlib) e figura Plotly de cada página;
+- app (com --app): execução do DASHBOARD.py e de cada pages/*.py pelo
+  `streamlit.testing`, com a planilha sintética no diretório de trabalho.
+
+Os resultados são comparados com benchmarks/baseline.json: uma etapa
+regride quando fica mais lenta que a base além da tolerância (relativa,
+padrão 25%) e de um mínimo absoluto (20 ms), para não acusar ruído. O
+código de saída é 1 se houver regressão. Com --salvar, os resultados
+passam a ser a nova base (só dos cenários medidos).
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.planilha import gerar, registrar_copias
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_PLANILHAS = os.path.join(RAIZ, "benchmarks", ".planilhas")
+BASELINE = os.path.join(RAIZ, "benchmarks", "baseline.json")
+TOLERANCIA = 0.25
+MINIMO_S = 0.02
+
+
+def _cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def planilha(anos, copias):
+    os.makedirs(PASTA_PLANILHAS, exist_ok=True)
+    caminho = os.path.join(PASTA_PLANILHAS, f"anos{anos}_copias{copias}.xlsx")
+    if not os.path.exists(caminho):
+        gerar(caminho, anos, copias)
+    return caminho
+
+
+# --- ETAPAS ---
+def medir_leitura(caminho, repeticoes):
+    from recap import snapshot, xlsx
+    from recap.dados import PROCESSOS, _hash_arquivo, normalizar_colunas
+    from recap.indicadores import colunas_usadas
+    from recap.kpis import LINHAS_KPI
+
+    tempos = {}
+    tempos["hash_abas"], hashes = _cronometrar(lambda: xlsx.hashes_abas(caminho), repeticoes)
+    tempos["leitura_xlsx"], brutas = _cronometrar(lambda: pd.read_excel(caminho, sheet_name=None), repeticoes)
+    tempos["leitura_fluxo"], _ = _cronometrar(lambda: xlsx.ler_abas(caminho), repeticoes)
+    tempos["leitura_colunas"], _ = _cronometrar(lambda: xlsx.ler_abas(caminho, colunas=colunas_usadas()), repeticoes)
+    tempos["leitura_paralela"], _ = _cronometrar(
+        lambda: xlsx.ler_abas(caminho, colunas=colunas_usadas(), processos=PROCESSOS), repeticoes
+    )
+    tempos["leitura_ultimas"], _ = _cronometrar(
+        lambda: xlsx.ler_abas(caminho, colunas=colunas_usadas(), ultimas=LINHAS_KPI), repeticoes
+    )
+    tempos["normalizacao"], abas = _cronometrar(
+        lambda: {nome: normalizar_colunas(df.copy(deep=False)) for nome, df in brutas.items()}, repeticoes
+    )
+
+    digest = _hash_arquivo(caminho)
+    pasta = tempfile.mkdtemp(prefix="recap-snapshot-")
+    anterior = os.environ.get("RECAP_SNAPSHOT_DIR")
+    os.environ["RECAP_SNAPSHOT_DIR"] = pasta
+    try:
+        def gravar_do_zero():
+            shutil.rmtree(pasta, ignore_errors=True)
+            snapshot.gravar(caminho, digest, hashes, abas)
+
+        tempos["snapshot_gravar"], _ = _cronometrar(gravar_do_zero, repeticoes)
+        tempos["snapshot_ler"], _ = _cronometrar(lambda: snapshot.carregar(caminho, hashes), repeticoes)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+        if anterior is None:
+            os.environ.pop("RECAP_SNAPSHOT_DIR", None)
+        else:
+            os.environ["RECAP_SNAPSHOT_DIR"] = anterior
+    return tempos, abas
+
+
+def medir_calculo(abas, repeticoes):
+    from recap.cartoes import consolidado
+    from recap.indicadores import grupos
+    from recap.kpis import montar_indice
+    from recap.status import avaliar_historico
+
+    tempos = {}
+    tempos["indice_kpi"], indice = _cronometrar(lambda: montar_indice(abas), repeticoes)
+    tempos["historico"], historico = _cronometrar(lambda: avaliar_historico(abas), repeticoes)
+    tempos["cartoes"], _ = _cronometrar(lambda: consolidado(indice, grupos(abas)), repeticoes)
+    return tempos, historico
+
+
+def medir_graficos(historico, repeticoes, paginas):
+    from recap import graficos, interativo
+    from recap.indicadores import indicador
+
+    tempos = {}
+    for aba in paginas:
+        serie, ind = historico[aba], indicador(aba)
+        tempos[f"png:{aba}"], _ = _cronometrar(lambda: graficos._renderizar(serie, ind), repeticoes)
+        tempos[f"plotly:{aba}"], _ = _cronometrar(
+            lambda: interativo.figura(serie, ind).to_json(), repeticoes
+        )
+    return tempos
+
+
+def medir_app(caminho, repeticoes):
+    from streamlit.testing.v1 import AppTest
+
+    scripts = [os.path.join(RAIZ, "DASHBOARD.py")] + sorted(glob.glob(os.path.join(RAIZ, "pages", "*.py")))
+    pasta = tempfile.mkdtemp(prefix="recap-app-")
+    shutil.copy(caminho, os.path.join(pasta, "historico_recap.xlsx"))
+    shutil.copy(os.path.join(RAIZ, "logo.png"), pasta)
+    origem = os.getcwd()
+    os.chdir(pasta)
+    tempos = {}
+    try:
+        for script in scripts:
+            def executar():
+                teste = AppTest.from_file(script, default_timeout=600).run()
+                if teste.exception:
+                    raise RuntimeError(f"{script}: {teste.exception[0].value}")
+
+            nome = os.path.splitext(os.path.basename(script))[0]
+            tempos[f"app:{nome}"], _ = _cronometrar(executar, repeticoes)
+    finally:
+        os.chdir(origem)
+        shutil.rmtree(pasta, ignore_errors=True)
+    return tempos
+
+
+def paginas_do_app():
+    """Abas com página em pages/ (o argumento de `renderizar_pagina`)."""
+    paginas = []
+    for script in sorted(glob.glob(os.path.join(RAIZ, "pages", "*.py"))):
+        with open(script, encoding="utf-8") as f:
+            for linha in f:
+                if linha.startswith("renderizar_pagina("):
+                    paginas.append(linha.split('"')[1])
+    return paginas
+
+
+def medir_cenario(anos, copias, repeticoes=3, app=False):
+    registrar_copias(copias)
+    caminho = planilha(anos, copias)
+
+    tempos, abas = medir_leitura(caminho, repeticoes)
+    calculo, historico = medir_calculo(abas, repeticoes)
+    tempos.update(calculo)
+    tempos.update(medir_graficos(historico, repeticoes, [p for p in paginas_do_app() if p in historico]))
+    if app:
+        tempos.update(medir_app(caminho, repeticoes))
+    return tempos
+
+
+# --- BASE E REGRESSÕES ---
+def carregar_base(arquivo=BASELINE):
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def salvar_base(resultados, arquivo=BASELINE):
+    base = carregar_base(arquivo)
+    base.update(resultados)
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(base, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+def regressoes(resultados, base, tolerancia=TOLERANCIA, minimo=MINIMO_S):
+    """[(cenário, etapa, base, atual)] das etapas mais lentas que a base além da tolerância."""
+    saida = []
+    for cenario, tempos in resultados.items():
+        for etapa, atual in tempos.items():
+            anterior = base.get(cenario, {}).get(etapa)
+            if anterior is not None and atual > anterior * (1 + tolerancia) and atual - anterior > minimo:
+                saida.append((cenario, etapa, anterior, atual))
+    return saida
+
+
+def _tabela(resultados, base):
+    for cenario, tempos in resultados.items():
+        print(f"\n== {cenario}")
+        for etapa, atual in tempos.items():
+            anterior = base.get(cenario, {}).get(etapa)
+            comparacao = f"  base {anterior:8.3f}s  {atual / anterior - 1:+6.0%}" if anterior else ""
+            print(f"  {etapa:36s} {atual:8.3f}s{comparacao}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--anos", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--copias", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--app", action="store_true", help="executa também os scripts do Streamlit")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--salvar", action="store_true", help="grava os resultados como nova base")
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    for anos in args.anos:
+        for copias in args.copias:
+            cenario = f"anos={anos},copias={copias}"
+            print(f"Medindo {cenario}...", flush=True)
+            resultados[cenario] = medir_cenario(anos, copias, args.repeticoes, args.app)
+
+    base = carregar_base()
+    _tabela(resultados, base)
+    if args.salvar:
+        salvar_base(resultados)
+        print(f"\nBase gravada em {BASELINE}")
+        return 0
+
+    lentas = regressoes(resultados, base, args.tolerancia)
+    for cenario, etapa, anterior, atual in lentas:
+        print(f"REGRESSÃO {cenario} {etapa}: {anterior:.3f}s -> {atual:.3f}s")
+    return 1 if lentas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Gerador de planilhas sintéticas com o formato do historico_recap.xlsx.
+
+A planilha real serve de modelo: as mesmas abas, os mesmos cabeçalhos (sem
+normalizar, ex.: "REALIZAÇÃO  SEMANAL") e os mesmos tipos de coluna. Cada
+aba ganha `anos` anos de linhas na frequência da original (semanal ou
+mensal), com DATA e SEMANA no formato da planilha (SEMANA como número
+ano.semana) e valores sorteados na faixa dos valores reais. Com `copias`
+maior que 1, cada aba de indicador é repetida como "<ABA> 2", "<ABA> 3"...,
+e as cópias entram na LISTA DE INDICADORES (ver `registrar_copias`).
+
+    python -m benchmarks.planilha destino.xlsx [anos] [copias]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from recap.dados import ARQUIVO
+from recap.indicadores import ABA_LISTA, REGISTRO
+
+SEMENTE = 2025
+ORIGINAIS = list(REGISTRO)
+
+
+def _frequencia(modelo):
+    if "DATA" in modelo.columns and modelo["DATA"].notna().sum() > 2:
+        passo = pd.to_datetime(modelo["DATA"]).sort_values().diff().median()
+        if passo >= pd.Timedelta(days=20):
+            return "MS", 12
+    return "W-MON", 52
+
+
+def _semanas(datas):
+    iso = datas.isocalendar()
+    # mesmo formato da planilha: 2025.1 é a semana 10, 2025.01 a semana 1
+    return np.array([float(f"{a}.{s:02d}") for a, s in zip(iso.year, iso.week)])
+
+
+def _coluna(serie, n, datas, rng):
+    nome = str(serie.name).strip().upper()
+    valores = serie.dropna()
+    if nome == "DATA" or pd.api.types.is_datetime64_any_dtype(serie):
+        return datas
+    if nome == "SEMANA":
+        return _semanas(datas)
+    if valores.empty:
+        return np.full(n, np.nan)
+    if pd.api.types.is_numeric_dtype(serie):
+        media, desvio = valores.mean(), valores.std() if len(valores) > 1 else 0
+        baixo, alto = valores.min(), valores.max()
+        folga = (alto - baixo) * 0.1
+        sorteio = np.clip(rng.normal(media, desvio or abs(media) * 0.05 or 1, n), baixo - folga, alto + folga)
+        if pd.api.types.is_integer_dtype(serie):
+            return np.round(sorteio).astype(int)
+        return sorteio
+    return np.resize(valores.to_numpy(), n)
+
+
+def _aba(modelo, anos, rng):
+    if modelo.empty:
+        return modelo
+    frequencia, por_ano = _frequencia(modelo)
+    n = anos * por_ano
+    fim = pd.to_datetime(modelo["DATA"]).max() if "DATA" in modelo.columns else pd.Timestamp("2025-07-21")
+    datas = pd.date_range(end=fim, periods=n, freq=frequencia)
+    return pd.DataFrame({coluna: _coluna(modelo[coluna], n, datas, rng) for coluna in modelo.columns})
+
+
+def _indicadores_da_lista():
+    return {(cfg.get("lista") or aba): aba for aba, cfg in REGISTRO.items()}
+
+
+def nome_copia(aba, k):
+    return f"{aba} {k}"
+
+
+def gerar(destino, anos=5, copias=1, modelo=ARQUIVO, semente=SEMENTE):
+    """Grava em `destino` uma planilha com `anos` anos de histórico e `copias` cópias de cada indicador."""
+    rng = np.random.default_rng(semente)
+    originais = pd.read_excel(modelo, sheet_name=None)
+
+    abas = {}
+    for nome, df in originais.items():
+        if nome == ABA_LISTA:
+            continue
+        abas[nome] = _aba(df, anos, rng)
+        if nome in REGISTRO:
+            for k in range(2, copias + 1):
+                abas[nome_copia(nome, k)] = _aba(df, anos, rng)
+
+    # a lista recebe as cópias logo após o indicador original
+    lista = originais[ABA_LISTA]
+    coluna = lista.columns[0]
+    por_nome = _indicadores_da_lista()
+    linhas = []
+    for _, linha in lista.iterrows():
+        linhas.append(linha)
+        aba = por_nome.get(str(linha[coluna]).strip())
+        for k in range(2, copias + 1 if aba else 0):
+            copia = linha.copy()
+            copia[coluna] = nome_copia(aba, k)
+            linhas.append(copia)
+
+    with pd.ExcelWriter(destino, engine="openpyxl") as escritor:
+        pd.DataFrame(linhas, columns=lista.columns).to_excel(escritor, sheet_name=ABA_LISTA, index=False)
+        for nome, df in abas.items():
+            df.to_excel(escritor, sheet_name=nome, index=False)
+    return destino
+
+
+def registrar_copias(copias):
+    """Registra as cópias geradas por `gerar` no registro de indicadores deste processo."""
+    for aba in ORIGINAIS:
+        for k in range(2, copias + 1):
+            REGISTRO[nome_copia(aba, k)] = {**REGISTRO[aba], "lista": None}
+
+
+if __name__ == "__main__":
+    destino = sys.argv[1]
+    anos = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    copias = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    gerar(destino, anos, copias)
+    print(f"Planilha sintética em {destino}: {anos} anos, {copias} cópia(s) de cada indicador")
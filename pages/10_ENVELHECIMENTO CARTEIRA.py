@@ -0,0 +1,3 @@
+from recap.envelhecimento import renderizar_envelhecimento
+
+renderizar_envelhecimento()
@@ -0,0 +1,3 @@
+from recap.carteira import renderizar_carteira
+
+renderizar_carteira()
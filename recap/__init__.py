@@ -0,0 +1 @@
+"""Núcleo compartilhado dos dashboards de indicadores RECAP."""
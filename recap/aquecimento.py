@@ -0,0 +1,94 @@
+"""Partida do servidor com o processo já aquecido.
+
+    python -m recap.aquecimento [opções do streamlit run]
+
+Antes de abrir a porta, carrega as planilhas de todas as unidades e monta
+os artefatos derivados de que as páginas precisam (histórico avaliado,
+rollups, grupos, controle estatístico), importa as bibliotecas de gráficos,
+carrega o cache de fontes do matplotlib e renderiza um gráfico de cada tipo
+(área e barras, PNG e Plotly). Depois sobe o `streamlit run DASHBOARD.py` no mesmo processo,
+que já encontra tudo em memória: a primeira página depois de um deploy ou
+reinício custa o mesmo que as seguintes.
+
+Os tempos de cada etapa vão para o log e para o endpoint de métricas (ver
+`recap.metricas`), junto com o tempo até a primeira renderização.
+"""
+import contextlib
+import logging
+import os
+import sys
+import time
+
+from recap.metricas import registrar_aquecimento
+
+logger = logging.getLogger(__name__)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def aquecer():
+    """Aquece o processo e retorna {etapa: segundos}."""
+    tempos = {}
+
+    @contextlib.contextmanager
+    def etapa(nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            tempos[nome] = time.perf_counter() - inicio
+
+    with etapa("imports"):
+        import matplotlib.figure  # noqa: F401
+        import plotly.graph_objects  # noqa: F401
+
+        from recap import graficos, pagina, periodos, projecoes
+        from recap.dados import derivado, indice_kpi
+        from recap.indicadores import grupos, indicador
+        from recap.unidades import carregar_unidades
+
+    with etapa("planilhas"):
+        planilhas = carregar_unidades()
+
+    with etapa("derivados"):
+        for caminho in planilhas.values():
+            indice_kpi(caminho)
+            derivado("grupos", grupos, caminho)
+            periodos.rollups(caminho)
+            projecoes.controle(caminho)
+
+    with etapa("fontes"):
+        from matplotlib.font_manager import FontProperties, findfont
+        from matplotlib.textpath import TextPath
+
+        findfont(FontProperties())
+        TextPath((0, 0), "0123456789,.% -", prop=FontProperties(size=8))
+
+    with etapa("graficos"):
+        # um gráfico de cada tipo da unidade padrão; os demais seguem
+        # RECAP_PREAQUECER (ver `dados.ao_recarregar`)
+        caminho = next(iter(planilhas.values()), None)
+        if caminho is not None:
+            por_tipo = {}
+            for chave in pagina.historico(caminho):
+                por_tipo.setdefault(indicador(chave)["grafico"], chave)
+            for chave in por_tipo.values():
+                graficos.imagem(chave, caminho=caminho)
+                pagina.figura_interativa(chave, caminho).to_json()
+
+    registrar_aquecimento(tempos)
+    return tempos
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    tempos = aquecer()
+    logger.info("Aquecimento em %.2fs", sum(tempos.values()))
+    for nome, segundos in tempos.items():
+        logger.info("  %-10s %6.2fs", nome, segundos)
+
+    from streamlit.web import cli
+
+    cli.main(["run", os.path.join(RAIZ, "DASHBOARD.py"), *sys.argv[1:]], prog_name="streamlit")
@@ -0,0 +1,125 @@
+"""Imagens estáticas das páginas (logos) em variantes prontas por largura.
+
+Na primeira página servida pelo processo, cada imagem usada pelo app
+(`imagens()`: o logo do DASHBOARD e os logos do registro de indicadores) é
+reduzida para a largura exibida (vezes DENSIDADE, para telas de alta
+densidade), comprimida em WebP sem perdas (RECAP_FORMATO_IMAGEM=png para
+PNG) e gravada em static/ativos/ com o hash do conteúdo no nome. Uma imagem nova ou trocada
+gera outro nome, então o navegador nunca usa uma variante velha.
+
+Com o static serving do Streamlit ligado (`.streamlit/config.toml`), a página
+só envia um <img> com a URL relativa app/static/ativos/<arquivo> (resolvida
+a partir da página, então funciona também com server.baseUrlPath): o
+navegador baixa cada variante uma vez e revalida pelo ETag, e o servidor não
+relê nem recodifica o arquivo a cada rerun. Sem ele, a variante (poucos KB) vai pelo gerenciador de mídia.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+
+from recap.indicadores import REGISTRO, indicador
+
+logger = logging.getLogger(__name__)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA = os.path.join(RAIZ, "static", "ativos")
+URL = "app/static/ativos"  # relativa: respeita server.baseUrlPath
+LOGO = "logo.png"
+LARGURA_LOGO = 200  # logo do DASHBOARD
+DENSIDADE = 2
+FORMATO = os.environ.get("RECAP_FORMATO_IMAGEM", "webp")
+
+_lock = threading.Lock()
+_variantes = {}  # (caminho absoluto, mtime, tamanho, largura) -> nome do arquivo gerado
+_preparadas = False
+
+
+def imagens():
+    """(caminho, largura) de todas as imagens exibidas pelo app."""
+    usadas = {(LOGO, LARGURA_LOGO)}
+    for chave in REGISTRO:
+        if indicador(chave)["logo"]:
+            usadas.add((LOGO, indicador(chave)["logo"]))
+    return sorted(usadas)
+
+
+# --- VARIANTES ---
+def _codificar(caminho, largura):
+    from PIL import Image
+
+    with Image.open(caminho) as original:
+        alvo = min(original.width, largura * DENSIDADE)
+        altura = max(1, round(original.height * alvo / original.width))
+        imagem = original.convert("RGBA").resize((alvo, altura), Image.LANCZOS)
+    saida = io.BytesIO()
+    if FORMATO == "webp":
+        # sem perdas: logos têm poucas cores e bordas nítidas
+        imagem.save(saida, "WEBP", lossless=True)
+    else:
+        imagem.save(saida, "PNG", optimize=True)
+    return saida.getvalue()
+
+
+def variante(caminho, largura):
+    """Nome (em PASTA) da variante de `caminho` para a largura exibida, gerada se preciso."""
+    absoluto = os.path.abspath(caminho)
+    st_arq = os.stat(absoluto)
+    chave = (absoluto, st_arq.st_mtime_ns, st_arq.st_size, largura)
+    with _lock:
+        if chave in _variantes:
+            return _variantes[chave]
+
+    with open(absoluto, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    nome = f"{base}-{largura}-{DENSIDADE}x-{digest}.{FORMATO}"
+    destino = os.path.join(PASTA, nome)
+    if not os.path.exists(destino):
+        os.makedirs(PASTA, exist_ok=True)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(_codificar(absoluto, largura))
+        os.replace(temporario, destino)
+        logger.info("Variante %s gerada (%d bytes)", nome, os.path.getsize(destino))
+    with _lock:
+        _variantes[chave] = nome
+    return nome
+
+
+def preparar():
+    """Gera as variantes de todas as imagens do app (uma vez por processo)."""
+    global _preparadas
+    if _preparadas:
+        return
+    for caminho, largura in imagens():
+        if os.path.exists(caminho):
+            try:
+                variante(caminho, largura)
+            except OSError as erro:
+                logger.warning("Não foi possível gerar a variante de %s: %s", caminho, erro)
+    _preparadas = True
+
+
+def _servindo_estaticos():
+    from streamlit import config
+
+    return bool(config.get_option("server.enableStaticServing"))
+
+
+# --- EXIBIÇÃO ---
+def exibir(caminho, largura):
+    """`st.image` da variante da imagem; sem variante (ex.: pasta sem escrita), a original."""
+    import streamlit as st
+
+    preparar()
+    try:
+        nome = variante(caminho, largura)
+    except OSError:
+        st.image(caminho, width=largura)
+        return
+    if _servindo_estaticos():
+        st.markdown(f'<img src="{URL}/{nome}" width="{largura}" alt="">', unsafe_allow_html=True)
+    else:
+        st.image(os.path.join(PASTA, nome), width=largura)
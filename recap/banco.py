@@ -0,0 +1,317 @@
+"""Histórico local em SQLite, só de inclusões, alimentado a partir do xlsx.
+
+`ingerir` lê a planilha e grava em RECAP_BANCO (padrão historico_recap.sqlite)
+as linhas novas ou alteradas de cada aba, com chave (aba, semana, seq): seq
+distingue linhas repetidas da mesma semana. Linhas que somem da planilha
+continuam no banco, e cada versão de cada linha fica em `revisoes`, então
+uma sobrescrita acidental no Excel não apaga o histórico. Os triggers
+impedem exclusões e mantêm a versão de cada aba.
+
+    python -m recap.banco [planilha.xlsx] [banco.sqlite]
+
+Com RECAP_ALERTAS definido, a ingestão termina com a verificação de
+alertas do banco (ver `recap.alertas`).
+
+O banco também é uma fonte de dados do app: com RECAP_FONTE apontando para
+ele (ou um manifest de unidades com caminhos .sqlite), `recap.dados` lê as
+abas do banco em vez do xlsx, com a versão de cada aba no lugar do hash.
+As consultas (`ultima`, `intervalo`, `rollup`, `ultimas`) usam o índice
+(aba, data) e só trazem as linhas pedidas.
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from recap.indicadores import ABA_LISTA, REGISTRO, colunas_usadas, indicador
+
+PLANILHA = "historico_recap.xlsx"
+BANCO = os.environ.get("RECAP_BANCO", "historico_recap.sqlite")
+EXTENSOES = (".sqlite", ".sqlite3", ".db")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS linhas (
+    aba TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT,
+    valor REAL,
+    meta REAL,
+    campos TEXT NOT NULL,
+    gravada_em REAL NOT NULL,
+    PRIMARY KEY (aba, semana, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS linhas_data ON linhas (aba, data);
+
+CREATE TABLE IF NOT EXISTS revisoes (
+    aba TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    campos TEXT NOT NULL,
+    gravada_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS revisoes_chave ON revisoes (aba, semana, seq);
+
+CREATE TABLE IF NOT EXISTS abas (
+    aba TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0,
+    colunas TEXT NOT NULL,
+    datas TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS linhas_inclusao AFTER INSERT ON linhas BEGIN
+    INSERT INTO revisoes VALUES (NEW.aba, NEW.semana, NEW.seq, NEW.campos, NEW.gravada_em);
+    UPDATE abas SET versao = versao + 1 WHERE aba = NEW.aba;
+END;
+CREATE TRIGGER IF NOT EXISTS linhas_alteracao AFTER UPDATE ON linhas BEGIN
+    INSERT INTO revisoes VALUES (NEW.aba, NEW.semana, NEW.seq, NEW.campos, NEW.gravada_em);
+    UPDATE abas SET versao = versao + 1 WHERE aba = NEW.aba;
+END;
+CREATE TRIGGER IF NOT EXISTS linhas_sem_exclusao BEFORE DELETE ON linhas BEGIN
+    SELECT RAISE(ABORT, 'o histórico só aceita inclusões');
+END;
+CREATE TRIGGER IF NOT EXISTS revisoes_sem_alteracao BEFORE UPDATE ON revisoes BEGIN
+    SELECT RAISE(ABORT, 'o histórico só aceita inclusões');
+END;
+CREATE TRIGGER IF NOT EXISTS revisoes_sem_exclusao BEFORE DELETE ON revisoes BEGIN
+    SELECT RAISE(ABORT, 'o histórico só aceita inclusões');
+END;
+"""
+
+# do mais recente para o mais antigo, na ordem em que as abas são lidas
+ORDEM_DESC = "data DESC, semana DESC, seq DESC"
+ORDEM = "data, semana, seq"
+
+
+def e_banco(caminho):
+    return str(caminho).lower().endswith(EXTENSOES)
+
+
+def conectar(banco=BANCO, leitura=True):
+    """Conexão com o banco; só leitura não cria o arquivo."""
+    if leitura:
+        return sqlite3.connect(f"file:{os.path.abspath(banco)}?mode=ro", uri=True)
+    con = sqlite3.connect(banco)
+    con.executescript(ESQUEMA)
+    return con
+
+
+# --- INGESTÃO ---
+def _json(valor):
+    if isinstance(valor, pd.Timestamp):
+        return valor.isoformat()
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if valor is pd.NaT or valor is pd.NA:
+        return None
+    return valor
+
+
+def _real(valor):
+    return None if valor is None or isinstance(valor, str) else float(valor)
+
+
+def _linhas(aba, df, agora):
+    """Linhas (semana, seq, data, valor, meta, campos, gravada_em) de uma aba."""
+    from recap.status import datas_linhas
+
+    if "SEMANA" in df.columns:
+        df = df[df["SEMANA"].notna()]
+        semanas = df["SEMANA"].astype(str).to_numpy()
+        seqs = df.groupby("SEMANA", sort=False).cumcount().to_numpy()
+        datas = pd.DatetimeIndex(datas_linhas(df)).strftime("%Y-%m-%d")
+    else:
+        # abas sem semana (ex.: a lista de indicadores): a posição é a chave
+        semanas = np.full(len(df), "")
+        seqs = np.arange(len(df))
+        datas = [None] * len(df)
+
+    ind = indicador(aba) if aba in REGISTRO else None
+    colunas = list(df.columns)
+    for semana, seq, data, registro in zip(semanas, seqs, datas, df.itertuples(index=False, name=None)):
+        campos = {c: _json(v) for c, v in zip(colunas, registro)}
+        valor = _real(campos.get(ind["campo_valor"])) if ind else None
+        meta = _real(campos.get(ind["campo_meta"])) if ind else None
+        data = None if isinstance(data, float) else data
+        yield (aba, semana, int(seq), data, valor, meta, json.dumps(campos, ensure_ascii=False), agora)
+
+
+def ingerir(planilha=PLANILHA, banco=BANCO):
+    """Grava no banco as linhas novas ou alteradas da planilha.
+
+    Retorna {aba: (novas, alteradas)} das abas com alguma mudança.
+    """
+    from recap.dados import carregar_planilha
+
+    abas = carregar_planilha(planilha)
+    usadas = colunas_usadas()
+    agora = time.time()
+    resultado = {}
+    con = conectar(banco, leitura=False)
+    try:
+        with con:
+            for aba, df in abas.items():
+                if aba != ABA_LISTA and "SEMANA" not in df.columns:
+                    continue
+                if aba in usadas:
+                    df = df[[c for c in df.columns if c in usadas[aba]]]
+                datas = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
+                con.execute(
+                    "INSERT INTO abas (aba, colunas, datas) VALUES (?, ?, ?) "
+                    "ON CONFLICT (aba) DO UPDATE SET colunas = excluded.colunas, datas = excluded.datas",
+                    (aba, json.dumps(list(df.columns), ensure_ascii=False), json.dumps(datas, ensure_ascii=False)),
+                )
+
+                existentes = {
+                    (semana, seq): campos
+                    for semana, seq, campos in con.execute(
+                        "SELECT semana, seq, campos FROM linhas WHERE aba = ?", (aba,)
+                    )
+                }
+                mudancas = [
+                    linha for linha in _linhas(aba, df, agora)
+                    if existentes.get((linha[1], linha[2])) != linha[6]
+                ]
+                if not mudancas:
+                    continue
+                con.executemany(
+                    "INSERT INTO linhas VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (aba, semana, seq) DO UPDATE SET data = excluded.data, "
+                    "valor = excluded.valor, meta = excluded.meta, campos = excluded.campos, "
+                    "gravada_em = excluded.gravada_em WHERE campos IS NOT excluded.campos",
+                    mudancas,
+                )
+                alteradas = sum((linha[1], linha[2]) in existentes for linha in mudancas)
+                resultado[aba] = (len(mudancas) - alteradas, alteradas)
+    finally:
+        con.close()
+    return resultado
+
+
+# --- LEITURA ---
+def _quadro(con, aba, linhas):
+    colunas, datas = con.execute("SELECT colunas, datas FROM abas WHERE aba = ?", (aba,)).fetchone()
+    df = pd.DataFrame.from_records([json.loads(campos) for campos, in linhas], columns=json.loads(colunas))
+    for coluna in json.loads(datas):
+        df[coluna] = pd.to_datetime(df[coluna])
+    return df
+
+
+def hashes_abas(banco=BANCO):
+    """{aba: versão} no mesmo papel de `xlsx.hashes_abas`."""
+    con = conectar(banco)
+    try:
+        return {aba: f"banco:{versao}" for aba, versao in con.execute("SELECT aba, versao FROM abas ORDER BY rowid")}
+    finally:
+        con.close()
+
+
+def digest(banco=BANCO):
+    """Identifica o conteúdo do banco pelas versões das abas, sem ler as linhas."""
+    versoes = ";".join(f"{aba}:{v}" for aba, v in hashes_abas(banco).items())
+    return hashlib.sha256(versoes.encode("utf-8")).hexdigest()
+
+
+def ler_abas(banco=BANCO, abas=None):
+    """{aba: DataFrame} com as colunas gravadas, na ordem cronológica."""
+    con = conectar(banco)
+    try:
+        if abas is None:
+            abas = [aba for aba, in con.execute("SELECT aba FROM abas ORDER BY rowid")]
+        return {
+            aba: _quadro(con, aba, con.execute(f"SELECT campos FROM linhas WHERE aba = ? ORDER BY {ORDEM}", (aba,)))
+            for aba in abas
+        }
+    finally:
+        con.close()
+
+
+def ultimas(banco=BANCO, linhas=20):
+    """{aba: DataFrame} só com as últimas `linhas` linhas de cada aba (a lista vem inteira)."""
+    con = conectar(banco)
+    try:
+        resultado = {}
+        for aba, in con.execute("SELECT aba FROM abas ORDER BY rowid").fetchall():
+            limite = -1 if aba == ABA_LISTA else linhas
+            fim = con.execute(
+                f"SELECT campos FROM linhas WHERE aba = ? ORDER BY {ORDEM_DESC} LIMIT ?", (aba, limite)
+            ).fetchall()
+            resultado[aba] = _quadro(con, aba, fim[::-1])
+        return resultado
+    finally:
+        con.close()
+
+
+# --- CONSULTAS ---
+def ultima(aba, banco=BANCO):
+    """Campos da última linha da aba com valor e meta, ou None."""
+    con = conectar(banco)
+    try:
+        linha = con.execute(
+            f"SELECT campos FROM linhas WHERE aba = ? AND valor IS NOT NULL AND meta IS NOT NULL "
+            f"ORDER BY {ORDEM_DESC} LIMIT 1",
+            (aba,),
+        ).fetchone()
+        return None if linha is None else _quadro(con, aba, [linha]).iloc[0].to_dict()
+    finally:
+        con.close()
+
+
+def intervalo(aba, inicio=None, fim=None, banco=BANCO):
+    """Linhas da aba com data entre `inicio` e `fim` (inclusive), como vêm da planilha."""
+    condicoes, parametros = ["aba = ?"], [aba]
+    if inicio is not None:
+        condicoes.append("data >= ?")
+        parametros.append(pd.Timestamp(inicio).strftime("%Y-%m-%d"))
+    if fim is not None:
+        condicoes.append("data <= ?")
+        parametros.append(pd.Timestamp(fim).strftime("%Y-%m-%d"))
+    con = conectar(banco)
+    try:
+        linhas = con.execute(f"SELECT campos FROM linhas WHERE {' AND '.join(condicoes)} ORDER BY {ORDEM}", parametros)
+        return _quadro(con, aba, linhas)
+    finally:
+        con.close()
+
+
+def rollup(aba, granularidade="Mês", inicio=None, fim=None, banco=BANCO):
+    """Série avaliada do indicador no intervalo, agregada como em `recap.periodos`."""
+    from recap.periodos import GRANULARIDADES, agregar
+    from recap.status import avaliar_historico
+
+    serie = avaliar_historico({aba: intervalo(aba, inicio, fim, banco)})[aba]
+    return agregar(serie, indicador(aba), GRANULARIDADES[granularidade])
+
+
+def revisoes(aba, semana, banco=BANCO):
+    """Todas as versões gravadas das linhas de uma semana, da mais antiga à mais recente."""
+    con = conectar(banco)
+    try:
+        return pd.read_sql_query(
+            "SELECT seq, campos, gravada_em FROM revisoes WHERE aba = ? AND semana = ? ORDER BY rowid",
+            con, params=(aba, str(semana)),
+        )
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    origem = sys.argv[1] if len(sys.argv) > 1 else PLANILHA
+    destino = sys.argv[2] if len(sys.argv) > 2 else BANCO
+    mudancas = ingerir(origem, destino)
+    for aba, (novas, alteradas) in mudancas.items():
+        print(f"{aba}: {novas} novas, {alteradas} alteradas")
+    print(f"{origem} -> {destino}: {len(mudancas)} abas com mudanças")
+    if mudancas and os.environ.get("RECAP_ALERTAS"):
+        from recap.alertas import verificar
+
+        for alerta in verificar(destino):
+            print(alerta["texto"])
@@ -0,0 +1,180 @@
+"""Explorador da aba CARTEIRA PLANEJAMENTO CAL COM: busca, filtro, ordenação e páginas.
+
+O índice da aba é montado uma vez por versão da planilha (ver
+`dados.derivado`): a ordem de cada coluna (um argsort estável), os limites
+das colunas numéricas e o texto de cada linha já em minúsculas para a busca.
+Uma consulta vira uma máscara booleana, a permutação da coluna escolhida
+filtrada por ela e um recorte da página: só as linhas visíveis são montadas
+e enviadas ao navegador, em vez da aba inteira a cada rerun.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from recap.dados import ARQUIVO, derivado
+from recap.metricas import execucao, painel_desenvolvedor, span
+
+ABA_CARTEIRA = "CARTEIRA PLANEJAMENTO CAL COM"
+LINHAS_POR_PAGINA = (25, 50, 100, 200)
+
+
+# --- ÍNDICE ---
+def ordem_coluna(valores):
+    """Argsort estável da coluna, com os vazios no fim.
+
+    Colunas de texto digitadas à mão misturam números e texto: os números
+    vêm primeiro, em ordem numérica, e o resto em ordem de texto.
+    """
+    if valores.dtype != object:
+        return valores.sort_values(kind="stable", na_position="last").index.to_numpy()
+    numeros = pd.to_numeric(valores, errors="coerce")
+    vazios = valores.isna()
+    textos = valores[numeros.isna() & ~vazios].astype(str)
+    return np.concatenate([
+        numeros.dropna().sort_values(kind="stable").index.to_numpy(),
+        textos.sort_values(kind="stable").index.to_numpy(),
+        valores.index[vazios].to_numpy(),
+    ])
+
+
+def montar_indice(df):
+    """Ordens, limites e texto de busca da aba, reaproveitados por todas as consultas."""
+    df = df.dropna(how="all").reset_index(drop=True)
+    ordens, limites = {}, {}
+    for coluna in df.columns:
+        valores = df[coluna]
+        # vazios sempre no fim, nos dois sentidos
+        ordens[coluna] = ordem_coluna(valores)
+        if pd.api.types.is_numeric_dtype(valores) and valores.notna().any():
+            limites[coluna] = (float(valores.min()), float(valores.max()))
+
+    texto = pd.Series("", index=df.index)
+    for coluna in df.columns:
+        texto = texto + " " + df[coluna].astype(str).fillna("").str.lower()
+    return {
+        "tabela": df,
+        "ordens": ordens,
+        "vazios": {coluna: int(df[coluna].isna().sum()) for coluna in df.columns},
+        "limites": limites,
+        "texto": texto,
+    }
+
+
+def indice(aba=ABA_CARTEIRA, caminho=ARQUIVO):
+    return derivado(
+        f"carteira:{aba}",
+        lambda abas: montar_indice(abas.get(aba, pd.DataFrame())),
+        caminho,
+    )
+
+
+# --- CONSULTA ---
+def consultar(indice, busca="", faixas=None, coluna=None, decrescente=False, pagina=1, por_pagina=50):
+    """(linhas da página, total de linhas filtradas).
+
+    `faixas` é {coluna numérica: (mínimo, máximo)}; `busca` procura o termo
+    em qualquer coluna, sem diferenciar maiúsculas.
+    """
+    tabela = indice["tabela"]
+    mascara = np.ones(len(tabela), dtype=bool)
+    termo = busca.strip().lower()
+    if termo:
+        mascara &= indice["texto"].str.contains(termo, regex=False).to_numpy(dtype=bool)
+    for nome, (minimo, maximo) in (faixas or {}).items():
+        valores = tabela[nome].to_numpy(dtype=float, na_value=np.nan)
+        mascara &= (valores >= minimo) & (valores <= maximo)
+
+    if coluna is None:
+        ordem = np.flatnonzero(mascara)
+    else:
+        ordem = indice["ordens"][coluna]
+        if decrescente:
+            # inverte só os preenchidos: os vazios continuam no fim
+            preenchidos = len(ordem) - indice["vazios"][coluna]
+            ordem = np.concatenate([ordem[:preenchidos][::-1], ordem[preenchidos:]])
+        ordem = ordem[mascara[ordem]]
+
+    inicio = (pagina - 1) * por_pagina
+    return tabela.iloc[ordem[inicio:inicio + por_pagina]], len(ordem)
+
+
+# --- PÁGINA ---
+def renderizar_carteira(aba=ABA_CARTEIRA):
+    with execucao(aba):
+        _renderizar_carteira(aba)
+
+
+def _renderizar_carteira(aba):
+    import streamlit as st
+
+    from recap.telemetria import painel_memoria, painel_versao
+    from recap.unidades import seletor_unidade
+
+    st.set_page_config(page_title="Carteira Planejamento", layout="wide", initial_sidebar_state="collapsed")
+    st.markdown("## Carteira de Planejamento")
+
+    _, caminho, _, _ = seletor_unidade()
+    if not os.path.exists(caminho):
+        st.error(f"❌ Arquivo '{caminho}' não encontrado.")
+        return
+    painel_versao(caminho)
+
+    idx = indice(aba, caminho)
+    tabela = idx["tabela"]
+    if tabela.empty:
+        st.info(f"A aba '{aba}' está vazia ou não existe na planilha.")
+        return
+
+    def nova_consulta():
+        st.session_state["carteira_pagina"] = 1
+
+    # --- FILTROS ---
+    col_busca, col_ordem, col_sentido = st.columns([2, 2, 1])
+    with col_busca:
+        busca = st.text_input("Buscar", key="carteira_busca", on_change=nova_consulta)
+    with col_ordem:
+        colunas = list(tabela.columns)
+        coluna = st.selectbox("Ordenar por", colunas, key="carteira_ordem", on_change=nova_consulta)
+    with col_sentido:
+        decrescente = st.toggle("Decrescente", key="carteira_decrescente", on_change=nova_consulta)
+
+    faixas = {}
+    filtradas = st.multiselect(
+        "Filtrar por faixa", list(idx["limites"]), key="carteira_faixas", on_change=nova_consulta
+    )
+    for nome in filtradas:
+        minimo, maximo = idx["limites"][nome]
+        if minimo < maximo:
+            faixas[nome] = st.slider(
+                nome, minimo, maximo, (minimo, maximo), key=f"carteira_faixa_{nome}", on_change=nova_consulta
+            )
+
+    # --- RESULTADO ---
+    por_pagina = st.session_state.get("carteira_por_pagina", LINHAS_POR_PAGINA[1])
+    pagina = st.session_state.get("carteira_pagina", 1)
+    with span("compute.carteira"):
+        linhas, total = consultar(idx, busca, faixas, coluna, decrescente, pagina, por_pagina)
+    paginas = max(1, math.ceil(total / por_pagina))
+    if pagina > paginas:
+        # a consulta encolheu (ex.: nova versão da planilha): volta ao início
+        st.session_state["carteira_pagina"] = pagina = 1
+        linhas, total = consultar(idx, busca, faixas, coluna, decrescente, pagina, por_pagina)
+
+    with span("encode"):
+        st.dataframe(linhas, hide_index=True, width="stretch")
+
+    col_info, col_pagina, col_tamanho = st.columns([2, 1, 1])
+    with col_info:
+        st.caption(f"{total} de {len(tabela)} linhas · página {pagina} de {paginas}")
+    with col_pagina:
+        st.number_input("Página", min_value=1, max_value=paginas, step=1, key="carteira_pagina")
+    with col_tamanho:
+        st.selectbox(
+            "Linhas por página", LINHAS_POR_PAGINA, key="carteira_por_pagina", on_change=nova_consulta,
+            index=LINHAS_POR_PAGINA.index(por_pagina),
+        )
+
+    painel_memoria()
+    painel_desenvolvedor()
@@ -0,0 +1,86 @@
+"""HTML dos cartões de KPI.
+
+Usado pelo DASHBOARD e pelas páginas (via `st.markdown`) e pelo exportador
+estático (`recap.exportar`), que gera o mesmo HTML sem o Streamlit.
+"""
+import pandas as pd
+
+from recap.status import apresentacao, avaliar_kpis
+
+
+def ultimo_ponto(serie):
+    """Última semana com valor e meta da série avaliada (ou a última, se nenhuma)."""
+    validos = serie[serie["valido"]]
+    return validos.iloc[-1] if len(validos) else serie.iloc[-1]
+
+
+def texto_resumo(ultimo):
+    resumo = ultimo["resumo"]
+    return str(resumo).strip() if pd.notnull(resumo) else ""
+
+
+def consolidado(indice, grupos_indicadores):
+    """{grupo: [(indicador, cartão)]} com valor, meta e status de cada cartão do DASHBOARD."""
+    todos = [ind for indicadores in grupos_indicadores.values() for ind in indicadores]
+    avaliacao = avaliar_kpis(todos, [indice["indicadores"].get(ind["aba"]) for ind in todos])
+    status = apresentacao(avaliacao["ok"], "#1f77b4", "Dentro da meta", "Fora da meta")
+
+    saida = {}
+    k = 0
+    for titulo, indicadores in grupos_indicadores.items():
+        saida[titulo] = []
+        for ind in indicadores:
+            saida[titulo].append((ind, {
+                "valor_fmt": avaliacao["valor_fmt"][k],
+                "meta_fmt": avaliacao["meta_fmt"][k],
+                "cor": status["cor"][k],
+                "emoji": status["emoji"][k],
+                "texto": status["status"][k],
+            }))
+            k += 1
+    return saida
+
+
+def status_gaveteiro(andaimes):
+    ok = andaimes["gaveteiro"] >= andaimes["minimo"]
+    return {
+        "valor_fmt": f"{andaimes['gaveteiro']:.0f} m",
+        "meta_fmt": f"{andaimes['minimo']:.0f} m",
+        "cor": "#1f77b4" if ok else "red",
+        "emoji": "✅" if ok else "⚠️",
+        "texto": "Dentro da meta" if ok else "Fora da meta",
+    }
+
+
+def cartao_consolidado(valor_fmt, meta_fmt, cor, emoji, texto, tamanho_meta=12):
+    return f"""
+    <div style="background-color:#f5f5f5;padding:10px;border-radius:10px;text-align:center">
+        <h1 style="color:{cor};font-size:32px;margin:4px 0">{valor_fmt}</h1>
+        <p style="color:{cor};font-size:15px;margin:0">{emoji} {texto}</p>
+        <p style="color:#333;font-size:{tamanho_meta}px;margin:0">Meta: {meta_fmt}</p>
+    </div>
+    """
+
+
+def cartao_pagina(ind, ultimo):
+    """Cartão do KPI da última semana na página do indicador."""
+    status = apresentacao(ultimo["ok"], ind["cor_ok"], "Dentro da meta", ind["texto_fora"])
+    cor, emoji, texto = status["cor"], status["emoji"], status["status"]
+    rodape = f" &nbsp; • &nbsp; {ind['rodape_meta']}" if ind["rodape_meta"] else ""
+
+    return f"""
+        <div style="background-color:#f5f5f5;padding:6px 10px;border-radius:10px;text-align:center">
+            <h1 style="color:{cor};font-size:36px;margin:4px 0">{ultimo['valor_fmt']}</h1>
+            <p style="color:#444;font-size:13px;margin:2px 0">{ind['rotulo_kpi']}</p>
+            <p style="color:{cor};font-size:16px;margin:4px 0">{emoji} {texto}</p>
+            <p style="color:#333;font-size:11px;margin:2px 0">Meta: {ultimo['meta_fmt']}{rodape}</p>
+        </div>
+        """
+
+
+def caixa_resumo(resumo):
+    return f"""
+            <div style="background-color:#f0f0f0;padding:8px 12px;margin-top:8px;border-radius:8px;">
+                <p style="color:#222;font-size:13px;margin:0;text-align:justify">📌 <b>Resumo:</b> {resumo}</p>
+            </div>
+            """
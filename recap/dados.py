@@ -0,0 +1,456 @@
+"""Leitura compartilhada do histórico de indicadores (historico_recap.xlsx).
+
+A planilha é lida uma única vez por versão do arquivo e o resultado fica em
+memória para todo o processo do Streamlit, servindo o DASHBOARD e todas as
+páginas. A versão é identificada pelo caminho, mtime, tamanho e hash do
+conteúdo. Quando o arquivo muda, só as abas cujo conteúdo mudou (ver
+`recap.xlsx.hashes_abas`) são lidas de novo; as demais são reaproveitadas da
+memória ou do snapshot colunar (ver `recap.snapshot`). Na mesma carga é
+montado o índice de KPIs do DASHBOARD (ver `recap.kpis`).
+
+As abas são lidas pelo leitor em fluxo de `recap.xlsx.ler_abas`, só com as
+colunas que o app usa (`indicadores.colunas_usadas`); abas sem colunas
+conhecidas vêm inteiras, e abas grandes são lidas em paralelo em até
+RECAP_PROCESSOS processos (padrão: um por CPU). RECAP_LEITOR=pandas volta ao `pd.read_excel` com
+todas as colunas. O conjunto de colunas entra no hash de cada aba, então
+uma aba lida com outras colunas não é confundida no snapshot.
+
+Cada planilha tem o seu próprio lock de carga, então planilhas diferentes
+(ex.: uma por unidade, ver `recap.unidades`) podem ser carregadas ao mesmo
+tempo por threads diferentes.
+
+Quando o arquivo muda depois de carregado, quem pede a planilha recebe na
+hora a versão anterior enquanto uma thread monta a nova (abas, índice e os
+mesmos artefatos derivados que a anterior já tinha) e a troca de uma vez
+(stale-while-revalidate). Uma thread vigia os arquivos carregados a cada
+RECAP_INTERVALO_VIGIA segundos (padrão 10; 0 desliga), de modo que a nova
+versão costuma estar pronta antes do primeiro acesso. `situacao` informa a
+versão servida e há quanto tempo foi carregada. RECAP_ATUALIZACAO=sincrona
+volta à recarga dentro da requisição.
+
+Com RECAP_FONTE apontando para um banco SQLite alimentado por
+`recap.banco.ingerir`, as abas vêm do banco, e a versão de cada aba no banco
+faz o papel do hash da aba.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from recap.metricas import contar, span
+
+ARQUIVO = os.environ.get("RECAP_FONTE", "historico_recap.xlsx")
+LEITOR = os.environ.get("RECAP_LEITOR", "fluxo")
+PROCESSOS = int(os.environ.get("RECAP_PROCESSOS", "0")) or os.cpu_count() or 1
+EM_SEGUNDO_PLANO = os.environ.get("RECAP_ATUALIZACAO", "segundo_plano") == "segundo_plano"
+INTERVALO_VIGIA = float(os.environ.get("RECAP_INTERVALO_VIGIA", "10"))
+
+logger = logging.getLogger(__name__)
+
+# --- CACHE DO PROCESSO ---
+_lock = threading.Lock()
+_locks_carga = {}  # caminho absoluto -> lock da carga daquela planilha
+_cache = {}  # caminho absoluto -> {"stat", "hash", "hashes", "abas", "indice", "derivados", ...}
+_ao_recarregar = []  # funções chamadas (em segundo plano) com o caminho após cada recarga
+_atualizando = set()  # caminhos com uma nova versão sendo montada em segundo plano
+_falhas = {}  # caminho -> stat da última versão que não pôde ser lida
+_local = threading.local()
+_vigia = None
+_estatisticas = {
+    "acertos": 0,
+    "falhas": 0,
+    "abas_reaproveitadas": 0,
+    "abas_snapshot": 0,
+    "abas_xlsx": 0,
+}
+
+
+def _somar(estatistica, n=1):
+    with _lock:
+        _estatisticas[estatistica] += n
+
+
+def normalizar_colunas(df):
+    df.columns = df.columns.astype(str).str.strip().str.upper()
+    return df
+
+
+def _hash_arquivo(caminho):
+    from recap import banco
+
+    if banco.e_banco(caminho):
+        return banco.digest(caminho)
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _colunas():
+    from recap.indicadores import colunas_usadas
+
+    return colunas_usadas() if LEITOR == "fluxo" else {}
+
+
+def _hashes(caminho):
+    from recap import banco, xlsx
+
+    colunas = _colunas()
+    hashes = banco.hashes_abas(caminho) if banco.e_banco(caminho) else xlsx.hashes_abas(caminho)
+    for nome, h in hashes.items():
+        if nome in colunas:
+            hashes[nome] = hashlib.sha256(f"{h}:{sorted(colunas[nome])}".encode("utf-8")).hexdigest()
+    return hashes
+
+
+def _ler_xlsx(caminho, abas=None):
+    from recap import xlsx
+
+    with span("parse"):
+        if LEITOR == "fluxo":
+            lidas = xlsx.ler_abas(caminho, abas, _colunas(), processos=PROCESSOS)
+        else:
+            lidas = pd.read_excel(caminho, sheet_name=abas)
+    with span("normalize"):
+        return {nome: normalizar_colunas(df) for nome, df in lidas.items()}
+
+
+def _ler_planilha(caminho, digest, anterior):
+    from recap import banco, snapshot
+
+    with span("hash"):
+        hashes = _hashes(caminho)
+    abas = {}
+
+    if anterior is not None:
+        for nome, h in hashes.items():
+            if anterior["hashes"].get(nome) == h:
+                abas[nome] = anterior["abas"][nome]
+        _somar("abas_reaproveitadas", len(abas))
+
+    if banco.e_banco(caminho):
+        # o banco já é indexado: sem snapshot, só as abas com versão nova
+        pendentes = [nome for nome in hashes if nome not in abas]
+        with span("parse"):
+            abas.update(banco.ler_abas(caminho, pendentes))
+        return {nome: abas[nome] for nome in hashes}, hashes
+
+    pendentes = {nome: h for nome, h in hashes.items() if nome not in abas}
+    if pendentes:
+        with span("snapshot"):
+            do_snapshot = snapshot.carregar(caminho, pendentes)
+        abas.update(do_snapshot)
+        _somar("abas_snapshot", len(do_snapshot))
+
+    novas = {}
+    pendentes = [nome for nome in hashes if nome not in abas]
+    if pendentes:
+        logger.info("Lendo %d de %d abas de %s", len(pendentes), len(hashes), caminho)
+        novas = _ler_xlsx(caminho, pendentes)
+        abas.update(novas)
+        _somar("abas_xlsx", len(novas))
+
+    try:
+        with span("snapshot.gravar"):
+            snapshot.gravar(caminho, digest, hashes, abas)
+    except OSError as erro:
+        logger.warning("Não foi possível gravar o snapshot de %s: %s", caminho, erro)
+    return {nome: abas[nome] for nome in hashes}, hashes
+
+
+def _bytes_abas(abas, anterior):
+    """{aba: bytes do DataFrame}; abas reaproveitadas da versão anterior não são medidas de novo."""
+    medidas = {}
+    for nome, df in abas.items():
+        if anterior is not None and anterior["abas"].get(nome) is df:
+            medidas[nome] = anterior["bytes_abas"][nome]
+        else:
+            medidas[nome] = int(df.memory_usage(deep=True).sum())
+    return medidas
+
+
+def _nova_entrada(caminho, stat, digest, anterior):
+    abas, hashes = _ler_planilha(caminho, digest, anterior)
+    return {
+        "stat": stat,
+        "hash": digest,
+        "hashes": hashes,
+        "abas": abas,
+        "bytes_abas": _bytes_abas(abas, anterior),
+        "indice": _montar_indice(abas, hashes, anterior),
+        "derivados": {},
+        "construtores": {},
+        "lock_derivados": threading.RLock(),
+        "carregada_em": time.time(),
+    }
+
+
+def _stat(caminho):
+    st_arq = os.stat(caminho)
+    return st_arq.st_mtime_ns, st_arq.st_size
+
+
+def _lock_carga(caminho):
+    with _lock:
+        return _locks_carga.setdefault(caminho, threading.Lock())
+
+
+def _carregar(caminho):
+    caminho = os.path.abspath(caminho)
+    # durante uma atualização em segundo plano, a thread que monta a nova
+    # versão enxerga a nova versão (ver `_atualizar`)
+    em_construcao = getattr(_local, "entradas", {}).get(caminho)
+    if em_construcao is not None:
+        return em_construcao
+
+    stat = _stat(caminho)
+    with _lock_carga(caminho):
+        entrada = _cache.get(caminho)
+        if entrada is not None and entrada["stat"] == stat:
+            _somar("acertos")
+            contar("planilha", True)
+            return entrada
+
+        if entrada is not None and EM_SEGUNDO_PLANO:
+            # stale-while-revalidate: a versão anterior sai na hora
+            agendar_atualizacao(caminho)
+            _somar("acertos")
+            contar("planilha", True)
+            return entrada
+
+        # mtime mudou mas o conteúdo pode ser o mesmo (ex.: arquivo copiado de novo)
+        digest = _hash_arquivo(caminho)
+        if entrada is not None and entrada["hash"] == digest:
+            entrada["stat"] = stat
+            _somar("acertos")
+            contar("planilha", True)
+            return entrada
+
+        _somar("falhas")
+        contar("planilha", False)
+        entrada = _nova_entrada(caminho, stat, digest, entrada)
+        with _lock:
+            _cache[caminho] = entrada
+
+    for funcao in _ao_recarregar:
+        threading.Thread(target=funcao, args=(caminho,), daemon=True).start()
+    if EM_SEGUNDO_PLANO:
+        _iniciar_vigia()
+    return entrada
+
+
+# --- ATUALIZAÇÃO EM SEGUNDO PLANO ---
+def agendar_atualizacao(caminho):
+    """Monta a versão atual do arquivo numa thread, se ainda não houver uma montando."""
+    caminho = os.path.abspath(caminho)
+    with _lock:
+        if caminho in _atualizando:
+            return
+        _atualizando.add(caminho)
+    threading.Thread(target=_atualizar, args=(caminho,), daemon=True, name="recap-atualizacao").start()
+
+
+def _atualizar(caminho):
+    try:
+        # repete enquanto o arquivo mudar durante a montagem
+        while True:
+            try:
+                stat = _stat(caminho)
+            except OSError:
+                return
+            anterior = _cache.get(caminho)
+            if anterior is None or anterior["stat"] == stat or _falhas.get(caminho) == stat:
+                return
+            inicio = time.perf_counter()
+            try:
+                digest = _hash_arquivo(caminho)
+                if anterior["hash"] == digest:
+                    anterior["stat"] = stat
+                    continue
+                _somar("falhas")
+                nova = _nova_entrada(caminho, stat, digest, anterior)
+
+                # os artefatos que a versão anterior tinha, já calculados na nova
+                _local.entradas = {caminho: nova}
+                try:
+                    for nome, construir in list(anterior["construtores"].items()):
+                        derivado(nome, construir, caminho)
+                    for funcao in _ao_recarregar:
+                        funcao(caminho)
+                finally:
+                    _local.entradas = {}
+            except Exception:
+                # ex.: arquivo ainda sendo gravado; tenta de novo quando ele mudar
+                logger.exception("Falha ao atualizar %s; mantendo a versão anterior", caminho)
+                _falhas[caminho] = stat
+                return
+
+            with _lock_carga(caminho):
+                with _lock:
+                    _cache[caminho] = nova
+            logger.info(
+                "%s atualizado em segundo plano em %.2fs (versão %s)",
+                caminho, time.perf_counter() - inicio, digest[:12],
+            )
+    finally:
+        with _lock:
+            _atualizando.discard(caminho)
+
+
+def _vigiar():
+    while True:
+        time.sleep(INTERVALO_VIGIA)
+        with _lock:
+            entradas = list(_cache.items())
+        for caminho, entrada in entradas:
+            try:
+                if _stat(caminho) != entrada["stat"]:
+                    agendar_atualizacao(caminho)
+            except OSError:
+                pass
+
+
+def _iniciar_vigia():
+    global _vigia
+    with _lock:
+        if _vigia is not None or INTERVALO_VIGIA <= 0:
+            return
+        _vigia = threading.Thread(target=_vigiar, daemon=True, name="recap-vigia")
+    _vigia.start()
+
+
+def situacao(caminho=ARQUIVO):
+    """Versão servida do arquivo: hash, última semana, quando foi carregada e se há atualização em curso."""
+    caminho = os.path.abspath(caminho)
+    entrada = _cache.get(caminho)
+    if entrada is None:
+        return None
+    ultimos = [k for k in entrada["indice"]["indicadores"].values() if k and k.get("semana_id") is not None]
+    return {
+        "versao": entrada["hash"][:12],
+        "semana": max(ultimos, key=lambda k: k["semana_id"])["semana"] if ultimos else None,
+        "carregada_em": entrada["carregada_em"],
+        "idade_s": time.time() - entrada["carregada_em"],
+        "atualizando": caminho in _atualizando,
+    }
+
+
+def carregar_planilha(caminho=ARQUIVO):
+    """Retorna {aba: DataFrame} com as colunas já normalizadas.
+
+    Os DataFrames retornados são compartilhados entre sessões e não devem
+    ser alterados; use `carregar_aba` para obter uma cópia editável.
+    """
+    return _carregar(caminho)["abas"]
+
+
+def _montar_indice(abas, hashes, anterior):
+    from recap import kpis
+
+    with span("compute.indice"):
+        if anterior is None:
+            return kpis.montar_indice(abas)
+        alteradas = {nome for nome, h in hashes.items() if anterior["hashes"].get(nome) != h}
+        return kpis.montar_indice(abas, anterior["indice"], alteradas)
+
+
+def em_memoria(caminho=ARQUIVO):
+    """True se o arquivo pode ser servido da memória sem ler nada.
+
+    Com a atualização em segundo plano, uma versão anterior também conta:
+    ela é servida enquanto a nova é montada.
+    """
+    entrada = _cache.get(os.path.abspath(caminho))
+    if entrada is None:
+        return False
+    try:
+        return EM_SEGUNDO_PLANO or entrada["stat"] == _stat(caminho)
+    except OSError:
+        return False
+
+
+def carregar_aba(aba, caminho=ARQUIVO):
+    return carregar_planilha(caminho)[aba].copy()
+
+
+def versoes_abas(caminho=ARQUIVO):
+    """{aba: hash do conteúdo} da versão carregada (a versão da aba, no banco)."""
+    return dict(_carregar(caminho)["hashes"])
+
+
+def indice_kpi(caminho=ARQUIVO):
+    """Última linha válida de cada indicador do DASHBOARD (ver `recap.kpis`)."""
+    return _carregar(caminho)["indice"]
+
+
+def derivado(nome, construir, caminho=ARQUIVO):
+    """Artefato derivado da planilha, calculado uma vez por versão do arquivo.
+
+    `construir` recebe {aba: DataFrame} e o resultado fica guardado junto
+    com a versão carregada, sendo descartado quando a planilha muda.
+
+    Contrato: `construir` deve depender só dos dados da versão — das `abas`
+    recebidas ou de outros `derivado`/`carregar_*` do mesmo `caminho` — e nunca
+    de valores da sessão ou da requisição que o criou. A recarga em segundo
+    plano (`_atualizar`) reexecuta os construtores guardados contra a versão
+    nova, e o que eles capturarem de fora vazaria para ela.
+    """
+    entrada = _carregar(caminho)
+    with entrada["lock_derivados"]:
+        contar("derivado", nome in entrada["derivados"])
+        if nome not in entrada["derivados"]:
+            with span(f"compute.{nome.split(':')[0]}"):
+                entrada["derivados"][nome] = construir(entrada["abas"])
+            entrada["construtores"][nome] = construir
+        return entrada["derivados"][nome]
+
+
+def ao_recarregar(funcao):
+    """Registra `funcao(caminho)` para rodar em segundo plano após cada recarga."""
+    if funcao not in _ao_recarregar:
+        _ao_recarregar.append(funcao)
+
+
+def versao(caminho=ARQUIVO):
+    entrada = _cache.get(os.path.abspath(caminho))
+    return entrada["hash"] if entrada else None
+
+
+def bytes_em_cache():
+    """Memória ocupada pelos DataFrames das planilhas em cache (medida na carga de cada versão)."""
+    with _lock:
+        entradas = list(_cache.values())
+    return sum(sum(entrada["bytes_abas"].values()) for entrada in entradas)
+
+
+def estatisticas():
+    with _lock:
+        return dict(_estatisticas)
+
+
+def _preaquecer_graficos(caminho):
+    from recap import graficos
+
+    try:
+        graficos.preaquecer(caminho)
+    except Exception:
+        logger.exception("Falha ao pré-renderizar os gráficos de %s", caminho)
+
+
+def _verificar_alertas(caminho):
+    from recap import alertas
+
+    try:
+        alertas.verificar(caminho, em_segundo_plano=True)
+    except Exception:
+        logger.exception("Falha ao verificar os alertas de %s", caminho)
+
+
+if os.environ.get("RECAP_PREAQUECER") == "1":
+    ao_recarregar(_preaquecer_graficos)
+if os.environ.get("RECAP_ALERTAS"):
+    ao_recarregar(_verificar_alertas)
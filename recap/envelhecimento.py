@@ -0,0 +1,228 @@
+"""Envelhecimento da carteira de planejamento, por faixa de idade e semana.
+
+A aba CARTEIRA PLANEJAMENTO CAL COM não traz as ordens uma a uma, só o
+saldo semanal (SALDO EE) e o acumulado. A idade vem das coortes: o saldo
+positivo de uma semana entra na carteira como uma coorte com a data daquela
+semana, e o saldo negativo baixa as coortes mais antigas primeiro (FIFO).
+A carteira nunca fica negativa, então o acumulado reconstruído pode divergir
+do SALDO EE ACUMULADO da planilha quando ele passa abaixo de zero.
+
+Tudo sai de uma passada vetorizada: a matriz semana × coorte do que resta
+de cada coorte, as idades em `pd.cut` (categórico) e um `groupby` por
+semana e faixa. O resultado é um `dados.derivado`: calculado uma vez por
+versão da planilha e compartilhado por todos os usuários.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from recap.carteira import ABA_CARTEIRA
+from recap.dados import ARQUIVO, derivado
+from recap.metricas import execucao, painel_desenvolvedor, span
+from recap.status import avaliar_historico, datas_linhas
+
+ABA_TEMPO = "TEMPO DE PLANEJAMENTO"
+FAIXAS = [-np.inf, 7, 30, 90, np.inf]
+ROTULOS_FAIXAS = ["0–7 dias", "8–30 dias", "31–90 dias", ">90 dias"]
+PREFIXO_DISCIPLINA = "TOTAL PLANEJADAS "
+
+
+# --- COORTES ---
+def _semanas(df):
+    """Linhas da carteira com data e saldo, em ordem cronológica."""
+    semanas = pd.DataFrame({
+        "semana": df["SEMANA"].astype(str).to_numpy() if "SEMANA" in df.columns else "",
+        "data": datas_linhas(df),
+        "saldo": pd.to_numeric(df.get("SALDO EE"), errors="coerce"),
+    })
+    semanas = semanas[semanas["data"].notna() & semanas["saldo"].notna()]
+    return semanas.sort_values("data", kind="stable").reset_index(drop=True)
+
+
+def restantes(saldo):
+    """Matriz (semana, coorte) do que resta de cada coorte no fim de cada semana."""
+    saldo = np.asarray(saldo, dtype=float)
+    acumulado = np.cumsum(saldo)
+    # carteira com piso em zero: acumulado menos o menor acumulado até ali
+    carteira = acumulado - np.minimum(np.minimum.accumulate(acumulado), 0)
+    entradas = np.cumsum(np.maximum(saldo, 0))
+    saidas = entradas - carteira
+    antes = np.concatenate([[0.0], entradas[:-1]])
+    # coorte k na semana t: trecho [antes_k, entradas_k] ainda acima do que já saiu
+    topo = np.minimum(entradas[None, :], entradas[:, None])
+    base = np.maximum(antes[None, :], saidas[:, None])
+    return np.clip(topo - base, 0, None), carteira
+
+
+def faixas_por_semana(semanas):
+    """Carteira de cada semana por faixa de idade, com o total e a idade média (dias)."""
+    resto, carteira = restantes(semanas["saldo"])
+    datas = semanas["data"].to_numpy()
+    idades = (datas[:, None] - datas[None, :]) / np.timedelta64(1, "D")
+
+    linha, coorte = np.nonzero(resto > 0)
+    quantidades = resto[linha, coorte]
+    idade = idades[linha, coorte]
+    faixa = pd.cut(idade, FAIXAS, labels=ROTULOS_FAIXAS)
+    tabela = (
+        pd.DataFrame({"linha": linha, "faixa": faixa, "quantidade": quantidades})
+        .groupby(["linha", "faixa"], observed=False)["quantidade"].sum()
+        .unstack("faixa")
+        .reindex(range(len(semanas)), fill_value=0.0)
+    )
+    tabela.columns = list(tabela.columns.astype(str))
+    tabela.index.name = None
+
+    ponderada = np.bincount(linha, quantidades * idade, minlength=len(semanas))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(carteira > 0, ponderada / carteira, np.nan)
+    tabela.insert(0, "data", datas)
+    tabela.insert(0, "semana", semanas["semana"].to_numpy())
+    tabela["carteira"] = carteira
+    tabela["idade_media"] = media
+    return tabela
+
+
+# --- QUEBRAS ---
+def por_planejador(df):
+    """Concluídas por planejador e semana (colunas com um "PERF <nome>" ao lado)."""
+    nomes = [c for c in df.columns if f"PERF {c}" in df.columns]
+    if not nomes or "SEMANA" not in df.columns:
+        return pd.DataFrame(columns=["semana", "planejador", "concluidas"])
+    longo = df[["SEMANA", *nomes]].melt("SEMANA", var_name="planejador", value_name="concluidas")
+    longo["planejador"] = longo["planejador"].astype("category")
+    longo = longo.dropna(subset=["concluidas"]).rename(columns={"SEMANA": "semana"})
+    longo["semana"] = longo["semana"].astype(str)
+    return longo.reset_index(drop=True)
+
+
+def por_disciplina(df):
+    """Planejadas por disciplina e semana (colunas TOTAL PLANEJADAS <disciplina>)."""
+    colunas = [c for c in df.columns if c.startswith(PREFIXO_DISCIPLINA)]
+    if not colunas or "SEMANA" not in df.columns:
+        return pd.DataFrame(columns=["semana", "disciplina", "planejadas"])
+    longo = df[["SEMANA", *colunas]].melt("SEMANA", var_name="disciplina", value_name="planejadas")
+    longo["disciplina"] = longo["disciplina"].str.removeprefix(PREFIXO_DISCIPLINA).astype("category")
+    longo = longo.dropna(subset=["planejadas"]).rename(columns={"SEMANA": "semana"})
+    longo["semana"] = longo["semana"].astype(str)
+    return longo.reset_index(drop=True)
+
+
+def _resumo(longo, chave, campo):
+    return (
+        longo.groupby(chave, observed=True)[campo].agg(["sum", "mean"])
+        .rename(columns={"sum": "Total", "mean": "Média semanal"})
+    )
+
+
+def _correlacao(vinculo):
+    if vinculo is None or vinculo[["idade_media", "tempo_planejamento"]].dropna().shape[0] < 3:
+        return None
+    return vinculo["idade_media"].corr(vinculo["tempo_planejamento"])
+
+
+# --- MONTAGEM ---
+def montar_envelhecimento(abas, historico):
+    carteira = abas.get(ABA_CARTEIRA, pd.DataFrame())
+    tempo = abas.get(ABA_TEMPO, pd.DataFrame())
+    faixas = faixas_por_semana(_semanas(carteira)) if "SALDO EE" in carteira.columns else None
+
+    vinculo = None
+    if faixas is not None and ABA_TEMPO in historico:
+        serie = historico[ABA_TEMPO][["data", "valor"]].dropna()
+        vinculo = faixas[["semana", "data", "carteira", "idade_media"]].merge(
+            serie.rename(columns={"valor": "tempo_planejamento"}), on="data", how="left"
+        )
+    planejadores = por_planejador(carteira)
+    disciplinas = por_disciplina(tempo)
+    return {
+        "faixas": faixas,
+        "planejadores": planejadores,
+        "disciplinas": disciplinas,
+        "resumo_planejadores": _resumo(planejadores, "planejador", "concluidas"),
+        "resumo_disciplinas": _resumo(disciplinas, "disciplina", "planejadas"),
+        "tempo": vinculo,
+        "correlacao": _correlacao(vinculo),
+    }
+
+
+def envelhecimento(caminho=ARQUIVO):
+    return derivado(
+        "envelhecimento",
+        lambda abas: montar_envelhecimento(abas, derivado("historico", avaliar_historico, caminho)),
+        caminho,
+    )
+
+
+def figura(caminho=ARQUIVO):
+    """Figura da tendência (ver `interativo.figura_envelhecimento`), uma vez por versão da planilha."""
+    from recap.interativo import figura_envelhecimento
+
+    def construir(abas):
+        # refeita a partir da versão em construção, também na recarga em segundo plano
+        analise = envelhecimento(caminho)
+        return figura_envelhecimento(analise["faixas"], analise["tempo"])
+
+    return derivado("envelhecimento:figura", construir, caminho)
+
+
+# --- PÁGINA ---
+def renderizar_envelhecimento():
+    with execucao("ENVELHECIMENTO"):
+        _renderizar_envelhecimento()
+
+
+def _renderizar_envelhecimento():
+    import streamlit as st
+
+    from recap.telemetria import painel_memoria, painel_versao
+    from recap.unidades import seletor_unidade
+
+    st.set_page_config(page_title="Envelhecimento da Carteira", layout="wide", initial_sidebar_state="collapsed")
+    st.markdown("## Envelhecimento da Carteira de Planejamento")
+
+    _, caminho, _, _ = seletor_unidade()
+    if not os.path.exists(caminho):
+        st.error(f"❌ Arquivo '{caminho}' não encontrado.")
+        return
+    painel_versao(caminho)
+
+    analise = envelhecimento(caminho)
+    faixas = analise["faixas"]
+    if faixas is None or faixas.empty:
+        st.info(f"A aba '{ABA_CARTEIRA}' não tem SEMANA e SALDO EE preenchidos.")
+        return
+
+    # --- ÚLTIMA SEMANA ---
+    ultima = faixas.iloc[-1]
+    st.markdown(f"#### Semana {ultima['semana']} · carteira de {ultima['carteira']:.1f}")
+    for coluna, rotulo in zip(st.columns(len(ROTULOS_FAIXAS) + 1), [*ROTULOS_FAIXAS, "Idade média"]):
+        with coluna:
+            if rotulo in faixas.columns:
+                st.metric(rotulo, f"{ultima[rotulo]:.1f}")
+            else:
+                st.metric(rotulo, "-" if pd.isna(ultima["idade_media"]) else f"{ultima['idade_media']:.0f} dias")
+
+    # --- TENDÊNCIA E TEMPO DE PLANEJAMENTO ---
+    st.markdown("#### Faixas de idade por semana e Tempo de Planejamento")
+    with span("encode"):
+        st.plotly_chart(figura(caminho), width="stretch")
+    if analise["correlacao"] is not None:
+        correlacao = analise["correlacao"]
+        st.caption(f"Correlação entre a idade média da carteira e o Tempo de Planejamento: {correlacao:.2f}")
+
+    # --- QUEBRAS ---
+    col_planejador, col_disciplina = st.columns(2)
+    with col_planejador:
+        st.markdown("#### Concluídas por planejador")
+        st.dataframe(analise["resumo_planejadores"], width="stretch")
+    with col_disciplina:
+        st.markdown("#### Planejadas por disciplina")
+        if analise["disciplinas"].empty:
+            st.caption("Sem TOTAL PLANEJADAS por disciplina na planilha.")
+        else:
+            st.dataframe(analise["resumo_disciplinas"], width="stretch")
+
+    painel_memoria()
+    painel_desenvolvedor()
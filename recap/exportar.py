@@ -0,0 +1,206 @@
+"""Exportação estática do relatório semanal (HTML + PNG, sem Streamlit).
+
+    python -m recap.exportar [destino] [planilha]
+
+Gera um index.html com os cartões do DASHBOARD e uma página por indicador
+(cartão do KPI, resumo e gráfico de histórico), com o mesmo HTML do app
+(`recap.cartoes`) e os mesmos gráficos (`recap.graficos`). O resultado é
+autocontido: pode ser aberto direto do disco ou servido por qualquer servidor
+de arquivos estáticos. Por padrão vai para relatorio/<ano>-W<semana ISO>/.
+
+Cada página é renderizada num processo do pool (o matplotlib não é
+thread-safe), RECAP_PROCESSOS processos no máximo (padrão: um por CPU); a
+planilha é carregada antes de criar o pool e cada processo a reaproveita
+(por herança ou pelo snapshot), então o tempo total fica próximo ao da
+página mais lenta.
+"""
+import datetime
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from recap import graficos
+from recap.cartoes import (
+    caixa_resumo,
+    cartao_consolidado,
+    cartao_pagina,
+    consolidado,
+    status_gaveteiro,
+    texto_resumo,
+    ultimo_ponto,
+)
+from recap.dados import ARQUIVO, PROCESSOS, carregar_planilha, derivado, indice_kpi
+from recap.indicadores import GRUPO_CONTRATUAIS, grupos, indicador
+from recap.status import avaliar_historico
+
+logger = logging.getLogger(__name__)
+
+LOGO = "logo.png"
+
+_MODELO = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{titulo}</title>
+<style>
+  body {{ font-family: "Source Sans Pro", sans-serif; color: #31333f; max-width: 1200px; margin: 24px auto; padding: 0 16px; }}
+  a {{ color: #1f77b4; }}
+  .grade {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 16px 24px; }}
+  .pagina {{ display: grid; grid-template-columns: 2fr 1fr; gap: 24px; }}
+  img.grafico {{ width: 100%; }}
+  footer {{ color: #888; font-size: 12px; margin-top: 32px; }}
+</style>
+</head>
+<body>
+{corpo}
+<footer>Gerado em {gerado}</footer>
+</body>
+</html>
+"""
+
+
+def destino_padrao(hoje=None):
+    hoje = hoje or datetime.date.today()
+    return os.path.join("relatorio", hoje.strftime("%G-W%V"))
+
+
+def _arquivo(chave):
+    return "".join(c if c.isalnum() else "-" for c in chave.lower()) + ".html"
+
+
+def _gravar_imagem(destino, nome, png):
+    # nome com o hash do conteúdo: o pacote pode ir para um servidor com cache longo
+    arquivo = f"{nome}-{hashlib.sha256(png).hexdigest()[:10]}.png"
+    with open(os.path.join(destino, "img", arquivo), "wb") as f:
+        f.write(png)
+    return f"img/{arquivo}"
+
+
+def _gravar_html(destino, arquivo, titulo, corpo):
+    gerado = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
+    with open(os.path.join(destino, arquivo), "w", encoding="utf-8") as f:
+        f.write(_MODELO.format(titulo=titulo, corpo=corpo, gerado=gerado))
+
+
+# --- TAREFAS DO POOL ---
+def _iniciar(caminho):
+    carregar_planilha(caminho)
+
+
+def _pagina(chave, caminho, destino):
+    inicio = time.perf_counter()
+    ind = indicador(chave)
+    ultimo = ultimo_ponto(derivado("historico", avaliar_historico, caminho)[chave])
+    resumo = texto_resumo(ultimo)
+    imagem = _gravar_imagem(destino, _arquivo(chave)[:-5], graficos.imagem(chave, caminho=caminho))
+
+    logo = f'<img src="{LOGO}" width="{ind["logo"]}">' if ind["logo"] else ""
+    corpo = f"""<p><a href="index.html">← Indicadores Consolidados</a></p>
+{logo}
+<h2>{ind['titulo']}</h2>
+<div class="pagina">
+  <div>
+    <h4>{ind['titulo_grafico']}</h4>
+    <img class="grafico" src="{imagem}" alt="{ind['titulo_grafico']}">
+  </div>
+  <div>
+    <h4>Semana {ultimo['semana']}</h4>
+    {cartao_pagina(ind, ultimo)}
+    {caixa_resumo(resumo) if resumo else ""}
+  </div>
+</div>"""
+    _gravar_html(destino, _arquivo(chave), ind["titulo_aba"], corpo)
+    return chave, time.perf_counter() - inicio
+
+
+def _andaimes(andaimes, destino):
+    inicio = time.perf_counter()
+    fig = graficos.grafico_andaimes(andaimes)
+    try:
+        imagem = _gravar_imagem(destino, "andaimes", graficos.png(fig))
+    finally:
+        fig.clear()
+    return imagem, time.perf_counter() - inicio
+
+
+# --- PÁGINA CONSOLIDADA ---
+def _index(destino, caminho, paginas, imagem_andaimes):
+    indice = indice_kpi(caminho)
+    secoes = []
+    for titulo, indicadores in consolidado(indice, derivado("grupos", grupos, caminho)).items():
+        cartoes = []
+        for ind, cartao in indicadores:
+            nome = ind["nome"]
+            if ind["aba"] in paginas:
+                nome = f'<a href="{_arquivo(ind["aba"])}">{nome}</a>'
+            cartoes.append(f"<div><p style='font-size:18px; font-weight:bold'>{nome}</p>"
+                           f"{cartao_consolidado(**cartao)}</div>")
+        secoes.append(f"<h3>{titulo}</h3>\n<div class=\"grade\">{''.join(cartoes)}</div>")
+        if titulo == GRUPO_CONTRATUAIS:
+            secoes.append("<hr style='border: 1px solid #ccc;'>")
+
+    if indice["andaimes"] is not None:
+        secoes.append(f"""<hr style='border: 1px solid #ccc;'>
+<h3>Controle de Andaimes</h3>
+<div class="grade">
+  <div><p style='font-size:14px; font-weight:bold'>Inventário Andaimes</p>
+    <img class="grafico" src="{imagem_andaimes}" alt="Inventário Andaimes"></div>
+  <div><p style='font-size:14px; font-weight:bold'>Saldo Gaveteiro</p>
+    {cartao_consolidado(**status_gaveteiro(indice["andaimes"]), tamanho_meta=11)}</div>
+</div>""")
+
+    corpo = f'<img src="{LOGO}" width="200">\n<h2>Indicadores Consolidados</h2>\n' + "\n".join(secoes)
+    _gravar_html(destino, "index.html", "Dashboard Consolidado - KPIs", corpo)
+
+
+def exportar(destino=None, caminho=ARQUIVO, processos=PROCESSOS):
+    """Gera o pacote estático em `destino` e retorna {página: segundos}."""
+    destino = destino or destino_padrao()
+    # imagens de uma exportação anterior da mesma semana teriam outro hash
+    shutil.rmtree(os.path.join(destino, "img"), ignore_errors=True)
+    os.makedirs(os.path.join(destino, "img"))
+    if os.path.exists(LOGO):
+        shutil.copy(LOGO, os.path.join(destino, LOGO))
+
+    # carregada aqui uma vez; os processos do pool leem do snapshot
+    carregar_planilha(caminho)
+    historico = derivado("historico", avaliar_historico, caminho)
+    andaimes = indice_kpi(caminho)["andaimes"]
+
+    tempos = {}
+    # spawn: um fork copiaria locks das threads de `dados` (vigia, recarga) no meio do uso
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=processos, mp_context=contexto, initializer=_iniciar, initargs=(caminho,)
+    ) as pool:
+        tarefas = [pool.submit(_pagina, chave, caminho, destino) for chave in historico]
+        tarefa_andaimes = pool.submit(_andaimes, andaimes, destino) if andaimes else None
+        for tarefa in tarefas:
+            chave, segundos = tarefa.result()
+            tempos[chave] = segundos
+        imagem_andaimes = None
+        if tarefa_andaimes is not None:
+            imagem_andaimes, tempos["andaimes"] = tarefa_andaimes.result()
+
+    _index(destino, caminho, set(tempos), imagem_andaimes)
+    return tempos
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+    destino = sys.argv[1] if len(sys.argv) > 1 else destino_padrao()
+    origem = sys.argv[2] if len(sys.argv) > 2 else ARQUIVO
+
+    inicio = time.perf_counter()
+    tempos = exportar(destino, origem)
+    total = time.perf_counter() - inicio
+    for pagina, segundos in sorted(tempos.items(), key=lambda t: -t[1]):
+        logger.info("  %-24s %6.2fs", pagina, segundos)
+    logger.info("Relatório em %s: %d páginas em %.2fs (%d processos)", destino, len(tempos), total, PROCESSOS)
@@ -0,0 +1,408 @@
+"""Gráficos de histórico das páginas de indicadores.
+
+Recebem a série avaliada de um indicador (ver `status.avaliar_historico`)
+e a configuração do registro (ver `indicadores.indicador`).
+
+As imagens renderizadas ficam num cache LRU limitado em bytes, com chave
+(indicador, hash dos dados, tamanho da figura, sobreposição do controle
+estatístico): como o gráfico é determinístico dado o conteúdo da aba,
+uma nova renderização só acontece quando a planilha muda. Com
+RECAP_PREAQUECER=1 todos os gráficos são renderizados logo após cada
+recarga da planilha (ver `dados.ao_recarregar`).
+
+As figuras são criadas com `matplotlib.figure.Figure` (canvas Agg), fora do
+gerenciador global do pyplot, e liberadas logo após virar PNG; no máximo
+RECAP_MAX_FIGURAS figuras existem ao mesmo tempo. O matplotlib só é
+importado na primeira renderização: o DASHBOARD e as páginas no modo
+interativo não pagam por ele.
+"""
+import gc
+import hashlib
+import io
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from recap.dados import ARQUIVO, derivado
+from recap.indicadores import indicador
+from recap.metricas import contar, span
+from recap.status import avaliar_historico
+
+COR_SERIE = "#1f77b4"
+COR_FORA = "red"
+
+# mesmas opções que o st.pyplot usa ao converter a figura
+OPCOES_PNG = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+LIMITE_BYTES = int(os.environ.get("RECAP_CACHE_GRAFICOS_MB", "64")) * 1024 * 1024
+MAX_FIGURAS = int(os.environ.get("RECAP_MAX_FIGURAS", "1"))
+
+# --- CACHE DE IMAGENS ---
+_lock = threading.Lock()
+# o matplotlib não é thread-safe: por padrão, uma renderização por vez
+_orcamento_figuras = threading.BoundedSemaphore(MAX_FIGURAS)
+_figuras = weakref.WeakSet()
+_imagens = OrderedDict()  # (aba, hash dos dados, tamanho, controle) -> bytes PNG
+_bytes = 0
+_estatisticas = {"acertos": 0, "falhas": 0, "descartes": 0}
+
+
+def nova_figura(tamanho):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=tamanho, facecolor='white')
+    _figuras.add(fig)
+    return fig, fig.subplots()
+
+
+def figuras_vivas():
+    return len(_figuras)
+
+
+def camada_rotulos(ax, x, y, textos, tamanho=8, cor='black'):
+    """Desenha todos os rótulos como uma única PathCollection.
+
+    Cada texto vira um contorno (em pontos) centralizado horizontalmente em
+    x e com a base em y (coordenadas do eixo). Evita um `ax.text` por ponto, cujo
+    custo de layout cresce com o tamanho do histórico.
+    """
+    from matplotlib.collections import PathCollection
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextPath
+    from matplotlib.transforms import Affine2D
+
+    fonte = FontProperties(size=tamanho)
+    contornos = {}
+    caminhos = []
+    for texto in textos:
+        if texto not in contornos:
+            contorno = TextPath((0, 0), texto, prop=fonte)
+            limites = contorno.get_extents()
+            contornos[texto] = contorno.transformed(
+                Affine2D().translate(-(limites.x0 + limites.width / 2), 0)
+            )
+        caminhos.append(contornos[texto])
+
+    colecao = PathCollection(
+        caminhos,
+        offsets=np.column_stack([x, y]),
+        offset_transform=ax.transData,
+        # contornos em pontos -> polegadas -> pixels, acompanhando o dpi do savefig
+        transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+        facecolors=cor,
+        edgecolors='none',
+    )
+    ax.add_collection(colecao, autolim=False)
+    return colecao
+
+
+def camada_barras(ax, x, alturas, largura, cor, rotulo=None):
+    """Barras verticais como uma única PolyCollection (em vez de um Rectangle por barra)."""
+    from matplotlib.collections import PolyCollection
+
+    x = np.asarray(x, dtype=float)
+    alturas = np.asarray(alturas, dtype=float)
+    esquerda, direita = x - largura / 2, x + largura / 2
+    base = np.zeros_like(alturas)
+    vertices = np.stack([
+        np.column_stack([esquerda, base]),
+        np.column_stack([esquerda, alturas]),
+        np.column_stack([direita, alturas]),
+        np.column_stack([direita, base]),
+    ], axis=1)
+    colecao = PolyCollection(vertices, facecolors=cor, edgecolors='none', label=rotulo)
+    # como no ax.bar: o eixo y começa exatamente em zero, sem margem
+    colecao.sticky_edges.y.append(0)
+    ax.add_collection(colecao)
+    ax.autoscale_view()
+    return colecao
+
+
+def _rotulos_numericos(valores, sufixo):
+    return np.char.add(np.char.mod("%.1f", valores), sufixo)
+
+
+def _meta_atual(serie):
+    validos = serie[serie["valido"]]
+    linha = validos.iloc[-1] if len(validos) else serie.iloc[-1]
+    return linha["meta"], linha["meta_fmt"]
+
+
+def _rotulos_fill(ind):
+    if ind["tipo"] == "maior":
+        return "Acima da Meta", "Abaixo da Meta"
+    return "Abaixo da Meta", "Acima da Meta"
+
+
+def _extensao_tendencia(controle):
+    """Posições e valores da reta de tendência da última linha com valor até o fim do mês."""
+    serie, projecao = controle
+    if projecao is None or not projecao["passos"]:
+        return None
+    linha = serie.iloc[projecao["linha"]]
+    passos = np.arange(projecao["passos"] + 1)
+    return projecao["linha"] + passos, linha["tendencia"] + np.nan_to_num(linha["inclinacao"]) * passos
+
+
+def rotulo_projecao(projecao, ind):
+    """Texto da projeção do mês (valor fechado pela regra do indicador e chance de cumprir a meta)."""
+    sufixo = "%" if ind["unidade"] == "%" else ""
+    texto = f"Projeção {projecao['mes']}: {projecao['valor']:.1f}{sufixo}"
+    if projecao["probabilidade"] == projecao["probabilidade"]:
+        texto += f" · P(meta) {projecao['probabilidade']:.0%}"
+    return texto
+
+
+def camada_controle(ax, x, controle, ind):
+    """Média móvel, limites de controle, pontos fora de controle e a tendência até o fim do mês.
+
+    `controle` é (DataFrame alinhado à série, projeção do mês) de `recap.projecoes`.
+    Retorna os artistas com rótulo, para a legenda.
+    """
+    serie, projecao = controle
+    media = serie["media_movel"].to_numpy()
+    lsc, lic = serie["lsc"].to_numpy(), serie["lic"].to_numpy()
+    fora = serie["fora_controle"].to_numpy(dtype=bool)
+
+    artistas = [
+        ax.plot(x, media, color="#555555", linewidth=1, label="Média móvel")[0],
+        ax.plot(x, lsc, color="purple", linestyle=":", linewidth=1, label="Limites de controle (±3σ)")[0],
+    ]
+    ax.plot(x, lic, color="purple", linestyle=":", linewidth=1)
+    ax.fill_between(x, lic, lsc, color="purple", alpha=0.05, linewidth=0)
+    if fora.any():
+        artistas.append(ax.plot(x[fora], serie["valor"].to_numpy()[fora], linestyle="none", marker="x",
+                                color=COR_FORA, markersize=7, label="Fora de controle")[0])
+
+    extensao = _extensao_tendencia(controle)
+    if extensao is not None:
+        artistas.append(ax.plot(*extensao, color="black", linestyle="--", linewidth=1, marker="D",
+                                markevery=[-1], markersize=4, label=rotulo_projecao(projecao, ind))[0])
+    elif projecao is not None:
+        artistas.append(ax.plot([], [], linestyle="none", label=rotulo_projecao(projecao, ind))[0])
+    return artistas
+
+
+def grafico_area(serie, ind, controle=None):
+    fig, ax = nova_figura(ind["tamanho"])
+
+    semanas = serie["x"].tolist()
+    valores = serie["valor"].to_numpy()
+    metas = serie["meta"].to_numpy()
+    ok = serie["ok"].to_numpy()
+    ameacas = serie["ameaca"].to_numpy()
+    meta, meta_fmt = _meta_atual(serie)
+
+    dentro_meta = np.where(ok, valores, metas)
+    fora_meta = np.where(ok, np.nan, valores)
+    rotulo_dentro, rotulo_fora = _rotulos_fill(ind)
+
+    ax.fill_between(semanas, dentro_meta, color=COR_SERIE, alpha=0.5, label=rotulo_dentro)
+    ax.fill_between(semanas, fora_meta, color=COR_FORA, alpha=0.3, label=rotulo_fora)
+    ax.plot(semanas, valores, color=COR_SERIE, marker='o', linewidth=1)
+
+    # posições numéricas das categorias do eixo x
+    x = np.asarray(ax.xaxis.convert_units(semanas), dtype=float)
+
+    com_ameaca = ~np.isnan(ameacas)
+    if com_ameaca.any():
+        ax.plot(x[com_ameaca], ameacas[com_ameaca], linestyle='none', marker='o', color="orange",
+                markersize=6, label=ind["rotulo_ameaca"])
+
+    if ind["rotulos_pontos"]:
+        sufixo = "%" if ind["unidade"] == "%" else ""
+        com_valor = ~np.isnan(valores)
+        camada_rotulos(ax, x[com_valor], valores[com_valor] + 1, _rotulos_numericos(valores[com_valor], sufixo),
+                       tamanho=8)
+
+    ax.axhline(y=meta, color='gray', linestyle='--', linewidth=1, label=f"Meta = {meta_fmt}")
+    if controle is not None:
+        camada_controle(ax, x, controle, ind)
+
+    ax.set_facecolor('white')
+    ax.set_ylabel(ind["rotulo_y"], color='black', fontsize=10)
+    ax.set_xlabel(ind["rotulo_x"], color='black', fontsize=10)
+
+    # Espaçamento entre rótulos do eixo X (por padrão, no máximo 10 rótulos)
+    step = ind["passo_x"] or max(1, len(semanas) // 10)
+    ax.set_xticks(range(0, len(semanas), step))
+    ax.set_xticklabels([semanas[i] for i in range(0, len(semanas), step)])
+
+    ax.tick_params(axis='x', colors='black', rotation=ind["rotacao_x"], labelsize=8)
+    ax.tick_params(axis='y', colors='black', labelsize=8)
+
+    if ind["y_auto"]:
+        extremos = np.append(valores[~np.isnan(valores)], meta)
+        ax.set_ylim(bottom=max(0, extremos.min() - 2), top=extremos.max() + 2)
+    elif ind["y_min"] is not None:
+        ax.set_ylim(bottom=ind["y_min"])
+
+    ax.legend(facecolor='white', edgecolor='black', labelcolor='black', fontsize=8)
+    ax.grid(True, linestyle=':', linewidth=0.5, color='lightgray')
+
+    fig.tight_layout()
+    return fig
+
+
+def grafico_barras(serie, ind, controle=None):
+    fig, ax = nova_figura(ind["tamanho"])
+
+    semanas = serie["x"].tolist()
+    valores = serie["valor"].to_numpy()
+    ameacas = serie["ameaca"].to_numpy()
+    meta, meta_fmt = _meta_atual(serie)
+    sufixo = "%" if ind["unidade"] == "%" else ""
+
+    x = np.arange(len(semanas))
+    largura = 0.6
+
+    # Barras principais (azul)
+    com_valor = ~np.isnan(valores)
+    legenda = [camada_barras(ax, x[com_valor], valores[com_valor], largura, COR_SERIE, ind["rotulo_serie"])]
+
+    # Barras de Ameaça (cinza claro), mais estreitas sobre as azuis
+    com_ameaca = ~np.isnan(ameacas)
+    if com_ameaca.any():
+        legenda.append(camada_barras(ax, x[com_ameaca], ameacas[com_ameaca], largura * 0.4, "#a9a9a9",
+                                     ind["rotulo_ameaca"]))
+
+    # Rótulos das barras principais e das de Ameaça numa única coleção
+    rotulos_x = np.concatenate([x[com_valor], x[com_ameaca]])
+    rotulos_y = np.concatenate([valores[com_valor], ameacas[com_ameaca]])
+    camada_rotulos(ax, rotulos_x, rotulos_y + 0.5, _rotulos_numericos(rotulos_y, sufixo), tamanho=7)
+
+    # Linha da meta
+    legenda.insert(0, ax.axhline(y=meta, color='gray', linestyle='--', linewidth=1.2, label=f"Meta ({meta_fmt})"))
+    if controle is not None:
+        legenda.extend(camada_controle(ax, x, controle, ind))
+
+    # Eixos e layout
+    ax.set_facecolor('white')
+    ax.set_ylabel(ind["rotulo_y"], fontsize=9, color='black')
+    ax.set_xlabel(ind["rotulo_x"], fontsize=9, color='black')
+    # no máximo ~10 rótulos no eixo x; `passo_x` vale como passo mínimo
+    passo = max(ind["passo_x"] or 1, -(-len(semanas) // 10))
+    ax.set_xticks(x[::passo])
+    ax.set_xticklabels(semanas[::passo], rotation=45, ha='right', fontsize=7)
+    ax.tick_params(axis='y', labelsize=7)
+
+    ax.legend(handles=legenda, fontsize=8, facecolor='white', edgecolor='black')
+
+    ax.grid(True, linestyle=':', linewidth=0.5, color='lightgray')
+    fig.tight_layout()
+    return fig
+
+
+def grafico_andaimes(andaimes):
+    """Rosca do inventário de andaimes (versão estática do gráfico do DASHBOARD)."""
+    fig, ax = nova_figura((4, 3.4))
+    fig.set_facecolor('#f5f5f5')
+    ax.pie([andaimes["em_campo"], andaimes["gaveteiro"]], colors=[COR_SERIE, "#6baed6"],
+           startangle=90, counterclock=False, wedgeprops={"width": 0.4})
+    ax.text(0, 0, f"{andaimes['inventario']:.0f} m", ha='center', va='center', fontsize=14)
+    ax.legend(["Em Campo", "Gaveteiro"], loc='upper center', bbox_to_anchor=(0.5, 0.02),
+              ncol=2, frameon=False, fontsize=9)
+    return fig
+
+
+def desenhar(serie, ind, controle=None):
+    if ind["grafico"] == "barras":
+        return grafico_barras(serie, ind, controle)
+    return grafico_area(serie, ind, controle)
+
+
+def hash_serie(serie, ind):
+    h = hashlib.sha256(pd.util.hash_pandas_object(serie, index=False).to_numpy().tobytes())
+    h.update(repr(sorted(ind.items())).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _hashes_series(abas, caminho):
+    historico = derivado("historico", avaliar_historico, caminho)
+    return {aba: hash_serie(serie, indicador(aba)) for aba, serie in historico.items()}
+
+
+def png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **OPCOES_PNG)
+    return buffer.getvalue()
+
+
+def _renderizar(serie, ind, controle=None):
+    with _orcamento_figuras:
+        with span("render"):
+            fig = desenhar(serie, ind, controle)
+        try:
+            with span("encode"):
+                imagem = png(fig)
+        finally:
+            # quebra as referências circulares figura <-> eixos <-> artistas
+            fig.clear()
+            del fig
+    # figura e canvas ainda se referenciam; só o coletor de ciclos as libera
+    if len(_figuras) > 4 * MAX_FIGURAS:
+        gc.collect()
+    return imagem
+
+
+def _em_cache(chave_cache, serie, ind, controle=lambda: None):
+    """PNG de `chave_cache` no cache LRU; `serie()` e `controle()` só são chamadas se for preciso renderizar."""
+    global _bytes
+
+    with _lock:
+        conteudo = _imagens.get(chave_cache)
+        if conteudo is not None:
+            _imagens.move_to_end(chave_cache)
+            _estatisticas["acertos"] += 1
+            contar("graficos", True)
+            return conteudo
+        _estatisticas["falhas"] += 1
+        contar("graficos", False)
+
+    conteudo = _renderizar(serie(), ind, controle())
+
+    with _lock:
+        if chave_cache not in _imagens:
+            _imagens[chave_cache] = conteudo
+            _bytes += len(conteudo)
+        while _bytes > LIMITE_BYTES and len(_imagens) > 1:
+            _, antigo = _imagens.popitem(last=False)
+            _bytes -= len(antigo)
+            _estatisticas["descartes"] += 1
+    return conteudo
+
+
+def imagem(chave, caminho=ARQUIVO, controle=False):
+    """PNG do gráfico de histórico do indicador `chave` (nome da aba).
+
+    Com `controle`, sobrepõe o SPC e a projeção do mês (ver `recap.projecoes`).
+    """
+    from recap.projecoes import sobreposicao
+
+    ind = indicador(chave)
+    hash_dados = derivado("hashes_series", lambda abas: _hashes_series(abas, caminho), caminho)[chave]
+    return _em_cache(
+        (chave, hash_dados, tuple(ind["tamanho"]), controle),
+        lambda: derivado("historico", avaliar_historico, caminho)[chave],
+        ind,
+        (lambda: sobreposicao(chave, caminho)) if controle else (lambda: None),
+    )
+
+
+def imagem_serie(serie, ind):
+    """PNG de um recorte ou rollup da série (ver `recap.periodos`), no mesmo cache."""
+    return _em_cache((ind["aba"], hash_serie(serie, ind), tuple(ind["tamanho"]), False), lambda: serie, ind)
+
+
+def preaquecer(caminho=ARQUIVO):
+    """Renderiza os gráficos de todos os indicadores da versão atual da planilha."""
+    for chave in derivado("historico", avaliar_historico, caminho):
+        imagem(chave, caminho)
+
+
+def estatisticas():
+    with _lock:
+        return {**_estatisticas, "imagens": len(_imagens), "bytes": _bytes}
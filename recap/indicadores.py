@@ -0,0 +1,204 @@
+"""Registro declarativo dos indicadores.
+
+Cada indicador é descrito uma única vez em `REGISTRO`, com o que o
+DASHBOARD (cartões) e a página do indicador (gráfico + KPI) precisam.
+Campos omitidos usam os valores de `PADRAO`. A ordem e a presença dos
+indicadores seguem a aba "LISTA DE INDICADORES" da planilha (ver
+`registro`); um indicador novo é só uma entrada a mais aqui e, se tiver
+página, um script de duas linhas em pages/.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+ABA_LISTA = "LISTA DE INDICADORES"
+
+GRUPO_CONTRATUAIS = "Indicadores Contratuais"
+GRUPO_CLIENTE = "Indicadores Cliente"
+
+PADRAO = {
+    "campo_meta": "META",
+    "unidade": "",
+    "lista": None,               # nome na LISTA DE INDICADORES, quando difere da aba
+    # --- página do indicador ---
+    "titulo_aba": None,          # page_title do Streamlit
+    "titulo": None,              # título da página
+    "logo": None,                # largura do logo no topo da página
+    "titulo_grafico": None,
+    "grafico": "area",           # "area" ou "barras"
+    "tamanho": (10, 5),
+    "ordenar_por": "SEMANA",     # "SEMANA" ou "DATA"
+    "eixo_x": "SEMANA",          # "SEMANA" ou "MÊS"
+    "rotulo_x": "Semana",
+    "rotulo_y": None,
+    "rotulo_serie": None,
+    "passo_x": None,             # None: no máximo 10 rótulos no eixo x
+    "rotacao_x": 60,
+    "y_min": None,
+    "y_auto": False,             # eixo y ajustado aos dados (± 2)
+    "rotulos_pontos": False,     # valor escrito sobre cada ponto
+    "campo_ameaca": None,
+    "rotulo_ameaca": "Ameaça Mês",
+    "rotulo_kpi": None,
+    "cor_ok": "#1f77b4",
+    "texto_fora": None,          # padrão: "Abaixo da meta" (maior) / "Acima da meta" (menor)
+    "campo_resumo": "DESCRIÇÃO DA META",
+    "rodape_meta": "",
+    "casas": 2,
+    "casas_meta": None,          # padrão: igual a "casas"
+    "agregacao": "ultimo",       # rollups por mês/trimestre/ano: "soma", "media" ou "ultimo"
+}
+
+# --- INDICADORES ---
+REGISTRO = {
+    "REALIZACAO SEMANAL": {
+        "nome": "Realização Semanal", "grupo": GRUPO_CONTRATUAIS,
+        "campo_valor": "REALIZAÇÃO  SEMANAL", "tipo": "maior", "unidade": "%",
+        "titulo_aba": "Dashboard Realização Semanal - RECAP",
+        "titulo": "Dashboard de Realização Semanal - RECAP",
+        "titulo_grafico": "Histórico de Realização Semanal",
+        "rotulo_y": "% Realização", "y_min": 70,
+        "campo_ameaca": "% AMEAÇAS INDICADOR MÊS", "rotulo_ameaca": "% Ameaça Mês",
+        "rotulo_kpi": "Realização Semanal", "agregacao": "media",
+    },
+    "TEMPO DE PLANEJAMENTO": {
+        "nome": "Tempo de Planejamento", "grupo": GRUPO_CONTRATUAIS,
+        "campo_valor": "TEMPO DE PLANEJAMENTO", "tipo": "menor", "unidade": " dias",
+        "titulo_aba": "Dashboard Tempo de Planejamento - RECAP",
+        "titulo": "Dashboard de Tempo de Planejamento - RECAP",
+        "titulo_grafico": "Histórico de Tempo de Planejamento",
+        "rotulo_y": "Tempo (dias)",
+        "campo_ameaca": "% AMEAÇAS INDICADOR MÊS",
+        "rotulo_kpi": "Tempo de Planejamento", "agregacao": "media",
+    },
+    "DISP.EQUIPAMENTOS": {
+        "nome": "Disp. Equipamentos", "grupo": GRUPO_CONTRATUAIS,
+        "campo_valor": "DISPONIBILIDADE", "tipo": "maior", "unidade": "%",
+    },
+    "IARI": {
+        "nome": "IARI", "grupo": GRUPO_CLIENTE,
+        "campo_valor": "% INDICADOR ATUAL", "tipo": "maior", "unidade": "%",
+        "titulo_aba": "Dashboard IARI - RECAP",
+        "titulo": "Dashboard de IARI - RECAP",
+        "titulo_grafico": "Histórico do IARI",
+        "grafico": "barras", "tamanho": (10, 6),
+        "rotulo_y": "% IARI", "rotulo_serie": "% IARI Atual",
+        "campo_ameaca": "% AMEÇAS INDICADOR MÊS", "rotulo_ameaca": "% Ameaça Mês",
+        "rotulo_kpi": "Percentual IARI",
+    },
+    "IAZF": {
+        "nome": "IAZF", "grupo": GRUPO_CLIENTE,
+        "campo_valor": "IMPACTO PREVISTO", "tipo": "maior", "unidade": "%",
+    },
+    "PFCEO": {
+        "nome": "PFCEO", "grupo": GRUPO_CLIENTE,
+        "campo_valor": "EQUIPAMENTOS NO PAINEL", "tipo": "menor",
+        "titulo_aba": "Dashboard PFCEO - RECAP",
+        "titulo": "Dashboard de PFCEO - RECAP",
+        "titulo_grafico": "Histórico de PFCEO",
+        "tamanho": (8, 4), "rotacao_x": 45, "passo_x": 3, "y_auto": True,
+        "rotulo_y": "Equipamentos no Painel",
+        "campo_ameaca": "% AMEAÇAS INDICADOR MÊS",
+        "rotulo_kpi": "Equipamentos no Painel",
+    },
+    "VAZAMENTOS GERAL": {
+        "nome": "Vazamentos Totais", "grupo": GRUPO_CLIENTE,
+        "campo_valor": "VAZAMENTOS TOTAIS", "tipo": "menor",
+        "titulo_aba": "Dashboard Vazamentos - RECAP",
+        "titulo": "Dashboard de Vazamentos - RECAP",
+        "titulo_grafico": "Histórico de Vazamentos",
+        "ordenar_por": "DATA", "rotulo_y": "Qtd. Vazamentos",
+        "rotulo_kpi": "Vazamentos na semana", "cor_ok": "green",
+        "campo_resumo": "RESUMO", "rodape_meta": "Menos é Melhor", "casas": 0,
+        "agregacao": "soma",
+    },
+    "VAZAMENTOS VC": {
+        "nome": "Vazamentos Vapor/Condens", "grupo": GRUPO_CLIENTE, "lista": "VAZAMENTO VC",
+        "campo_valor": "VAZAMENTOS VP", "tipo": "menor",
+        "titulo_aba": "Dashboard Vazamentos VC - RECAP",
+        "titulo": "Dashboard de Vazamentos VC - RECAP",
+        "titulo_grafico": "Histórico de Vazamentos VC",
+        "ordenar_por": "DATA", "rotulo_y": "Qtd. Vazamentos",
+        "rotulo_kpi": "Vazamentos na semana", "cor_ok": "green",
+        "rodape_meta": "Menos é Melhor", "casas": 0, "agregacao": "soma",
+    },
+    "DISP.PURGADORES": {
+        "nome": "Disp. Purgadores", "grupo": GRUPO_CLIENTE,
+        "campo_valor": "IDP", "tipo": "maior", "unidade": "%",
+        "titulo_aba": "Dashboard Disp. Purgadores",
+        "titulo": "Dashboard - Disponibilidade de Purgadores", "logo": 180,
+        "titulo_grafico": "Histórico de Disponibilidade",
+        "ordenar_por": "DATA", "eixo_x": "MÊS", "rotulo_x": "Mês",
+        "passo_x": 1, "rotacao_x": 45, "y_min": 70, "rotulos_pontos": True,
+        "rotulo_y": "Disponibilidade (%)",
+        "rotulo_kpi": "Disponibilidade Atual", "cor_ok": "green", "texto_fora": "Fora da meta",
+        "campo_resumo": None, "casas_meta": 0,
+    },
+}
+
+# --- CONTROLE DE ANDAIMES ---
+ANDAIMES = {
+    "aba": "CONTROLE DE ANDAIMES",
+    "campo_inventario": "IVENTARIO (LINEAR)",
+    "campo_em_campo": "EM CAMPO (LINEAR)",
+    "campo_gaveteiro": "SALDO GAVETEIRO LINEAR",
+    "campo_minimo": "MÍNIMO",
+}
+
+
+def indicador(chave):
+    """Configuração completa (com os padrões) do indicador `chave` (nome da aba)."""
+    ind = {**PADRAO, **REGISTRO[chave], "aba": chave}
+    ind["titulo"] = ind["titulo"] or ind["nome"]
+    ind["titulo_aba"] = ind["titulo_aba"] or ind["titulo"]
+    ind["titulo_grafico"] = ind["titulo_grafico"] or f"Histórico de {ind['nome']}"
+    ind["rotulo_y"] = ind["rotulo_y"] or ind["nome"]
+    ind["rotulo_kpi"] = ind["rotulo_kpi"] or ind["nome"]
+    ind["rotulo_serie"] = ind["rotulo_serie"] or ind["nome"]
+    if ind["texto_fora"] is None:
+        ind["texto_fora"] = "Abaixo da meta" if ind["tipo"] == "maior" else "Acima da meta"
+    if ind["casas_meta"] is None:
+        ind["casas_meta"] = ind["casas"]
+    return ind
+
+
+def colunas_usadas():
+    """{aba: colunas normalizadas} que o app lê de cada aba conhecida.
+
+    Abas fora do resultado (ex.: abas sem indicador registrado) são lidas
+    inteiras.
+    """
+    usadas = {ABA_LISTA: {"INDICADOR"}}
+    for chave in REGISTRO:
+        ind = indicador(chave)
+        campos = ("campo_valor", "campo_meta", "campo_ameaca", "campo_resumo")
+        usadas[chave] = {"SEMANA", "DATA"} | {ind[campo] for campo in campos if ind[campo]}
+    usadas[ANDAIMES["aba"]] = {"SEMANA", "DATA"} | {v for k, v in ANDAIMES.items() if k.startswith("campo_")}
+    return usadas
+
+
+def registro(abas=None):
+    """Indicadores configurados, na ordem da aba LISTA DE INDICADORES.
+
+    Sem `abas` (ou sem a aba de lista), segue a ordem de `REGISTRO`.
+    Indicadores listados na planilha mas sem configuração são apenas
+    registrados no log.
+    """
+    chaves = list(REGISTRO)
+    if abas is not None and ABA_LISTA in abas and "INDICADOR" in abas[ABA_LISTA].columns:
+        por_nome = {(REGISTRO[c].get("lista") or c): c for c in REGISTRO}
+        listados = abas[ABA_LISTA]["INDICADOR"].dropna().astype(str).str.strip()
+        ordem = [por_nome[n] for n in listados if n in por_nome]
+        faltando = [n for n in listados if n not in por_nome and n in abas]
+        if faltando:
+            logger.info("Indicadores sem configuração no registro: %s", ", ".join(faltando))
+        chaves = ordem + [c for c in chaves if c not in ordem]
+    return [indicador(c) for c in chaves]
+
+
+def grupos(abas=None):
+    """{grupo: [indicador, ...]} na ordem em que os grupos aparecem no DASHBOARD."""
+    saida = {GRUPO_CONTRATUAIS: [], GRUPO_CLIENTE: []}
+    for ind in registro(abas):
+        saida.setdefault(ind["grupo"], []).append(ind)
+    return saida
@@ -0,0 +1,298 @@
+"""Gráficos de histórico interativos (Plotly, desenhados no navegador).
+
+Alternativa aos PNGs de `recap.graficos`: o servidor só escolhe os pontos e
+monta a figura; o desenho fica no navegador. Históricos longos são reduzidos
+no servidor com LTTB (Largest-Triangle-Three-Buckets) para no máximo
+RECAP_PONTOS_GRAFICO pontos, então o custo e o tamanho da figura não crescem
+com o número de semanas. Ao selecionar um trecho do gráfico (seleção por
+caixa), a página redesenha só aquela janela, com resolução completa quando
+ela cabe no orçamento de pontos.
+
+O eixo x é a posição da linha na série completa (0..n-1), com os rótulos
+das semanas/meses como texto dos ticks; assim uma janela é só um intervalo
+de posições, com ou sem redução.
+"""
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+from recap.graficos import COR_FORA, COR_SERIE, _extensao_tendencia, _meta_atual, _rotulos_fill, rotulo_projecao
+
+PONTOS = int(os.environ.get("RECAP_PONTOS_GRAFICO", "400"))
+MAX_TICKS = 12
+
+
+# --- REDUÇÃO (LTTB) ---
+def lttb(x, y, limite):
+    """Índices dos pontos escolhidos pelo LTTB (sempre inclui o primeiro e o último).
+
+    Para cada balde, escolhe o ponto que forma o maior triângulo com o ponto
+    escolhido no balde anterior e a média do balde seguinte, preservando
+    picos e vales que uma amostragem regular perderia.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    bordas = np.linspace(1, n - 1, limite - 1).astype(int)
+    escolhidos = np.empty(limite, dtype=int)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+
+    a = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        prox_inicio, prox_fim = bordas[i + 1], (bordas[i + 2] if i + 2 < len(bordas) else n)
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        bx, by = x[inicio:fim], y[inicio:fim]
+        areas = np.abs((x[a] - media_x) * (by - y[a]) - (x[a] - bx) * (media_y - y[a]))
+        a = inicio + int(np.argmax(areas))
+        escolhidos[i + 1] = a
+    return escolhidos
+
+
+def amostrar(serie, janela=None, pontos=PONTOS):
+    """Linhas da série (com a coluna "pos") a enviar ao navegador.
+
+    `janela` é (primeira, última) posição inclusiva; sem ela, a série inteira.
+    Linhas sem valor ficam de fora da redução; os demais pontos de ameaça
+    seguem as linhas escolhidas.
+    """
+    serie = serie.assign(pos=np.arange(len(serie)))
+    if janela is not None:
+        inicio, fim = janela
+        serie = serie.iloc[max(0, inicio):fim + 1]
+
+    validos = serie[~np.isnan(serie["valor"].to_numpy())]
+    if len(validos) <= pontos:
+        return serie
+    indices = lttb(validos["pos"].to_numpy(), validos["valor"].to_numpy(), pontos)
+    return validos.iloc[indices]
+
+
+# --- FIGURA ---
+def _ticks(amostra, passo_x):
+    pos = amostra["pos"].to_numpy()
+    passo = max(passo_x or 1, -(-len(pos) // MAX_TICKS))
+    return pos[::passo].tolist(), amostra["x"].to_numpy()[::passo].tolist()
+
+
+def _rgba(cor, alfa):
+    if cor == COR_SERIE:
+        return f"rgba(31,119,180,{alfa})"
+    if cor == COR_FORA:
+        return f"rgba(255,0,0,{alfa})"
+    return cor
+
+
+def _tracos_area(amostra, ind):
+    pos = amostra["pos"].to_numpy()
+    valores = amostra["valor"].to_numpy()
+    ok = amostra["ok"].to_numpy()
+    ameacas = amostra["ameaca"].to_numpy()
+    rotulo_dentro, rotulo_fora = _rotulos_fill(ind)
+    dica = amostra["x"].to_numpy()
+
+    tracos = [
+        go.Scatter(x=pos, y=np.where(ok, valores, amostra["meta"].to_numpy()), name=rotulo_dentro,
+                   mode="none", fill="tozeroy", fillcolor=_rgba(COR_SERIE, 0.5), hoverinfo="skip"),
+        go.Scatter(x=pos, y=np.where(ok, np.nan, valores), name=rotulo_fora,
+                   mode="none", fill="tozeroy", fillcolor=_rgba(COR_FORA, 0.3), hoverinfo="skip"),
+    ]
+    sufixo = "%" if ind["unidade"] == "%" else ""
+    tracos.append(go.Scatter(
+        x=pos, y=valores, name=ind["rotulo_serie"], showlegend=False,
+        mode="lines+markers+text" if ind["rotulos_pontos"] else "lines+markers",
+        text=[f"{v:.1f}{sufixo}" if v == v else "" for v in valores] if ind["rotulos_pontos"] else None,
+        textposition="top center", line={"color": COR_SERIE, "width": 1.5},
+        customdata=dica, hovertemplate="%{customdata}: %{y:.1f}<extra></extra>",
+    ))
+
+    com_ameaca = ~np.isnan(ameacas)
+    if com_ameaca.any():
+        tracos.append(go.Scatter(
+            x=pos[com_ameaca], y=ameacas[com_ameaca], name=ind["rotulo_ameaca"], mode="markers",
+            marker={"color": "orange", "size": 8}, customdata=dica[com_ameaca],
+            hovertemplate="%{customdata}: %{y:.1f}<extra></extra>",
+        ))
+    return tracos
+
+
+def _tracos_barras(amostra, ind):
+    pos = amostra["pos"].to_numpy()
+    valores = amostra["valor"].to_numpy()
+    ameacas = amostra["ameaca"].to_numpy()
+    dica = amostra["x"].to_numpy()
+    modelo = "%{y:.1f}%" if ind["unidade"] == "%" else "%{y:.1f}"
+
+    tracos = [go.Bar(
+        x=pos, y=valores, name=ind["rotulo_serie"], width=0.6, marker_color=COR_SERIE,
+        texttemplate=modelo, textposition="outside", customdata=dica,
+        hovertemplate="%{customdata}: %{y:.1f}<extra></extra>",
+    )]
+    com_ameaca = ~np.isnan(ameacas)
+    if com_ameaca.any():
+        tracos.append(go.Bar(
+            x=pos[com_ameaca], y=ameacas[com_ameaca], name=ind["rotulo_ameaca"], width=0.24,
+            marker_color="#a9a9a9", texttemplate=modelo, textposition="outside",
+            customdata=dica[com_ameaca], hovertemplate="%{customdata}: %{y:.1f}<extra></extra>",
+        ))
+    return tracos
+
+
+def _tracos_controle(amostra, controle, ind):
+    """Média móvel, limites de controle, pontos fora de controle e tendência até o fim do mês."""
+    serie, projecao = controle
+    pos = amostra["pos"].to_numpy()
+    linhas = serie.iloc[pos]
+    dica = amostra["x"].to_numpy()
+    tracos = [
+        go.Scatter(x=pos, y=linhas["media_movel"], name="Média móvel", mode="lines",
+                   line={"color": "#555555", "width": 1}, customdata=dica,
+                   hovertemplate="Média móvel · %{customdata}: %{y:.1f}<extra></extra>"),
+        go.Scatter(x=pos, y=linhas["lic"], name="LIC", mode="lines", showlegend=False,
+                   line={"color": "purple", "dash": "dot", "width": 1}, hoverinfo="skip"),
+        go.Scatter(x=pos, y=linhas["lsc"], name="Limites de controle (±3σ)", mode="lines", fill="tonexty",
+                   fillcolor="rgba(128,0,128,0.05)", line={"color": "purple", "dash": "dot", "width": 1},
+                   hoverinfo="skip"),
+    ]
+    fora = linhas["fora_controle"].to_numpy(dtype=bool)
+    if fora.any():
+        tracos.append(go.Scatter(
+            x=pos[fora], y=linhas["valor"].to_numpy()[fora], name="Fora de controle", mode="markers",
+            marker={"color": COR_FORA, "symbol": "x", "size": 9}, customdata=dica[fora],
+            hovertemplate="Fora de controle · %{customdata}: %{y:.1f}<extra></extra>",
+        ))
+    if projecao is not None:
+        extensao = _extensao_tendencia(controle)
+        x, y = extensao if extensao is not None else ([], [])
+        tracos.append(go.Scatter(
+            x=x, y=y, name=rotulo_projecao(projecao, ind), mode="lines+markers",
+            line={"color": "black", "dash": "dash", "width": 1}, marker={"symbol": "diamond", "size": 6},
+            hovertemplate="Tendência: %{y:.1f}<extra></extra>",
+        ))
+    return tracos
+
+
+def figura(serie, ind, janela=None, pontos=PONTOS, controle=None):
+    """Figura Plotly do histórico do indicador, reduzida a no máximo `pontos` pontos.
+
+    Com `controle` (ver `projecoes.sobreposicao`), sobrepõe o SPC e a
+    tendência até o fim do mês.
+    """
+    amostra = amostrar(serie, janela, pontos)
+    meta, meta_fmt = _meta_atual(serie)
+
+    if ind["grafico"] == "barras":
+        tracos = _tracos_barras(amostra, ind)
+        rotulo_meta = f"Meta ({meta_fmt})"
+    else:
+        tracos = _tracos_area(amostra, ind)
+        rotulo_meta = f"Meta = {meta_fmt}"
+    if controle is not None:
+        tracos.extend(_tracos_controle(amostra, controle, ind))
+
+    pos = amostra["pos"].to_numpy()
+    limites = [pos.min() - 0.5, pos.max() + 0.5] if len(pos) else [0, 1]
+    extensao = _extensao_tendencia(controle) if controle is not None and janela is None else None
+    if extensao is not None:
+        limites[1] = max(limites[1], extensao[0][-1] + 0.5)
+    tracos.append(go.Scatter(
+        x=limites, y=[meta, meta], name=rotulo_meta, mode="lines",
+        line={"color": "gray", "dash": "dash", "width": 1}, hoverinfo="skip",
+    ))
+
+    fig = go.Figure(tracos)
+    tickvals, ticktext = _ticks(amostra, ind["passo_x"])
+    fig.update_xaxes(title=ind["rotulo_x"], tickvals=tickvals, ticktext=ticktext,
+                     tickangle=-ind["rotacao_x"], range=limites, showgrid=True, gridcolor="#eee")
+
+    eixo_y = {"title": ind["rotulo_y"], "showgrid": True, "gridcolor": "#eee"}
+    if ind["y_auto"]:
+        extremos = np.append(amostra["valor"].dropna().to_numpy(), meta)
+        eixo_y["range"] = [max(0, extremos.min() - 2), extremos.max() + 2]
+    elif ind["y_min"] is not None:
+        eixo_y["range"] = [ind["y_min"], None]
+    fig.update_yaxes(**eixo_y)
+
+    fig.update_layout(
+        barmode="overlay", plot_bgcolor="white", paper_bgcolor="white",
+        height=int(ind["tamanho"][1] * 80), margin={"l": 10, "r": 10, "t": 10, "b": 10},
+        legend={"bgcolor": "white", "bordercolor": "black", "borderwidth": 1},
+        font={"color": "black"}, uirevision=ind["aba"],
+    )
+    return fig
+
+
+def figura_comparacao(series, ind, pontos=PONTOS):
+    """Uma linha por unidade ({unidade: série avaliada}), cada uma reduzida a `pontos` pontos.
+
+    As unidades podem cobrir semanas diferentes, então o eixo x é o rótulo
+    da semana/mês (categorias em ordem), não a posição na série.
+    """
+    tracos, rotulos = [], set()
+    for unidade, serie in series.items():
+        amostra = amostrar(serie, None, pontos)
+        amostra = amostra[~np.isnan(amostra["valor"].to_numpy())]
+        rotulos.update(amostra["x"])
+        tracos.append(go.Scatter(
+            x=amostra["x"], y=amostra["valor"], name=unidade, mode="lines+markers",
+            marker={"size": 4}, hovertemplate=f"{unidade} · %{{x}}: %{{y:.1f}}<extra></extra>",
+        ))
+
+    fig = go.Figure(tracos)
+    fig.update_xaxes(title=ind["rotulo_x"], type="category", categoryorder="array",
+                     categoryarray=sorted(rotulos), nticks=MAX_TICKS,
+                     tickangle=-ind["rotacao_x"], showgrid=True, gridcolor="#eee")
+    fig.update_yaxes(title=ind["rotulo_y"], showgrid=True, gridcolor="#eee")
+    fig.update_layout(
+        plot_bgcolor="white", paper_bgcolor="white",
+        height=int(ind["tamanho"][1] * 80), margin={"l": 10, "r": 10, "t": 10, "b": 10},
+        legend={"bgcolor": "white", "bordercolor": "black", "borderwidth": 1},
+        font={"color": "black"}, uirevision=f"comparacao:{ind['aba']}",
+    )
+    return fig
+
+
+def janela_selecionada(evento):
+    """(primeira, última) posição da caixa selecionada no gráfico, ou None."""
+    caixas = (evento or {}).get("selection", {}).get("box") or []
+    if not caixas or not caixas[0].get("x"):
+        return None
+    x0, x1 = sorted(caixas[0]["x"][:2])
+    inicio, fim = int(np.ceil(x0)), int(np.floor(x1))
+    return (inicio, fim) if inicio < fim else None
+
+
+def figura_envelhecimento(faixas, tempo=None):
+    """Carteira por faixa de idade (barras empilhadas) e o Tempo de Planejamento no eixo da direita."""
+    from recap.envelhecimento import ROTULOS_FAIXAS
+
+    cores = ["#9ecae1", "#4292c6", "#f28e2b", COR_FORA]
+    tracos = [
+        go.Bar(x=faixas["semana"], y=faixas[rotulo], name=rotulo, marker_color=cor,
+               hovertemplate=f"{rotulo} · %{{x}}: %{{y:.1f}}<extra></extra>")
+        for rotulo, cor in zip(ROTULOS_FAIXAS, cores)
+    ]
+    if tempo is not None:
+        tracos.append(go.Scatter(
+            x=tempo["semana"], y=tempo["tempo_planejamento"], name="Tempo de Planejamento", yaxis="y2",
+            mode="lines+markers", line={"color": "black"}, marker={"size": 4}, connectgaps=True,
+            hovertemplate="Tempo de Planejamento · %{x}: %{y:.2f} dias<extra></extra>",
+        ))
+
+    fig = go.Figure(tracos)
+    fig.update_xaxes(title="Semana", type="category", nticks=MAX_TICKS, showgrid=True, gridcolor="#eee")
+    fig.update_layout(
+        barmode="stack", plot_bgcolor="white", paper_bgcolor="white",
+        yaxis={"title": "Carteira", "showgrid": True, "gridcolor": "#eee"},
+        yaxis2={"title": "Tempo (dias)", "overlaying": "y", "side": "right", "showgrid": False},
+        height=420, margin={"l": 10, "r": 10, "t": 10, "b": 10},
+        legend={"bgcolor": "white", "bordercolor": "black", "borderwidth": 1, "orientation": "h", "y": -0.2},
+        font={"color": "black"},
+    )
+    return fig
@@ -0,0 +1,105 @@
+"""Índice com a última linha válida de cada indicador do DASHBOARD.
+
+O índice é montado na carga da planilha (ver `recap.dados`) e guarda, por
+indicador, só o que os cartões consolidados mostram: valor, meta, semana e
+o valor anterior. Assim a página inicial não percorre o histórico das abas.
+`indice_das_ultimas` monta o mesmo índice lendo do xlsx (ou do banco, ver
+`recap.banco`) só o fim de cada aba.
+"""
+import math
+
+from recap.indicadores import ABA_LISTA, ANDAIMES, colunas_usadas, registro
+from recap.status import chave_semanas, ordem_semanas
+
+LINHAS_KPI = 20  # linhas do fim de cada aba lidas por `indice_das_ultimas`
+
+
+def _escalar(valor):
+    if valor is None:
+        return None
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+
+def _por_semana(df):
+    chave = chave_semanas(df)
+    ordem = ordem_semanas(chave)
+    return df.iloc[ordem], chave.iloc[ordem].reset_index(drop=True)
+
+
+def ultimo_valido(df, campo_valor, campo_meta):
+    df, chave = _por_semana(df)
+    validas = (df[campo_valor].notna() & df[campo_meta].notna()).to_numpy()
+    df, chave = df[validas], chave[validas]
+    if df.empty:
+        return None
+
+    ultimo = df.iloc[-1]
+    anterior = float(df[campo_valor].iloc[-2]) if len(df) > 1 else None
+    return {
+        "valor": float(ultimo[campo_valor]),
+        "meta": float(ultimo[campo_meta]),
+        "semana": _escalar(ultimo.get("SEMANA")),
+        "semana_id": _escalar(chave.iloc[-1]),
+        "anterior": anterior,
+    }
+
+
+def ultimo_andaimes(df):
+    df, chave = _por_semana(df)
+    linha = df.iloc[-1]
+    return {
+        "inventario": float(linha[ANDAIMES["campo_inventario"]]),
+        "em_campo": float(linha[ANDAIMES["campo_em_campo"]]),
+        "gaveteiro": float(linha[ANDAIMES["campo_gaveteiro"]]),
+        "minimo": float(linha[ANDAIMES["campo_minimo"]]),
+        "semana": _escalar(linha.get("SEMANA")),
+        "semana_id": _escalar(chave.iloc[-1]),
+    }
+
+
+def montar_indice(abas, anterior=None, alteradas=None):
+    """Monta o índice a partir de {aba: DataFrame}.
+
+    Com `anterior` e `alteradas` (conjunto de abas que mudaram), só as
+    entradas das abas alteradas são recalculadas.
+    """
+    def reaproveitar(aba):
+        return anterior is not None and alteradas is not None and aba not in alteradas
+
+    indicadores = {}
+    for ind in registro(abas):
+        if reaproveitar(ind["aba"]) and ind["aba"] in anterior["indicadores"]:
+            indicadores[ind["aba"]] = anterior["indicadores"][ind["aba"]]
+        elif ind["aba"] in abas:
+            indicadores[ind["aba"]] = ultimo_valido(abas[ind["aba"]], ind["campo_valor"], ind["campo_meta"])
+
+    if reaproveitar(ANDAIMES["aba"]):
+        andaimes = anterior["andaimes"]
+    elif ANDAIMES["aba"] in abas:
+        andaimes = ultimo_andaimes(abas[ANDAIMES["aba"]])
+    else:
+        andaimes = None
+
+    return {"indicadores": indicadores, "andaimes": andaimes}
+
+
+def indice_das_ultimas(caminho, linhas=LINHAS_KPI):
+    """Índice montado direto do xlsx, lendo só as últimas `linhas` linhas de cada aba.
+
+    Não depende da carga completa da planilha; um indicador sem linha
+    válida nesse trecho fica sem cartão (None).
+    """
+    from recap import banco, xlsx
+    from recap.dados import normalizar_colunas
+
+    if banco.e_banco(caminho):
+        return montar_indice(banco.ultimas(caminho, linhas))
+    colunas = colunas_usadas()
+    # a lista de indicadores vem inteira: ela define a ordem dos cartões
+    ultimas = {aba: linhas for aba in colunas if aba != ABA_LISTA}
+    abas = xlsx.ler_abas(caminho, list(colunas), colunas, ultimas)
+    return montar_indice({nome: normalizar_colunas(df) for nome, df in abas.items()})
@@ -0,0 +1,299 @@
+"""Instrumentação do caminho quente: spans por execução de página.
+
+Cada execução (rerun) do DASHBOARD ou de uma página é delimitada por
+`execucao` (ou `iniciar`/`finalizar`), e os trechos relevantes são medidos
+com `span` (parse, normalize, snapshot, compute.*, render, encode...) e
+`contar` (acertos e falhas de cache). O que acontece fora de uma execução
+(ex.: o pré-aquecimento em segundo plano) entra como página "-".
+
+Ao fim de cada execução:
+
+- uma linha JSON é registrada no logger `recap.metricas` (e gravada em
+  RECAP_METRICAS_LOG, se definido) com a página, a duração total, a soma
+  de cada span e os contadores de cache;
+- os histogramas em memória são atualizados. Com RECAP_METRICAS_PORTA
+  definida, eles ficam expostos em http://localhost:<porta>/metrics no
+  formato texto do Prometheus (recap_execucao_segundos e
+  recap_span_segundos por página, recap_cache_total por cache/resultado),
+  prontos para painéis de p50/p95 com histogram_quantile.
+
+A primeira execução do processo registra também o tempo desde o início do
+processo até ela terminar (tempo até a primeira renderização), exposto como
+recap_primeira_renderizacao_segundos junto com os tempos do aquecimento
+(recap_aquecimento_segundos, ver `recap.aquecimento`).
+
+Com RECAP_DEV=1, `painel_desenvolvedor` mostra na barra lateral os spans
+da execução atual e o p50/p95 recente da página.
+"""
+import collections
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+BALDES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENTES = 200  # execuções por página guardadas para o p50/p95 do painel
+PORTA = os.environ.get("RECAP_METRICAS_PORTA")
+ARQUIVO_LOG = os.environ.get("RECAP_METRICAS_LOG")
+DEV = os.environ.get("RECAP_DEV") == "1"
+
+_execucao = contextvars.ContextVar("recap_execucao", default=None)
+_lock = threading.Lock()
+_servidor = None
+
+
+def _desde_inicio_processo():
+    """Segundos desde o início do processo (Linux); fora dele, 0."""
+    try:
+        with open("/proc/self/stat") as f:
+            # campos após o nome do executável; starttime é o 22º campo
+            inicio = int(f.read().rsplit(")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+        with open("/proc/uptime") as f:
+            return max(0.0, float(f.read().split()[0]) - inicio)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+# relógio de parede do início do processo, para o tempo até a primeira renderização
+INICIO_PROCESSO = time.time() - _desde_inicio_processo()
+
+
+class Histograma:
+    def __init__(self, baldes=BALDES):
+        self.baldes = baldes
+        self.series = {}  # rótulos -> [contagens por balde..., soma, total]
+
+    def observar(self, rotulos, valor):
+        serie = self.series.setdefault(rotulos, [0] * len(self.baldes) + [0.0, 0])
+        for i, limite in enumerate(self.baldes):
+            if valor <= limite:
+                serie[i] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+    def texto(self, nome, chaves):
+        linhas = []
+        for rotulos, serie in sorted(self.series.items()):
+            base = ",".join(f'{k}="{_escapar(v)}"' for k, v in zip(chaves, rotulos))
+            for limite, contagem in zip(self.baldes, serie):
+                linhas.append(f'{nome}_bucket{{{base},le="{limite}"}} {contagem}')
+            linhas.append(f'{nome}_bucket{{{base},le="+Inf"}} {serie[-1]}')
+            linhas.append(f"{nome}_sum{{{base}}} {serie[-2]:.6f}")
+            linhas.append(f"{nome}_count{{{base}}} {serie[-1]}")
+        return linhas
+
+
+_execucoes = Histograma()
+_spans = Histograma()
+_cache = collections.Counter()  # (cache, resultado) -> total
+_recentes = collections.defaultdict(lambda: collections.deque(maxlen=RECENTES))
+_primeira = {}  # {"pagina", "segundos"} da primeira execução do processo
+_aquecimento = {}  # etapa -> segundos
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# --- COLETA ---
+class Execucao:
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.spans = collections.defaultdict(float)
+        self.cache = collections.Counter()
+        self.token = None
+
+
+def iniciar(pagina):
+    _iniciar_servidor()
+    execucao = Execucao(pagina)
+    execucao.token = _execucao.set(execucao)
+    return execucao
+
+
+def finalizar(execucao):
+    duracao = time.perf_counter() - execucao.inicio
+    _execucao.reset(execucao.token)
+    with _lock:
+        _execucoes.observar((execucao.pagina,), duracao)
+        _recentes[execucao.pagina].append(duracao)
+        primeira = not _primeira
+        if primeira:
+            _primeira.update(pagina=execucao.pagina, segundos=time.time() - INICIO_PROCESSO)
+
+    registro = {
+        "ts": time.time(),
+        "pagina": execucao.pagina,
+        "duracao_ms": round(duracao * 1000, 2),
+        "spans_ms": {nome: round(s * 1000, 2) for nome, s in execucao.spans.items()},
+        "cache": {f"{c}.{r}": n for (c, r), n in execucao.cache.items()},
+    }
+    if primeira:
+        registro["primeira_renderizacao_s"] = round(_primeira["segundos"], 3)
+    logger.info(json.dumps(registro, ensure_ascii=False))
+    return registro
+
+
+@contextlib.contextmanager
+def execucao(pagina):
+    atual = iniciar(pagina)
+    try:
+        yield atual
+    finally:
+        finalizar(atual)
+
+
+@contextlib.contextmanager
+def span(nome):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        atual = _execucao.get()
+        if atual is not None:
+            atual.spans[nome] += duracao
+        with _lock:
+            _spans.observar((atual.pagina if atual else "-", nome), duracao)
+
+
+def contar(cache, acerto):
+    resultado = "acerto" if acerto else "falha"
+    atual = _execucao.get()
+    if atual is not None:
+        atual.cache[(cache, resultado)] += 1
+    with _lock:
+        _cache[(cache, resultado)] += 1
+
+
+def atual():
+    return _execucao.get()
+
+
+def registrar_aquecimento(tempos):
+    """Tempos ({etapa: segundos}) do aquecimento na partida do servidor."""
+    with _lock:
+        _aquecimento.update(tempos)
+    logger.info(json.dumps({"aquecimento_s": {k: round(v, 3) for k, v in tempos.items()}}, ensure_ascii=False))
+
+
+def primeira_renderizacao():
+    """{"pagina", "segundos"} da primeira execução do processo, ou None."""
+    with _lock:
+        return dict(_primeira) or None
+
+
+def percentis(pagina):
+    """(p50, p95) das execuções recentes da página, em segundos."""
+    with _lock:
+        duracoes = sorted(_recentes.get(pagina, ()))
+    if not duracoes:
+        return None, None
+    return duracoes[len(duracoes) // 2], duracoes[min(len(duracoes) - 1, int(len(duracoes) * 0.95))]
+
+
+# --- EXPOSIÇÃO ---
+def texto_prometheus():
+    with _lock:
+        linhas = [
+            "# HELP recap_execucao_segundos Duração de cada execução (rerun) de página.",
+            "# TYPE recap_execucao_segundos histogram",
+            *_execucoes.texto("recap_execucao_segundos", ("pagina",)),
+            "# HELP recap_span_segundos Duração dos trechos instrumentados.",
+            "# TYPE recap_span_segundos histogram",
+            *_spans.texto("recap_span_segundos", ("pagina", "span")),
+            "# HELP recap_cache_total Consultas aos caches por resultado.",
+            "# TYPE recap_cache_total counter",
+        ]
+        for (cache, resultado), total in sorted(_cache.items()):
+            linhas.append(f'recap_cache_total{{cache="{cache}",resultado="{resultado}"}} {total}')
+        if _primeira:
+            linhas += [
+                "# HELP recap_primeira_renderizacao_segundos Do início do processo ao fim da primeira execução.",
+                "# TYPE recap_primeira_renderizacao_segundos gauge",
+                f'recap_primeira_renderizacao_segundos{{pagina="{_escapar(_primeira["pagina"])}"}} '
+                f'{_primeira["segundos"]:.6f}',
+            ]
+        if _aquecimento:
+            linhas += [
+                "# HELP recap_aquecimento_segundos Etapas do aquecimento na partida do servidor.",
+                "# TYPE recap_aquecimento_segundos gauge",
+            ]
+            for etapa, segundos in _aquecimento.items():
+                linhas.append(f'recap_aquecimento_segundos{{etapa="{_escapar(etapa)}"}} {segundos:.6f}')
+    return "\n".join(linhas) + "\n"
+
+
+class _Metricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        corpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def _iniciar_servidor():
+    global _servidor
+    if not PORTA or _servidor is not None:
+        return
+    with _lock:
+        if _servidor is not None:
+            return
+        try:
+            _servidor = ThreadingHTTPServer(("127.0.0.1", int(PORTA)), _Metricas)
+        except OSError as erro:
+            logger.warning("Endpoint de métricas indisponível na porta %s: %s", PORTA, erro)
+            _servidor = False
+            return
+        threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+
+
+def _configurar_log():
+    if ARQUIVO_LOG:
+        manipulador = logging.FileHandler(ARQUIVO_LOG, encoding="utf-8")
+        manipulador.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(manipulador)
+        logger.setLevel(logging.INFO)
+
+
+_configurar_log()
+
+
+# --- PAINEL ---
+def painel_desenvolvedor():
+    """Expander na barra lateral com os spans da execução atual (só com RECAP_DEV=1)."""
+    if not DEV:
+        return
+    import streamlit as st
+
+    execucao_atual = atual()
+    if execucao_atual is None:
+        return
+    with st.sidebar.expander("Desenvolvedor: tempos"):
+        decorrido = time.perf_counter() - execucao_atual.inicio
+        st.caption(f"Execução até aqui: {decorrido * 1000:.0f} ms")
+        for nome, segundos in sorted(execucao_atual.spans.items(), key=lambda s: -s[1]):
+            st.caption(f"{nome}: {segundos * 1000:.1f} ms")
+        for (cache, resultado), n in sorted(execucao_atual.cache.items()):
+            st.caption(f"cache {cache}: {n} {resultado}{'s' if n > 1 else ''}")
+        p50, p95 = percentis(execucao_atual.pagina)
+        if p50 is not None:
+            st.caption(f"Recentes: p50 {p50 * 1000:.0f} ms · p95 {p95 * 1000:.0f} ms")
+        primeira = primeira_renderizacao()
+        if primeira is not None:
+            st.caption(f"Primeira renderização do processo: {primeira['segundos']:.1f} s ({primeira['pagina']})")
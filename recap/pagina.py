@@ -0,0 +1,222 @@
+"""Página de histórico de um indicador (gráfico + KPI da última semana).
+
+Cada script em pages/ só chama `renderizar_pagina` com a aba do indicador;
+títulos, rótulos e o tipo de gráfico vêm do registro (`recap.indicadores`).
+O gráfico é o PNG de `recap.graficos` ou, com "Gráfico interativo" ligado na
+barra lateral (padrão vindo de RECAP_GRAFICOS=interativo), a figura Plotly de
+`recap.interativo`.
+
+Acima do gráfico ficam a granularidade (semana, mês, trimestre, ano) e o
+período exibido, servidos pelos rollups de `recap.periodos`.
+
+"Controle estatístico" na barra lateral (padrão vindo de RECAP_CONTROLE=1)
+sobrepõe ao histórico semanal completo a média móvel, os limites de
+controle e a tendência até o fim do mês, e mostra abaixo do cartão a
+projeção do mês com a chance de cumprir a meta (ver `recap.projecoes`).
+
+Com várias unidades (ver `recap.unidades`), a barra lateral escolhe a
+unidade exibida ou compara o indicador entre todas elas.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from recap.ativos import LOGO, exibir
+from recap.cartoes import caixa_resumo, cartao_pagina, texto_resumo, ultimo_ponto
+from recap.dados import derivado
+from recap.graficos import imagem, imagem_serie, rotulo_projecao
+from recap.indicadores import indicador
+from recap.interativo import PONTOS, figura, figura_comparacao, janela_selecionada
+from recap.metricas import execucao, painel_desenvolvedor, span
+from recap.periodos import GRANULARIDADES, posicoes, rollups
+from recap.projecoes import sobreposicao
+from recap.status import avaliar_historico
+from recap.telemetria import painel_memoria, painel_versao
+from recap.unidades import historico_consolidado, seletor_unidade
+
+INTERATIVO = os.environ.get("RECAP_GRAFICOS") == "interativo"
+CONTROLE = os.environ.get("RECAP_CONTROLE") == "1"
+
+
+def historico(caminho):
+    """Séries avaliadas de todos os indicadores, uma vez por versão da planilha."""
+    return derivado("historico", avaliar_historico, caminho)
+
+
+def figura_interativa(chave, caminho, janela=None, controle=False):
+    """Figura Plotly (já reduzida) do indicador.
+
+    O histórico completo fica em cache, uma vez por versão da planilha; a
+    figura de uma janela selecionada é montada na requisição, para o cache
+    não crescer com as seleções de cada usuário.
+    """
+    def montar(abas=None):
+        return figura(
+            historico(caminho)[chave], indicador(chave), janela,
+            controle=sobreposicao(chave, caminho) if controle else None,
+        )
+
+    if janela is not None:
+        return montar()
+    return derivado(f"interativo:{chave}:{PONTOS}:{controle}", montar, caminho)
+
+
+def seletor_periodo(chave, caminho):
+    """Granularidade e período escolhidos acima do gráfico.
+
+    Retorna (série, indicador) do rollup recortado, ou None quando a escolha
+    é o histórico completo por semana (o gráfico de sempre, já em cache).
+    """
+    ind = indicador(chave)
+    estado = f"periodo_{chave}"
+
+    def nova_escolha():
+        # a janela do gráfico interativo é uma posição na série exibida
+        st.session_state.pop(f"janela_{chave}", None)
+
+    col_granularidade, col_periodo = st.columns([1, 2])
+    with col_granularidade:
+        granularidade = st.radio(
+            "Granularidade", list(GRANULARIDADES), horizontal=True,
+            key=f"granularidade_{chave}", on_change=nova_escolha,
+        )
+    rollup = rollups(caminho)[chave][granularidade]
+    i, j = posicoes(rollup, *st.session_state.get(estado, (None, None)))
+
+    if len(rollup) > 1:
+        rotulos = rollup["x"].tolist()
+        with col_periodo:
+            a, b = st.select_slider(
+                "Período", options=range(len(rollup)), value=(i, max(i, j - 1)),
+                format_func=lambda k: rotulos[k], on_change=nova_escolha,
+            )
+        datas = rollup["data"]
+        # guardado em datas: vale para qualquer granularidade
+        inicio = datas.iloc[a] if a > 0 else None
+        fim = datas.iloc[b + 1] - pd.Timedelta(1) if b + 1 < len(rollup) else None
+        st.session_state[estado] = (inicio, fim)
+        i, j = a, b + 1
+
+    if granularidade == "Semana" and (i, j) == (0, len(rollup)):
+        return None
+    if granularidade != "Semana":
+        ind = {**ind, "rotulo_x": granularidade, "passo_x": None}
+    return rollup.iloc[i:j], ind
+
+
+def grafico_interativo(chave, caminho, recortada=None, controle=False):
+    # seleção por caixa no gráfico -> redesenha só aquele trecho (ver recap.interativo)
+    estado = f"janela_{chave}"
+    janela = st.session_state.get(estado)
+
+    if recortada is None:
+        fig = figura_interativa(chave, caminho, janela, controle)
+    else:
+        fig = figura(*recortada, janela)
+    with span("encode"):
+        evento = st.plotly_chart(
+            fig,
+            width="stretch",
+            on_select="rerun",
+            selection_mode="box",
+            key=f"grafico_{chave}_{janela}",
+        )
+    selecionada = janela_selecionada(evento)
+    if selecionada is not None:
+        st.session_state[estado] = selecionada
+        st.rerun()
+
+    if janela is not None and st.button("Ver histórico completo", key=f"completo_{chave}"):
+        del st.session_state[estado]
+        st.rerun()
+
+
+def comparacao(chave, planilhas):
+    """Gráfico com uma linha por unidade e o cartão da última semana de cada uma."""
+    ind = indicador(chave)
+    tabela = historico_consolidado(planilhas)
+    series = {
+        nome: serie.reset_index(drop=True)
+        for nome, serie in tabela[tabela["indicador"] == chave].groupby("unidade", sort=False)
+    }
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.markdown(f"#### {ind['titulo_grafico']} por unidade")
+        with span("encode"):
+            st.plotly_chart(figura_comparacao(series, ind), width="stretch")
+    with col2:
+        for nome, serie in series.items():
+            ultimo = ultimo_ponto(serie)
+            st.markdown(f"#### {nome} · Semana {ultimo['semana']}")
+            st.markdown(cartao_pagina(ind, ultimo), unsafe_allow_html=True)
+
+
+def renderizar_pagina(chave):
+    with execucao(chave):
+        _renderizar_pagina(chave)
+
+
+def _renderizar_pagina(chave):
+    ind = indicador(chave)
+
+    # --- CONFIGURAÇÃO GERAL ---
+    st.set_page_config(
+        page_title=ind["titulo_aba"],
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+
+    # --- TÍTULO DO DASHBOARD ---
+    if ind["logo"]:
+        exibir(LOGO, ind["logo"])
+    st.markdown(f"## {ind['titulo']}")
+
+    _, caminho, comparar, planilhas = seletor_unidade()
+    if not os.path.exists(caminho):
+        st.error(f"❌ Arquivo '{caminho}' não encontrado.")
+        return
+
+    painel_versao(caminho)
+
+    if comparar:
+        comparacao(chave, planilhas)
+        painel_memoria()
+        painel_desenvolvedor()
+        return
+
+    # --- DADOS JÁ AVALIADOS ---
+    ultimo = ultimo_ponto(historico(caminho)[chave])
+    resumo = texto_resumo(ultimo)
+
+    # --- LAYOUT EM COLUNAS ---
+    col1, col2 = st.columns([2, 1])
+
+    # --- GRÁFICO ---
+    with col1:
+        st.markdown(f"#### {ind['titulo_grafico']}")
+        recortada = seletor_periodo(chave, caminho)
+        controle = st.sidebar.toggle("Controle estatístico", value=CONTROLE, key="grafico_controle")
+        if st.sidebar.toggle("Gráfico interativo", value=INTERATIVO, key="grafico_interativo"):
+            grafico_interativo(chave, caminho, recortada, controle)
+        elif recortada is None:
+            st.image(imagem(chave, caminho=caminho, controle=controle), width="stretch")
+        else:
+            st.image(imagem_serie(*recortada), width="stretch")
+
+    # --- KPI + RESUMO ---
+    with col2:
+        st.markdown(f"#### Semana {ultimo['semana']}")
+
+        st.markdown(cartao_pagina(ind, ultimo), unsafe_allow_html=True)
+
+        if resumo:
+            st.markdown(caixa_resumo(resumo), unsafe_allow_html=True)
+
+        sobreposta = sobreposicao(chave, caminho) if controle else None
+        if sobreposta is not None and sobreposta[1] is not None:
+            st.caption(rotulo_projecao(sobreposta[1], ind))
+
+    painel_memoria()
+    painel_desenvolvedor()
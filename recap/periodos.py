@@ -0,0 +1,93 @@
+"""Rollups do histórico por semana, mês, trimestre e ano, e recortes por período.
+
+Os rollups de todos os indicadores são montados uma vez por versão da
+planilha (ver `dados.derivado`), a partir das séries já avaliadas (ver
+`status.avaliar_historico`), com a agregação do registro de cada indicador
+("agregacao"): soma para contagens (vazamentos), média para tempos e
+taxas semanais, último valor para percentuais de disponibilidade. A meta
+segue a mesma regra do valor; a ameaça e o resumo são os últimos do período.
+O status (ok, valor_fmt, meta_fmt) é reavaliado sobre os valores agregados.
+
+Cada rollup guarda o início de cada período num array ordenado: um recorte
+de datas vira duas buscas binárias e um `iloc`, sem refiltrar nem reagregar.
+"""
+import numpy as np
+import pandas as pd
+
+from recap.dados import ARQUIVO, derivado
+from recap.indicadores import indicador
+from recap.status import avaliar, avaliar_historico
+
+# granularidade -> frequência do pandas (None: as linhas da planilha)
+GRANULARIDADES = {"Semana": None, "Mês": "M", "Trimestre": "Q", "Ano": "Y"}
+
+
+def _rotulos(periodos, frequencia):
+    if frequencia == "M":
+        return periodos.strftime("%Y-%m")
+    if frequencia == "Q":
+        return periodos.strftime("%Y-T%q")
+    return periodos.strftime("%Y")
+
+
+def _agregar(grupos, coluna, regra):
+    if regra == "soma":
+        return grupos[coluna].sum(min_count=1)
+    if regra == "media":
+        return grupos[coluna].mean()
+    return grupos[coluna].last()
+
+
+def agregar(serie, ind, frequencia):
+    """Série avaliada reagregada por período, com as mesmas colunas e o início de cada período."""
+    serie = serie[serie["data"].notna()]
+    if frequencia is None:
+        return serie.sort_values("data", kind="stable").reset_index(drop=True)
+
+    periodos = serie["data"].dt.to_period(frequencia)
+    grupos = serie.groupby(periodos, sort=True)
+    valores = _agregar(grupos, "valor", ind["agregacao"]).to_numpy(dtype=float)
+    metas = _agregar(grupos, "meta", ind["agregacao"]).to_numpy(dtype=float)
+    indice = grupos.size().index
+
+    rollup = pd.DataFrame({"x": _rotulos(indice, frequencia)})
+    avaliacao = avaliar(
+        valores, metas, maior=ind["tipo"] == "maior", percentual=False,
+        unidades=ind["unidade"], casas=ind["casas"], casas_meta=ind["casas_meta"],
+    )
+    for campo, coluna in avaliacao.items():
+        rollup[campo] = coluna
+    rollup["ameaca"] = grupos["ameaca"].last().to_numpy(dtype=float)
+    rollup["semana"] = grupos["semana"].last().to_numpy()
+    rollup["semana_id"] = grupos["semana_id"].last().array
+    rollup["data"] = indice.start_time
+    rollup["resumo"] = grupos["resumo"].last().to_numpy()
+    return rollup[list(serie.columns)]
+
+
+def montar_rollups(historico):
+    """{aba: {granularidade: série agregada}} de todos os indicadores avaliados."""
+    return {
+        aba: {nome: agregar(serie, indicador(aba), frequencia) for nome, frequencia in GRANULARIDADES.items()}
+        for aba, serie in historico.items()
+    }
+
+
+def rollups(caminho=ARQUIVO):
+    return derivado(
+        "rollups", lambda abas: montar_rollups(derivado("historico", avaliar_historico, caminho)), caminho
+    )
+
+
+# --- RECORTES ---
+def posicoes(rollup, inicio=None, fim=None):
+    """(i, j) das linhas dos períodos que contêm as datas `inicio` e `fim` (j exclusivo)."""
+    datas = rollup["data"].to_numpy()
+    i = 0 if inicio is None else max(0, int(np.searchsorted(datas, np.datetime64(inicio), "right")) - 1)
+    j = len(datas) if fim is None else int(np.searchsorted(datas, np.datetime64(fim), "right"))
+    return i, max(i, j)
+
+
+def recorte(rollup, inicio=None, fim=None):
+    i, j = posicoes(rollup, inicio, fim)
+    return rollup.iloc[i:j]
@@ -0,0 +1,276 @@
+"""Controle estatístico (SPC) e projeção do fechamento do mês de cada indicador.
+
+Para cada linha do histórico avaliado (ver `status.avaliar_historico`), numa
+janela móvel das últimas RECAP_JANELA_SPC linhas (padrão 8):
+
+- média móvel e limites de controle de um gráfico de valores individuais
+  (média ± 3σ, com σ estimado pela amplitude móvel média / 1,128, a partir
+  de dois pares de linhas consecutivas com valor);
+- inclinação da reta de mínimos quadrados (tendência por linha) e o valor
+  da reta na própria linha;
+- `fora_controle`: valor fora dos limites da linha anterior.
+
+Todos os indicadores saem de uma única passada NumPy: as séries são
+concatenadas e cada soma móvel é uma diferença de somas acumuladas, com a
+janela presa ao início de cada série.
+
+A projeção do mês da última linha com valor estende a tendência pelas linhas
+que ainda faltam no mês (pelo espaçamento típico entre as datas) e fecha o
+mês com a mesma regra dos rollups (`agregacao`: soma, média ou último valor,
+ver `recap.periodos`), tanto para o valor quanto para a meta. A chance de
+cumprir a meta supõe os valores que faltam normais em torno da tendência,
+com o σ da janela.
+
+O resultado é um `dados.derivado`. Quando a planilha muda e as linhas
+antigas de um indicador não mudaram (semanas acrescentadas no fim), só as
+linhas novas são calculadas, com as últimas linhas da versão anterior como
+contexto da janela; o resto é reaproveitado.
+"""
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from recap.dados import ARQUIVO, derivado
+from recap.indicadores import indicador
+from recap.status import avaliar_historico
+
+JANELA = int(os.environ.get("RECAP_JANELA_SPC", "8"))
+SIGMAS = 3.0
+D2 = 1.128  # constante d2 da amplitude móvel de dois pontos
+CAMPOS = ["media_movel", "lsc", "lic", "sigma", "inclinacao", "tendencia", "fora_controle"]
+
+_lock = threading.Lock()
+_ultimos = {}  # caminho absoluto -> resultado da última versão montada
+
+
+# --- CONTROLE (SPC) ---
+def _soma_movel(valores, de):
+    """Soma de valores[de[t]:t + 1] para cada t (vazia quando de[t] > t)."""
+    acumulado = np.concatenate([[0.0], np.cumsum(valores)])
+    fim = np.arange(1, len(valores) + 1)
+    return acumulado[fim] - acumulado[np.minimum(de, fim)]
+
+
+def estatisticas(valores, tamanhos, origens=None, janela=JANELA):
+    """Estatísticas móveis de várias séries concatenadas em `valores`.
+
+    `tamanhos` é o número de linhas de cada série e `origens` a posição da
+    primeira linha de cada uma na série completa (para continuar um cálculo
+    a partir de um trecho final). Retorna {campo: array} alinhado a `valores`.
+    """
+    valores = np.asarray(valores, dtype=float)
+    tamanhos = np.asarray(tamanhos, dtype=int)
+    origens = np.zeros(len(tamanhos), dtype=int) if origens is None else np.asarray(origens, dtype=int)
+
+    t = np.arange(len(valores))
+    inicio = np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    x = (t - inicio + np.repeat(origens, tamanhos)).astype(float)
+    de = np.maximum(t - janela + 1, inicio)
+
+    valido = ~np.isnan(valores)
+    y = np.where(valido, valores, 0.0)
+    peso = valido.astype(float)
+    n = _soma_movel(peso, de)
+    sx, sy = _soma_movel(x * peso, de), _soma_movel(y, de)
+    sxx, sxy = _soma_movel(x * x * peso, de), _soma_movel(x * y, de)
+
+    # amplitude móvel: pares de linhas consecutivas da mesma série, ambas com valor
+    par = valido & np.concatenate([[False], valido[:-1]]) & (t > inicio)
+    amplitude = np.where(par, np.abs(y - np.concatenate([[0.0], y[:-1]])), 0.0)
+    n_pares, s_amplitude = _soma_movel(par.astype(float), de + 1), _soma_movel(amplitude, de + 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(n > 0, sy / n, np.nan)
+        sigma = np.where(n_pares >= 2, s_amplitude / n_pares / D2, np.nan)
+        denominador = n * sxx - sx * sx
+        inclinacao = np.where(denominador > 0, (n * sxy - sx * sy) / denominador, np.nan)
+        tendencia = np.where(np.isnan(inclinacao), media, media + inclinacao * (x - sx / n))
+
+    lsc, lic = media + SIGMAS * sigma, media - SIGMAS * sigma
+    primeira = t == inicio
+    lsc_anterior = np.where(primeira, np.nan, np.concatenate([[np.nan], lsc[:-1]]))
+    lic_anterior = np.where(primeira, np.nan, np.concatenate([[np.nan], lic[:-1]]))
+    return {
+        "media_movel": media,
+        "lsc": lsc,
+        "lic": lic,
+        "sigma": sigma,
+        "inclinacao": inclinacao,
+        "tendencia": tendencia,
+        "fora_controle": valido & ((valores > lsc_anterior) | (valores < lic_anterior)),
+    }
+
+
+def _reaproveitaveis(serie, anterior):
+    """Linhas iniciais de `serie` iguais às da versão anterior (0 se alguma mudou)."""
+    if anterior is None:
+        return 0
+    n = len(anterior)
+    if n > len(serie):
+        return 0
+    mesmos_valores = np.array_equal(serie["valor"].to_numpy()[:n], anterior["valor"].to_numpy(), equal_nan=True)
+    mesmas_datas = np.array_equal(serie["data"].to_numpy()[:n], anterior["data"].to_numpy(), equal_nan=True)
+    return n if mesmos_valores and mesmas_datas else 0
+
+
+def controle_series(historico, anteriores=None, janela=JANELA):
+    """{aba: DataFrame} com valor, data e os CAMPOS de cada linha do histórico.
+
+    Com `anteriores` (o resultado de uma versão anterior), as linhas que não
+    mudaram são reaproveitadas e só o fim de cada série é calculado.
+    """
+    anteriores = anteriores or {}
+    contexto = janela + 1  # a janela da linha anterior à primeira linha nova
+    trechos = {}
+    for aba, serie in historico.items():
+        feitas = _reaproveitaveis(serie, anteriores.get(aba))
+        desde = max(0, feitas - contexto)
+        trechos[aba] = (feitas, desde, serie.iloc[desde:])
+
+    calcular = {
+        aba: (feitas, desde, trecho) for aba, (feitas, desde, trecho) in trechos.items()
+        if not feitas or len(trecho) > feitas - desde
+    }
+    if calcular:
+        resultado = estatisticas(
+            np.concatenate([trecho["valor"].to_numpy(dtype=float) for _, _, trecho in calcular.values()]),
+            [len(trecho) for _, _, trecho in calcular.values()],
+            [desde for _, desde, _ in calcular.values()],
+            janela,
+        )
+
+    saida = {}
+    inicio = 0
+    for aba, (feitas, desde, trecho) in trechos.items():
+        if aba not in calcular:
+            saida[aba] = anteriores[aba]
+            continue
+        fatia = slice(inicio + feitas - desde, inicio + len(trecho))
+        novas = pd.DataFrame({
+            "valor": trecho["valor"].to_numpy(dtype=float)[feitas - desde:],
+            "data": trecho["data"].to_numpy()[feitas - desde:],
+            **{campo: coluna[fatia] for campo, coluna in resultado.items()},
+        })
+        saida[aba] = pd.concat([anteriores[aba], novas], ignore_index=True) if feitas else novas
+        inicio += len(trecho)
+    return saida
+
+
+# --- PROJEÇÃO DO MÊS ---
+def _normal_acumulada(z):
+    return 0.5 * (1 + np.vectorize(math.erf, otypes=[float])(np.asarray(z, dtype=float) / math.sqrt(2)))
+
+
+def _passo_dias(datas):
+    """Espaçamento típico (mediana, em dias) entre as linhas com data."""
+    diferencas = np.diff(np.sort(datas[~np.isnat(datas)])) / np.timedelta64(1, "D")
+    diferencas = diferencas[diferencas > 0]
+    return float(np.median(diferencas)) if len(diferencas) else 7.0
+
+
+def projetar(series, historico):
+    """{aba: projeção do fechamento do mês da última linha com valor (ou None)}."""
+    abas, partes = [], []
+    for aba, controle in series.items():
+        valido = ~np.isnan(controle["valor"].to_numpy()) & controle["data"].notna().to_numpy()
+        if not valido.any():
+            continue
+        i = int(np.flatnonzero(valido)[-1])
+        datas = controle["data"].to_numpy()
+        mes = pd.Timestamp(datas[i]).to_period("M")
+        no_mes = valido & (controle["data"].dt.to_period("M") == mes).to_numpy()
+        metas = historico[aba]["meta"].to_numpy(dtype=float)
+        ultima_meta = metas[valido & ~np.isnan(metas)]
+        fim = mes.end_time.normalize()
+        abas.append(aba)
+        partes.append((
+            mes, i, (fim - pd.Timestamp(datas[i])).days // _passo_dias(datas),
+            controle["valor"].to_numpy()[no_mes].sum(), no_mes.sum(),
+            np.nansum(metas[no_mes]), ultima_meta[-1] if len(ultima_meta) else np.nan,
+        ))
+    if not abas:
+        return {aba: None for aba in series}
+
+    inds = [indicador(aba) for aba in abas]
+    linhas = [series[aba].iloc[i] for aba, (_, i, *_) in zip(abas, partes)]
+    passos = np.array([p[2] for p in partes], dtype=float)
+    soma, n_mes = np.array([p[3] for p in partes]), np.array([p[4] for p in partes], dtype=float)
+    soma_metas, meta = np.array([p[5] for p in partes]), np.array([p[6] for p in partes], dtype=float)
+    ultimo = np.array([linha["valor"] for linha in linhas])
+    tendencia = np.array([linha["tendencia"] for linha in linhas])
+    inclinacao = np.nan_to_num(np.array([linha["inclinacao"] for linha in linhas]))
+    sigma = np.array([linha["sigma"] for linha in linhas])
+    regra = np.array([ind["agregacao"] for ind in inds])
+    maior = np.array([ind["tipo"] == "maior" for ind in inds])
+
+    # linhas que faltam no mês, pela reta da tendência
+    futuras = passos * tendencia + inclinacao * passos * (passos + 1) / 2
+    n_fim = n_mes + passos
+    valor = np.select(
+        [regra == "soma", regra == "media"],
+        [soma + futuras, (soma + futuras) / n_fim],
+        np.where(passos > 0, tendencia + inclinacao * passos, ultimo),
+    )
+    meta_mes = np.select(
+        [regra == "soma", regra == "media"],
+        [soma_metas + passos * meta, (soma_metas + passos * meta) / n_fim],
+        meta,
+    )
+    desvio = np.select(
+        [regra == "soma", regra == "media"],
+        [sigma * np.sqrt(passos), sigma * np.sqrt(passos) / n_fim],
+        np.where(passos > 0, sigma, 0.0),
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (valor - meta_mes) / desvio
+    acima = np.where(desvio > 0, 1 - _normal_acumulada(-z), (valor >= meta_mes).astype(float))
+    abaixo = np.where(desvio > 0, _normal_acumulada(-z), (valor <= meta_mes).astype(float))
+    probabilidade = np.where(maior, acima, abaixo)
+    probabilidade = np.where(np.isnan(meta_mes) | np.isnan(desvio) | np.isnan(valor), np.nan, probabilidade)
+
+    saida = {aba: None for aba in series}
+    for k, (aba, parte) in enumerate(zip(abas, partes)):
+        saida[aba] = {
+            "mes": str(parte[0]),
+            "linha": parte[1],
+            "passos": int(passos[k]),
+            "valor": float(valor[k]),
+            "meta": float(meta_mes[k]),
+            "desvio": float(desvio[k]),
+            "probabilidade": float(probabilidade[k]),
+        }
+    return saida
+
+
+# --- MONTAGEM ---
+def montar_controle(historico, anterior=None, janela=JANELA):
+    """{"series": {aba: DataFrame}, "projecoes": {aba: dict}} de todos os indicadores."""
+    series = controle_series(historico, anterior["series"] if anterior else None, janela)
+    return {"series": series, "projecoes": projetar(series, historico)}
+
+
+def controle(caminho=ARQUIVO):
+    """SPC e projeções da versão atual, a partir do resultado da versão anterior quando houver."""
+    chave = os.path.abspath(caminho)
+
+    def construir(abas):
+        with _lock:
+            anterior = _ultimos.get(chave)
+        resultado = montar_controle(derivado("historico", avaliar_historico, caminho), anterior)
+        with _lock:
+            _ultimos[chave] = resultado
+        return resultado
+
+    return derivado("controle", construir, caminho)
+
+
+def sobreposicao(chave, caminho=ARQUIVO):
+    """(DataFrame do SPC alinhado à série, projeção do mês) do indicador, para os gráficos."""
+    resultado = controle(caminho)
+    if chave not in resultado["series"]:
+        return None
+    return resultado["series"][chave], resultado["projecoes"][chave]
@@ -0,0 +1,166 @@
+"""Snapshot colunar (Arrow IPC) compilado a partir do historico_recap.xlsx.
+
+Cada aba vira um arquivo .arrow sem compressão, aberto com memory-map, de
+modo que vários workers do servidor compartilham as mesmas páginas pelo
+cache do sistema operacional. Os arquivos são nomeados pelo hash da aba
+(ver `recap.xlsx.hashes_abas`), então uma nova versão da planilha só grava
+as abas que mudaram; o manifest aponta cada aba para o seu arquivo. Cada
+planilha tem a sua subpasta (pelo nome do arquivo), de modo que várias
+planilhas na mesma pasta (ver `recap.unidades`) não disputam o manifest.
+
+Uso na linha de comando:
+
+    python -m recap.snapshot [historico_recap.xlsx]
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+
+import pyarrow as pa
+
+VERSAO_FORMATO = 2
+MANIFEST = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def pasta_snapshot(caminho):
+    caminho = os.path.abspath(caminho)
+    base = os.environ.get("RECAP_SNAPSHOT_DIR") or os.path.join(os.path.dirname(caminho), ".snapshot")
+    return os.path.join(base, os.path.splitext(os.path.basename(caminho))[0])
+
+
+def _ler_manifest(pasta):
+    try:
+        with open(os.path.join(pasta, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _para_arrow(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    # colunas com tipos misturados (ex.: número e texto na mesma coluna) viram texto
+    df = df.copy()
+    for coluna in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[coluna], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[coluna] = df[coluna].where(df[coluna].isna(), df[coluna].astype(str))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _arquivo_aba(h):
+    return f"{h[:24]}.arrow"
+
+
+def atualizado(caminho):
+    """True se o snapshot já corresponde ao arquivo atual (mesmo mtime e tamanho)."""
+    manifest = _ler_manifest(pasta_snapshot(caminho))
+    if manifest is None or manifest.get("versao_formato") != VERSAO_FORMATO:
+        return False
+    st_arq = os.stat(caminho)
+    origem = manifest.get("origem", {})
+    return origem.get("mtime_ns") == st_arq.st_mtime_ns and origem.get("tamanho") == st_arq.st_size
+
+
+def carregar(caminho, hashes):
+    """Lê do snapshot as abas de `hashes` ({aba: hash}) que estiverem atualizadas."""
+    pasta = pasta_snapshot(caminho)
+    manifest = _ler_manifest(pasta)
+    if manifest is None or manifest.get("versao_formato") != VERSAO_FORMATO:
+        return {}
+
+    abas = {}
+    for nome, h in hashes.items():
+        if manifest["abas"].get(nome, {}).get("hash") != h:
+            continue
+        try:
+            with pa.memory_map(os.path.join(pasta, _arquivo_aba(h)), "r") as fonte:
+                tabela = pa.ipc.open_file(fonte).read_all()
+        except (OSError, pa.ArrowInvalid) as erro:
+            logger.warning("Aba %s ilegível no snapshot, relendo do xlsx: %s", nome, erro)
+            continue
+        abas[nome] = tabela.to_pandas()
+    return abas
+
+
+def gravar(caminho, digest, hashes, abas):
+    """Atualiza o snapshot para a versão `digest` da planilha.
+
+    Só são gravadas as abas cujo arquivo ainda não existe no snapshot.
+    """
+    pasta = pasta_snapshot(caminho)
+    os.makedirs(pasta, exist_ok=True)
+
+    manifest = _ler_manifest(pasta)
+    arquivos = {_arquivo_aba(h) for h in hashes.values()}
+    existentes = set(os.listdir(pasta))
+    if (
+        manifest is not None
+        and manifest.get("versao_formato") == VERSAO_FORMATO
+        and manifest.get("origem", {}).get("hash") == digest
+        and arquivos <= existentes
+    ):
+        return
+
+    for nome, h in hashes.items():
+        arquivo = _arquivo_aba(h)
+        if arquivo in existentes:
+            continue
+        tabela = _para_arrow(abas[nome])
+        temporario = os.path.join(pasta, f".{arquivo}.tmp")
+        with pa.OSFile(temporario, "wb") as destino:
+            with pa.ipc.new_file(destino, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        os.replace(temporario, os.path.join(pasta, arquivo))
+        existentes.add(arquivo)
+
+    st_arq = os.stat(caminho)
+    manifest = {
+        "versao_formato": VERSAO_FORMATO,
+        "origem": {
+            "arquivo": os.path.basename(caminho),
+            "hash": digest,
+            "mtime_ns": st_arq.st_mtime_ns,
+            "tamanho": st_arq.st_size,
+        },
+        "abas": {nome: {"hash": h, "arquivo": _arquivo_aba(h)} for nome, h in hashes.items()},
+    }
+    fd, temporario = tempfile.mkstemp(dir=pasta, prefix=".manifest.")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.chmod(temporario, 0o644)
+    os.replace(temporario, os.path.join(pasta, MANIFEST))
+
+    # abas de versões anteriores; leitores com o mmap aberto não são afetados
+    for antigo in existentes - arquivos:
+        if antigo.endswith(".arrow"):
+            try:
+                os.remove(os.path.join(pasta, antigo))
+            except OSError:
+                pass
+
+
+def compilar(caminho):
+    from recap.dados import _hash_arquivo, _hashes, _ler_xlsx
+
+    digest = _hash_arquivo(caminho)
+    hashes = _hashes(caminho)
+    abas = _ler_xlsx(caminho, list(hashes))
+    gravar(caminho, digest, hashes, abas)
+    return digest, abas
+
+
+if __name__ == "__main__":
+    from recap.dados import ARQUIVO
+
+    origem = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO
+    digest, abas = compilar(origem)
+    print(f"Snapshot de {origem} ({digest[:12]}): {len(abas)} abas em {pasta_snapshot(origem)}")
@@ -0,0 +1,190 @@
+"""Motor de status dos indicadores.
+
+Normaliza valores, compara com a meta (tipo "maior" ou "menor") e formata
+o resultado para exibição, tudo sobre arrays NumPy: uma única chamada de
+`avaliar` cobre todos os indicadores e todas as semanas.
+"""
+import numpy as np
+import pandas as pd
+
+from recap.indicadores import registro
+
+COR_FORA = "red"
+
+
+def normalizar(valores, percentual):
+    """Percentuais guardados como fração (até 1,5) passam para a escala 0–100."""
+    valores = np.asarray(valores, dtype=float)
+    return np.where(percentual & (valores <= 1.5), valores * 100, valores)
+
+
+def formatar(valores, unidades, casas):
+    valores, unidades, casas = np.broadcast_arrays(
+        np.asarray(valores, dtype=float), np.asarray(unidades, dtype=str), np.asarray(casas, dtype=int)
+    )
+    numeros = np.empty(valores.shape, dtype=object)
+    for c in np.unique(casas):
+        selecao = casas == c
+        numeros[selecao] = np.char.mod(f"%.{c}f", valores[selecao])
+    textos = np.char.add(numeros.astype(str), unidades)
+    return np.where(np.isnan(valores), "–", textos)
+
+
+def avaliar(valores, metas, maior, percentual, unidades, casas, casas_meta):
+    """Avalia arrays alinhados (uma posição por indicador/semana)."""
+    valores = normalizar(valores, percentual)
+    metas = normalizar(metas, percentual)
+    valido = ~np.isnan(valores) & ~np.isnan(metas)
+    ok = valido & np.where(maior, valores >= metas, valores <= metas)
+    return {
+        "valor": valores,
+        "meta": metas,
+        "valido": valido,
+        "ok": ok,
+        "valor_fmt": formatar(valores, unidades, casas),
+        "meta_fmt": formatar(metas, unidades, casas_meta),
+    }
+
+
+def apresentacao(ok, cor_ok, texto_ok, texto_fora):
+    return {
+        "cor": np.where(ok, cor_ok, COR_FORA),
+        "emoji": np.where(ok, "✅", "⚠️"),
+        "status": np.where(ok, texto_ok, texto_fora),
+    }
+
+
+def _parametros(indicadores, tamanhos):
+    def repetir(campo, funcao=lambda x: x):
+        return np.repeat([funcao(ind[campo]) for ind in indicadores], tamanhos)
+
+    return {
+        "maior": repetir("tipo", lambda t: t == "maior"),
+        "percentual": repetir("unidade", lambda u: u == "%"),
+        "unidades": repetir("unidade"),
+        "casas": repetir("casas"),
+        "casas_meta": repetir("casas_meta"),
+    }
+
+
+def avaliar_kpis(indicadores, kpis, casas=2):
+    """Avalia de uma vez os cartões do DASHBOARD (um KPI por indicador).
+
+    `kpis` são as entradas do índice (ver `recap.kpis`) na mesma ordem de
+    `indicadores`.
+    """
+    parametros = _parametros(indicadores, np.ones(len(indicadores), dtype=int))
+    parametros["casas"] = parametros["casas_meta"] = np.full(len(indicadores), casas)
+    valores = [k["valor"] if k else np.nan for k in kpis]
+    metas = [k["meta"] if k else np.nan for k in kpis]
+    return avaliar(valores, metas, **parametros)
+
+
+def _numerico(df, coluna):
+    if coluna is None or coluna not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[coluna], errors="coerce").to_numpy(dtype=float)
+
+
+def _eixo_x(df, ind):
+    if ind["eixo_x"] == "MÊS":
+        return pd.to_datetime(df["DATA"]).dt.strftime("%Y-%m")
+    return df["SEMANA"].astype(str)
+
+
+# --- ÍNDICE DE SEMANAS ---
+def indice_semanas(semanas, datas=None):
+    """Chave inteira ano * 100 + semana ISO de cada SEMANA (Int64).
+
+    Aceita o número ano.semana da planilha (2025.1 é a semana 10, 2025.01 a
+    semana 1), "9/2025" e "2025-W09". Sem SEMANA legível, a chave vem da
+    semana ISO de `datas` (quando dadas); sem nenhuma das duas, fica vazia.
+    """
+    texto = pd.Series(semanas).astype(str).str.strip().reset_index(drop=True)
+    decimal = texto.str.extract(r"^(\d{4})\.(\d{1,2})")
+    barra = texto.str.extract(r"^(\d{1,2})/(\d{4})$")
+    iso = texto.str.extract(r"^(\d{4})-?[Ww](\d{1,2})$")
+    ano = pd.to_numeric(decimal[0].fillna(barra[1]).fillna(iso[0]))
+    semana = pd.to_numeric(decimal[1].str.ljust(2, "0").fillna(barra[0]).fillna(iso[1]))
+    chave = (ano * 100 + semana).where(semana.between(1, 53))
+    if datas is not None:
+        calendario = pd.DatetimeIndex(datas).isocalendar()
+        chave = chave.fillna(
+            pd.Series(calendario["year"].to_numpy(dtype=float) * 100 + calendario["week"].to_numpy(dtype=float))
+        )
+    return chave.astype("Int64")
+
+
+def chave_semanas(df):
+    """Índice de semanas das linhas de uma aba (SEMANA, ou a semana ISO de DATA)."""
+    datas = pd.to_datetime(df["DATA"], errors="coerce") if "DATA" in df.columns else None
+    semanas = df["SEMANA"] if "SEMANA" in df.columns else pd.Series(np.nan, index=df.index)
+    return indice_semanas(semanas, datas)
+
+
+def ordem_semanas(chave):
+    """Posições que ordenam as linhas pela chave da semana (estável; sem chave no fim)."""
+    valores = pd.array(chave, dtype="Int64").to_numpy(dtype="int64", na_value=np.iinfo(np.int64).max)
+    return np.argsort(valores, kind="stable")
+
+
+def data_da_semana(semanas):
+    """Segunda-feira da semana ISO de cada SEMANA (ver `indice_semanas`)."""
+    chave = indice_semanas(semanas).astype("string")
+    return pd.to_datetime(chave + "1", format="%G%V%u", errors="coerce")
+
+
+def datas_linhas(df):
+    """Data de cada linha da aba: DATA quando preenchida, senão a segunda-feira da SEMANA."""
+    datas = data_da_semana(df["SEMANA"]) if "SEMANA" in df.columns else pd.Series(pd.NaT, index=range(len(df)))
+    if "DATA" in df.columns:
+        reais = pd.to_datetime(df["DATA"], errors="coerce").reset_index(drop=True)
+        datas = reais.fillna(datas.reset_index(drop=True))
+    return datas.to_numpy(dtype="datetime64[ns]")
+
+
+def avaliar_historico(abas):
+    """Avalia o histórico completo de todos os indicadores registrados.
+
+    Retorna {aba: DataFrame} com uma linha por semana, na ordem de exibição
+    da página, e as colunas x, valor, meta, ameaca, valido, ok, valor_fmt
+    e meta_fmt. Valores percentuais já vêm na escala 0–100. `semana_id` é a
+    chave inteira da semana (ver `indice_semanas`), que também dá a ordem
+    das abas ordenadas por SEMANA.
+    """
+    indicadores = [ind for ind in registro(abas) if ind["aba"] in abas]
+    ordenados = []
+    for ind in indicadores:
+        df = abas[ind["aba"]].copy()
+        if ind["ordenar_por"] == "DATA":
+            df["DATA"] = pd.to_datetime(df["DATA"])
+            df = df.sort_values("DATA", kind="stable")
+        else:
+            df = df.iloc[ordem_semanas(chave_semanas(df))]
+        ordenados.append(df)
+
+    tamanhos = [len(df) for df in ordenados]
+    parametros = _parametros(indicadores, tamanhos)
+    valores = np.concatenate([_numerico(df, ind["campo_valor"]) for df, ind in zip(ordenados, indicadores)])
+    metas = np.concatenate([_numerico(df, ind["campo_meta"]) for df, ind in zip(ordenados, indicadores)])
+    ameacas = np.concatenate([_numerico(df, ind["campo_ameaca"]) for df, ind in zip(ordenados, indicadores)])
+
+    resultado = avaliar(valores, metas, **parametros)
+    resultado["ameaca"] = normalizar(ameacas, parametros["percentual"])
+
+    saida = {}
+    inicio = 0
+    for df, ind, n in zip(ordenados, indicadores, tamanhos):
+        fatia = slice(inicio, inicio + n)
+        serie = pd.DataFrame({campo: coluna[fatia] for campo, coluna in resultado.items()})
+        serie.insert(0, "x", _eixo_x(df, ind).to_numpy())
+        serie["semana"] = df["SEMANA"].astype(str).to_numpy()
+        serie["semana_id"] = chave_semanas(df).array
+        serie["data"] = datas_linhas(df)
+        if ind["campo_resumo"] and ind["campo_resumo"] in df.columns:
+            serie["resumo"] = df[ind["campo_resumo"]].to_numpy()
+        else:
+            serie["resumo"] = None
+        saida[ind["aba"]] = serie
+        inicio += n
+    return saida
@@ -0,0 +1,99 @@
+"""Telemetria de memória do processo do Streamlit.
+
+Serve para mostrar que a memória fica estável sob tráfego contínuo: número
+de figuras matplotlib vivas, bytes dos DataFrames e das imagens em cache e
+o RSS do processo. `painel_versao` mostra qual versão da planilha está
+sendo servida e há quanto tempo ela foi carregada.
+"""
+import os
+import sys
+
+
+def rss_bytes():
+    """RSS atual do processo (pico, quando /proc não está disponível; None se nenhum dos dois)."""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # só existe em POSIX
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def memoria():
+    from recap import dados
+
+    medidas = {
+        "rss_bytes": rss_bytes(),
+        "dataframes_bytes": dados.bytes_em_cache(),
+        "figuras_vivas": 0,
+        "figuras_pyplot": 0,
+        "graficos_bytes": 0,
+        "graficos_em_cache": 0,
+    }
+
+    # só inspeciona o matplotlib se alguma página já o carregou
+    if "recap.graficos" in sys.modules:
+        from recap import graficos
+
+        cache = graficos.estatisticas()
+        medidas["figuras_vivas"] = graficos.figuras_vivas()
+        medidas["graficos_bytes"] = cache["bytes"]
+        medidas["graficos_em_cache"] = cache["imagens"]
+    if "matplotlib.pyplot" in sys.modules:
+        medidas["figuras_pyplot"] = len(sys.modules["matplotlib.pyplot"].get_fignums())
+    return medidas
+
+
+def _mb(n):
+    if n < 1024 * 1024:
+        return f"{n / 1024:.0f} KB"
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def painel_memoria():
+    """Expander na barra lateral com a telemetria de memória."""
+    import streamlit as st
+
+    medidas = memoria()
+    with st.sidebar.expander("Telemetria de memória"):
+        rss = medidas["rss_bytes"]
+        st.caption(f"RSS do processo: {_mb(rss) if rss is not None else 'indisponível'}")
+        st.caption(f"DataFrames em cache: {_mb(medidas['dataframes_bytes'])}")
+        st.caption(
+            f"Gráficos em cache: {medidas['graficos_em_cache']} ({_mb(medidas['graficos_bytes'])})"
+        )
+        st.caption(
+            f"Figuras vivas: {medidas['figuras_vivas']} (pyplot: {medidas['figuras_pyplot']})"
+        )
+
+
+def _idade(segundos):
+    if segundos < 60:
+        return "agora"
+    if segundos < 3600:
+        return f"há {segundos // 60:.0f} min"
+    if segundos < 86400:
+        return f"há {segundos // 3600:.0f} h"
+    return f"há {segundos // 86400:.0f} dias"
+
+
+def painel_versao(caminho):
+    """Legenda na barra lateral com a semana, a versão e a idade dos dados servidos."""
+    import streamlit as st
+
+    from recap import dados
+
+    situacao = dados.situacao(caminho)
+    if situacao is None:
+        return
+    texto = f"Dados até a semana {situacao['semana']} · versão {situacao['versao'][:8]} · carregados {_idade(situacao['idade_s'])}"
+    if situacao["atualizando"]:
+        texto += " · nova versão sendo carregada…"
+    st.sidebar.caption(texto)
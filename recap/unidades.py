@@ -0,0 +1,136 @@
+"""Várias unidades com o mesmo conjunto de KPIs, uma planilha por unidade.
+
+RECAP_UNIDADES aponta para uma pasta com as planilhas (o nome de cada
+arquivo, sem extensão, é o nome da unidade) ou para um manifest JSON
+{"unidade": "caminho.xlsx"} (caminhos relativos ao manifest). Sem ela há
+uma única unidade, com a planilha padrão (`recap.dados.ARQUIVO`), e o app
+fica como sempre foi.
+
+`carregar_unidades` carrega todas as planilhas de uma vez: as que precisam
+ser lidas do xlsx são lidas em até RECAP_PROCESSOS processos (padrão: um
+por CPU), que gravam o snapshot de cada uma (ver `recap.snapshot`), e as
+threads do processo do Streamlit só abrem os snapshots. Assim o tempo de
+partida e de atualização acompanha o número de núcleos, não o de unidades.
+`historico_consolidado` junta o histórico avaliado de todas as unidades
+numa tabela com chave (unidade, indicador, semana).
+"""
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from recap import banco, dados, snapshot
+from recap.dados import ARQUIVO, PROCESSOS, carregar_planilha, derivado, em_memoria, versao
+from recap.metricas import span
+from recap.status import avaliar_historico
+
+ORIGEM = os.environ.get("RECAP_UNIDADES")
+EXTENSOES = (".xlsx", ".xlsm")
+COLUNAS = ["semana", "semana_id", "data", "x", "valor", "meta", "ameaca", "valido", "ok", "valor_fmt", "meta_fmt"]
+
+_lock = threading.Lock()
+_consolidados = {}  # ((unidade, versão), ...) -> DataFrame
+
+
+# --- DESCOBERTA ---
+def unidades(origem=ORIGEM):
+    """{unidade: caminho da planilha}, na ordem da pasta ou do manifest."""
+    if not origem:
+        return {os.path.splitext(os.path.basename(ARQUIVO))[0]: ARQUIVO}
+    if os.path.isdir(origem):
+        arquivos = sorted(
+            nome for nome in os.listdir(origem)
+            if nome.lower().endswith(EXTENSOES) and not nome.startswith("~$")
+        )
+        return {os.path.splitext(nome)[0]: os.path.join(origem, nome) for nome in arquivos}
+
+    with open(origem, encoding="utf-8") as f:
+        manifest = json.load(f)
+    pasta = os.path.dirname(os.path.abspath(origem))
+    return {str(nome): os.path.join(pasta, caminho) for nome, caminho in manifest.items()}
+
+
+# --- CARGA CONCORRENTE ---
+def _compilar(caminho):
+    # no processo do pool: lê o que mudou no xlsx e atualiza o snapshot; as
+    # abas são lidas em série, pois o pool de unidades já ocupa os núcleos
+    dados.PROCESSOS = 1
+    carregar_planilha(caminho)
+    return caminho
+
+
+def carregar_unidades(planilhas=None, processos=PROCESSOS):
+    """Carrega todas as planilhas existentes e retorna {unidade: caminho} delas."""
+    planilhas = {nome: c for nome, c in (planilhas or unidades()).items() if os.path.exists(c)}
+    pendentes = [c for c in planilhas.values() if not em_memoria(c)]
+    if not pendentes:
+        return planilhas
+
+    with span("unidades"):
+        # bancos (ver `recap.banco`) não passam pelo snapshot
+        desatualizadas = [c for c in pendentes if not banco.e_banco(c) and not snapshot.atualizado(c)]
+        if len(desatualizadas) > 1 and processos > 1:
+            with ProcessPoolExecutor(max_workers=min(processos, len(desatualizadas))) as pool:
+                list(pool.map(_compilar, desatualizadas))
+        with ThreadPoolExecutor(max_workers=min(len(pendentes), max(processos, 4))) as pool:
+            list(pool.map(carregar_planilha, pendentes))
+    return planilhas
+
+
+# --- VISÃO CONSOLIDADA ---
+def historico_consolidado(planilhas):
+    """Histórico avaliado de todas as unidades, uma linha por (unidade, indicador, semana).
+
+    Colunas: unidade, indicador e as de `status.avaliar_historico` (sem o
+    resumo). Fica em memória enquanto nenhuma das planilhas mudar.
+    """
+    chave = tuple((nome, versao(caminho)) for nome, caminho in planilhas.items())
+    with _lock:
+        if chave in _consolidados:
+            return _consolidados[chave]
+
+    partes = []
+    for nome, caminho in planilhas.items():
+        for aba, serie in derivado("historico", avaliar_historico, caminho).items():
+            parte = serie[COLUNAS].copy()
+            parte.insert(0, "indicador", aba)
+            parte.insert(0, "unidade", nome)
+            partes.append(parte)
+    if partes:
+        tabela = pd.concat(partes, ignore_index=True)
+    else:
+        tabela = pd.DataFrame(columns=["unidade", "indicador", *COLUNAS])
+
+    with _lock:
+        # só a versão mais recente do conjunto fica guardada
+        _consolidados.clear()
+        _consolidados[chave] = tabela
+    return tabela
+
+
+# --- SELETOR ---
+def seletor_unidade():
+    """Unidade escolhida na barra lateral e se as unidades devem ser comparadas.
+
+    Retorna (unidade, caminho, comparar, planilhas). Com uma única unidade
+    nada é mostrado. A escolha vale para o DASHBOARD e todas as páginas.
+    """
+    import streamlit as st
+
+    planilhas = carregar_unidades()
+    if len(planilhas) <= 1:
+        nome, caminho = next(iter(planilhas.items()), (None, ARQUIVO))
+        return nome, caminho, False, planilhas
+
+    nomes = list(planilhas)
+    atual = st.session_state.get("unidade")
+    unidade = st.sidebar.selectbox(
+        "Unidade", nomes, index=nomes.index(atual) if atual in nomes else 0
+    )
+    comparar = st.sidebar.toggle("Comparar unidades", value=st.session_state.get("comparar_unidades", False))
+    # chaves fora dos widgets: o estado dos widgets não sobrevive à troca de página
+    st.session_state["unidade"] = unidade
+    st.session_state["comparar_unidades"] = comparar
+    return unidade, planilhas[unidade], comparar, planilhas
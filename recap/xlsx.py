@@ -0,0 +1,342 @@
+"""Inspeção das partes internas do xlsx (um zip de XMLs).
+
+Permite saber quais abas mudaram entre duas versões da planilha sem
+abri-la com o openpyxl: cada aba recebe um hash calculado a partir do
+bloco <sheetData> do XML da aba (as células; larguras de coluna, seleção e
+aba ativa ficam de fora), com os índices de strings compartilhadas substituídos pelo
+texto correspondente e os índices de estilo substituídos pelo formato
+numérico da célula (o único atributo de estilo que muda o valor lido, pois
+decide o que é data). Assim uma string ou um estilo novo em outra aba, que
+desloca esses índices, não invalida esta.
+
+`ler_abas` é um leitor de abas em fluxo (sem o openpyxl, sem estilos):
+percorre o XML de cada aba uma vez, resolve o cabeçalho normalizado na
+primeira linha e converte só as células das colunas pedidas, com as mesmas
+regras de tipo do `pd.read_excel` (datas pelo formato numérico da célula,
+números inteiros como int, mesmo parser de texto do pandas no fim). Com
+`ultimas`, guarda só as últimas linhas com dados de cada aba. Com
+`processos` > 1 e abas grandes o bastante, as abas são lidas em paralelo
+num pool de processos (a leitura é CPU-bound e presa ao GIL): as strings
+compartilhadas e os estilos são lidos uma vez e entregues a cada processo
+na criação do pool, e cada processo abre o zip e lê só as suas abas.
+"""
+import collections
+import hashlib
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL_DOC = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_REL_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+WORKBOOK = "xl/workbook.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+SHARED_STRINGS = "xl/sharedStrings.xml"
+STYLES = "xl/styles.xml"
+
+# XML de abas (descompactado) a partir do qual compensa abrir processos
+LIMIAR_PARALELO = 4 * 1024 * 1024
+
+# célula do tipo string compartilhada: <c r="A1" s="3" t="s"><v>12</v></c>
+_REF_STRING = re.compile(rb'(<c\b[^>]*\bt="s"[^>]*>\s*<v>)(\d+)(</v>)')
+_REF_ESTILO = re.compile(rb'(<c\b[^>]*?\bs=")(\d+)(")')
+_SHEET_DATA = re.compile(rb"<sheetData\s*/>|<sheetData\b[^>]*>.*?</sheetData>", re.DOTALL)
+
+
+def _caminho_parte(alvo):
+    if alvo.startswith("/"):
+        return alvo.lstrip("/")
+    return posixpath.normpath(posixpath.join("xl", alvo))
+
+
+def mapa_abas(zf):
+    """Retorna [(nome da aba, parte do zip)] na ordem da pasta de trabalho."""
+    rels = ET.fromstring(zf.read(WORKBOOK_RELS))
+    alvos = {r.get("Id"): _caminho_parte(r.get("Target")) for r in rels.iter(f"{NS_REL_PKG}Relationship")}
+
+    workbook = ET.fromstring(zf.read(WORKBOOK))
+    return [
+        (aba.get("name"), alvos[aba.get(f"{NS_REL_DOC}id")])
+        for aba in workbook.iter(f"{NS_MAIN}sheet")
+    ]
+
+
+def strings_compartilhadas(zf):
+    if SHARED_STRINGS not in zf.namelist():
+        return []
+    raiz = ET.fromstring(zf.read(SHARED_STRINGS))
+    return ["".join(t.text or "" for t in si.iter(f"{NS_MAIN}t")) for si in raiz.iter(f"{NS_MAIN}si")]
+
+
+def formatos_celula(zf):
+    """Retorna, para cada índice de estilo de célula, o seu formato numérico."""
+    if STYLES not in zf.namelist():
+        return []
+    raiz = ET.fromstring(zf.read(STYLES))
+    codigos = {f.get("numFmtId"): f.get("formatCode") for f in raiz.iter(f"{NS_MAIN}numFmt")}
+    cell_xfs = raiz.find(f"{NS_MAIN}cellXfs")
+    if cell_xfs is None:
+        return []
+    formatos = []
+    for xf in cell_xfs:
+        id_formato = xf.get("numFmtId", "0")
+        formatos.append(codigos.get(id_formato, id_formato))
+    return formatos
+
+
+def hashes_abas(caminho):
+    """Retorna {aba: hash} na ordem da pasta de trabalho."""
+    with zipfile.ZipFile(caminho) as zf:
+        strings = [t.encode("utf-8") for t in strings_compartilhadas(zf)]
+        formatos = [f.encode("utf-8") for f in formatos_celula(zf)]
+
+        hashes = {}
+        for nome, parte in mapa_abas(zf):
+            celulas = _SHEET_DATA.search(zf.read(parte))
+            xml = celulas.group(0) if celulas else b""
+            xml = _REF_STRING.sub(lambda m: m.group(1) + b"\x00" + strings[int(m.group(2))] + m.group(3), xml)
+            xml = _REF_ESTILO.sub(lambda m: m.group(1) + b"\x00" + formatos[int(m.group(2))] + m.group(3), xml)
+            hashes[nome] = hashlib.sha256(xml).hexdigest()
+    return hashes
+
+
+# --- LEITURA EM FLUXO ---
+_ROW = f"{NS_MAIN}row"
+_C = f"{NS_MAIN}c"
+_V = f"{NS_MAIN}v"
+_IS = f"{NS_MAIN}is"
+_T = f"{NS_MAIN}t"
+_R = f"{NS_MAIN}r"
+
+
+def _texto(si):
+    # como o openpyxl: o <t> direto ou os <t> dos trechos formatados (sem a fonética)
+    t = si.find(_T)
+    if t is not None:
+        return t.text or ""
+    return "".join(r.findtext(_T) or "" for r in si.iter(_R))
+
+
+def _strings(zf):
+    if SHARED_STRINGS not in zf.namelist():
+        return []
+    with zf.open(SHARED_STRINGS) as fonte:
+        return [_texto(si) for _, si in ET.iterparse(fonte) if si.tag == f"{NS_MAIN}si"]
+
+
+def _estilos_data(zf):
+    """(índices de estilo de data, índices de estilo de duração)."""
+    datas, duracoes = set(), set()
+    for i, formato in enumerate(formatos_celula(zf)):
+        if formato.isdigit():
+            formato = BUILTIN_FORMATS.get(int(formato))
+        if formato and is_date_format(formato):
+            datas.add(i)
+            if is_timedelta_format(formato):
+                duracoes.add(i)
+    return datas, duracoes
+
+
+def _epoca(zf):
+    propriedades = ET.fromstring(zf.read(WORKBOOK)).find(f"{NS_MAIN}workbookPr")
+    data1904 = propriedades is not None and propriedades.get("date1904") in ("1", "true")
+    return CALENDAR_MAC_1904 if data1904 else CALENDAR_WINDOWS_1900
+
+
+def _indice_coluna(referencia):
+    n = 0
+    for letra in referencia:
+        if letra.isdigit():
+            break
+        n = n * 26 + ord(letra) - 64
+    return n - 1
+
+
+def _numero(texto):
+    if "." in texto or "E" in texto or "e" in texto:
+        return float(texto)
+    return int(texto)
+
+
+class _Conversor:
+    """Valor de uma célula <c> como o `pd.read_excel` (motor openpyxl) o veria."""
+
+    def __init__(self, zf):
+        self.strings = _strings(zf)
+        self.datas, self.duracoes = _estilos_data(zf)
+        self.epoca = _epoca(zf)
+
+    def vazia(self, c):
+        tipo = c.get("t")
+        if tipo == "inlineStr":
+            return not "".join(c.find(_IS).itertext()) if c.find(_IS) is not None else True
+        v = c.findtext(_V)
+        if not v:
+            return True
+        return tipo == "s" and self.strings[int(v)] == ""
+
+    def valor(self, c):
+        tipo = c.get("t", "n")
+        if tipo == "inlineStr":
+            texto = "".join(c.find(_IS).itertext()) if c.find(_IS) is not None else ""
+            return texto
+        v = c.findtext(_V)
+        if not v:
+            return ""
+        if tipo == "n":
+            numero = _numero(v)
+            estilo = int(c.get("s", 0))
+            if estilo in self.datas:
+                try:
+                    return from_excel(numero, self.epoca, timedelta=estilo in self.duracoes)
+                except (OverflowError, ValueError):
+                    return np.nan
+            # o pandas lê 3.0 como 3
+            return int(numero) if int(numero) == numero else float(numero)
+        if tipo == "s":
+            return self.strings[int(v)]
+        if tipo == "b":
+            return bool(int(v))
+        if tipo == "e":
+            return np.nan
+        if tipo == "d":
+            return pd.Timestamp(v).to_pydatetime()
+        return v
+
+
+def _linhas(fonte):
+    """(número da linha, [células <c>]) de cada <row>, liberando o XML já lido."""
+    for _, elemento in ET.iterparse(fonte):
+        if elemento.tag == _ROW:
+            yield int(elemento.get("r", 0)), list(elemento.iter(_C))
+            elemento.clear()
+
+
+def _celulas(celulas):
+    contador = -1
+    for c in celulas:
+        contador = _indice_coluna(c.get("r")) if c.get("r") else contador + 1
+        yield contador, c
+
+
+def _ler_aba(fonte, conversor, colunas=None, ultimas=None):
+    # como no pd.read_excel: o cabeçalho é a linha 1, linhas em branco no meio
+    # viram linhas vazias e as em branco no fim são descartadas
+    cabecalho = {}
+    posicoes = None          # posições (a partir da coluna A) a materializar
+    linhas = collections.deque(maxlen=ultimas) if ultimas else []
+    largura = 0
+    ultima_com_dados = 0
+    anterior = 0
+
+    for numero, celulas in _linhas(fonte):
+        numero = numero or anterior + 1
+        anterior = numero
+        if numero == 1:
+            cabecalho = {i: conversor.valor(c) for i, c in _celulas(celulas)}
+            if any(v != "" for v in cabecalho.values()):
+                ultima_com_dados = 1
+            continue
+        if posicoes is None and colunas is not None:
+            posicoes = [i for i, nome in sorted(cabecalho.items()) if str(nome).strip().upper() in colunas]
+
+        valores, com_dados = {}, False
+        for i, c in _celulas(celulas):
+            if colunas is None or i in posicoes:
+                valor = conversor.valor(c)
+                if valor != "":
+                    valores[i] = valor
+                    com_dados = True
+            elif not com_dados and not conversor.vazia(c):
+                com_dados = True
+        if com_dados:
+            ultima_com_dados = numero
+            if valores and colunas is None:
+                largura = max(largura, max(valores) + 1)
+            linhas.append((numero, valores))
+
+    if ultima_com_dados == 0:
+        return pd.DataFrame()
+    if colunas is None:
+        preenchidas = [i for i, v in cabecalho.items() if v != ""]
+        posicoes = list(range(max(largura, max(preenchidas, default=-1) + 1)))
+    elif posicoes is None:
+        posicoes = [i for i, nome in sorted(cabecalho.items()) if str(nome).strip().upper() in colunas]
+
+    dados = [[cabecalho.get(i, "") for i in posicoes]]
+    vazia = [""] * len(posicoes)
+    esperada = linhas[0][0] if ultimas and linhas else 2
+    for numero, valores in linhas:
+        # linhas sem dados (ausentes do XML ou em branco) entre as lidas
+        dados.extend([vazia] * (numero - esperada))
+        dados.append([valores.get(i, "") for i in posicoes])
+        esperada = numero + 1
+
+    try:
+        return TextParser(dados, header=0, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+# --- LEITURA EM PARALELO ---
+_conversor_processo = None
+
+
+def _iniciar_processo(conversor):
+    global _conversor_processo
+    _conversor_processo = conversor
+
+
+def _ler_aba_processo(caminho, parte, colunas, ultimas):
+    with zipfile.ZipFile(caminho) as zf, zf.open(parte) as fonte:
+        return _ler_aba(fonte, _conversor_processo, colunas, ultimas)
+
+
+def ler_abas(caminho, abas=None, colunas=None, ultimas=None, processos=1):
+    """Lê as abas em fluxo e retorna {aba: DataFrame}, como `pd.read_excel(sheet_name=...)`.
+
+    `colunas` é {aba: nomes normalizados (sem espaços nas pontas, em
+    maiúsculas)} das colunas a materializar; abas fora dele (ou com None)
+    vêm com todas as colunas. Com `ultimas` (um número para todas as abas
+    ou {aba: número}), a aba traz só as últimas linhas com dados. Com
+    `processos` > 1, abas grandes são lidas em paralelo; o resultado é o
+    mesmo da leitura serial.
+    """
+    colunas = colunas or {}
+    with zipfile.ZipFile(caminho) as zf:
+        conversor = _Conversor(zf)
+        tarefas = []
+        for nome, parte in mapa_abas(zf):
+            if abas is not None and nome not in abas:
+                continue
+            pedidas = colunas.get(nome)
+            n = ultimas.get(nome) if isinstance(ultimas, dict) else ultimas
+            tarefas.append((nome, parte, set(pedidas) if pedidas else None, n, zf.getinfo(parte).file_size))
+
+        if processos <= 1 or len(tarefas) < 2 or sum(t[-1] for t in tarefas) < LIMIAR_PARALELO:
+            saida = {}
+            for nome, parte, pedidas, n, _ in tarefas:
+                with zf.open(parte) as fonte:
+                    saida[nome] = _ler_aba(fonte, conversor, pedidas, n)
+            return saida
+
+    # as maiores primeiro: o tempo total fica perto do da maior aba
+    por_tamanho = sorted(tarefas, key=lambda t: -t[-1])
+    with ProcessPoolExecutor(
+        max_workers=min(processos, len(tarefas)), initializer=_iniciar_processo, initargs=(conversor,)
+    ) as pool:
+        futuros = {
+            nome: pool.submit(_ler_aba_processo, caminho, parte, pedidas, n)
+            for nome, parte, pedidas, n, _ in por_tamanho
+        }
+        return {nome: futuros[nome].result() for nome, *_ in tarefas}
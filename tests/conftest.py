@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+SEMANAS = ["2025.01", "2025.02", "2025.03", "2025.04", "2025.05", "2025.06"]
+DATAS = pd.date_range("2024-12-30", periods=len(SEMANAS), freq="7D")
+
+
+def abas_exemplo(saldo_final=5.0, tempo_final=6.0):
+    """Abas mínimas para o histórico e a carteira (um indicador e a CARTEIRA)."""
+    return {
+        "TEMPO DE PLANEJAMENTO": pd.DataFrame({
+            "SEMANA": SEMANAS, "DATA": DATAS,
+            "TEMPO DE PLANEJAMENTO": [8.0, 9.0, 12.0, 7.0, 11.0, tempo_final], "META": 10.0,
+        }),
+        "CARTEIRA PLANEJAMENTO CAL COM": pd.DataFrame({
+            "SEMANA": SEMANAS, "DATA": DATAS, "SALDO EE": [10.0, 5.0, -8.0, 3.0, -4.0, saldo_final],
+        }),
+    }
+
+
+def gravar_planilha(caminho, abas):
+    """Grava as abas com o pandas e avança o mtime (a troca é vista como nova versão)."""
+    antes = os.stat(caminho).st_mtime_ns if os.path.exists(caminho) else 0
+    with pd.ExcelWriter(caminho) as escritor:
+        for nome, df in abas.items():
+            df.to_excel(escritor, sheet_name=nome, index=False)
+    os.utime(caminho, ns=(antes + 10**9, antes + 10**9))
+
+
+@pytest.fixture
+def planilha(tmp_path, monkeypatch):
+    """Caminho de uma planilha de exemplo, com o snapshot dentro de tmp_path.
+
+    A recarga em segundo plano não dispara sozinha: o teste chama `dados._atualizar`.
+    """
+    from recap import dados
+
+    monkeypatch.setenv("RECAP_SNAPSHOT_DIR", str(tmp_path / ".snapshot"))
+    monkeypatch.setattr(dados, "INTERVALO_VIGIA", 0)
+    monkeypatch.setattr(dados, "_ao_recarregar", [])
+    monkeypatch.setattr(dados, "agendar_atualizacao", lambda caminho: None)
+    caminho = str(tmp_path / "historico.xlsx")
+    gravar_planilha(caminho, abas_exemplo())
+    return caminho
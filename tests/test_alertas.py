@@ -0,0 +1,52 @@
+import pandas as pd
+
+from recap.alertas import REPETIR, avaliar_mudancas
+from recap.status import avaliar_historico
+from tests.conftest import abas_exemplo
+
+ABA = "TEMPO DE PLANEJAMENTO"  # menor é melhor, meta 10
+
+
+def _historico(*novos):
+    """Histórico avaliado do exemplo com as semanas 2025.07, 2025.08... valendo `novos`."""
+    df = abas_exemplo()[ABA]
+    extra = pd.DataFrame({
+        "SEMANA": [f"2025.{7 + i:02d}" for i in range(len(novos))],
+        "DATA": pd.date_range(df["DATA"].iloc[-1] + pd.Timedelta(days=7), periods=len(novos), freq="7D"),
+        ABA: list(novos), "META": 10.0,
+    })
+    return avaliar_historico({ABA: pd.concat([df, extra], ignore_index=True)})
+
+
+def _rodar(estado, *novos, agora=0.0):
+    return avaliar_mudancas(_historico(*novos), {ABA: str(novos)}, estado, "historico.xlsx", agora)
+
+
+def test_primeira_execucao_so_monta_a_base():
+    # o exemplo já tem semanas fora da meta, mas sem estado não há com o que comparar
+    alertas, estado = _rodar(None)
+    assert alertas == []
+    assert len(estado["abas"][ABA]["linhas"]) == 6
+
+
+def test_violacao_nova_alerta_uma_vez():
+    _, estado = _rodar(None)
+    alertas, estado = _rodar(estado, 15.0)
+    assert [(a["tipo"], a["semana"]) for a in alertas] == [("violacao", "2025.07")]
+
+    # mesma versão de novo: nada a olhar
+    assert _rodar(estado, 15.0, agora=60.0)[0] == []
+    # outra semana fora com o alerta ainda aberto: suprimido
+    alertas, estado = _rodar(estado, 15.0, 14.0, agora=120.0)
+    assert alertas == []
+    # de volta à meta: um aviso de normalização
+    alertas, estado = _rodar(estado, 15.0, 14.0, 6.0, agora=180.0)
+    assert [(a["tipo"], a["semana"]) for a in alertas] == [("normalizado", "2025.09")]
+    assert estado["abertos"] == {}
+
+
+def test_alerta_aberto_repete_depois_do_intervalo():
+    _, estado = _rodar(None)
+    _, estado = _rodar(estado, 15.0)
+    alertas, _ = _rodar(estado, 15.0, 14.0, agora=REPETIR + 1)
+    assert [(a["tipo"], a["semana"]) for a in alertas] == [("violacao", "2025.08")]
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from recap import banco, dados
+from tests.conftest import abas_exemplo, gravar_planilha
+
+ABA = "CARTEIRA PLANEJAMENTO CAL COM"
+
+
+def test_ingerir_e_ler_de_volta(planilha, tmp_path):
+    caminho = str(tmp_path / "historico.sqlite")
+    assert banco.ingerir(planilha, caminho) == {ABA: (6, 0), "TEMPO DE PLANEJAMENTO": (6, 0)}
+
+    lidas = banco.ler_abas(caminho)
+    for aba, df in dados.carregar_planilha(planilha).items():
+        pd.testing.assert_frame_equal(lidas[aba], df[list(lidas[aba].columns)], check_dtype=False)
+
+
+def test_reingestao_grava_so_o_que_mudou(planilha, tmp_path):
+    caminho = str(tmp_path / "historico.sqlite")
+    banco.ingerir(planilha, caminho)
+    assert banco.ingerir(planilha, caminho) == {}
+
+    gravar_planilha(planilha, abas_exemplo(saldo_final=500.0))
+    dados._atualizar(planilha)
+    assert banco.ingerir(planilha, caminho) == {ABA: (0, 1)}
+    assert banco.ler_abas(caminho, [ABA])[ABA]["SALDO EE"].iloc[-1] == 500.0
+    # a versão sobrescrita continua nas revisões
+    assert len(banco.revisoes(ABA, "2025.06", caminho)) == 2
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from recap.carteira import consultar, montar_indice
+
+
+def test_coluna_mista_numeros_e_texto():
+    df = pd.DataFrame({"A": [3, 1, 2, 4], "B": [10, "abc", None, 2]})
+    indice = montar_indice(df)
+
+    # números em ordem numérica, depois o texto, vazios no fim
+    assert indice["ordens"]["B"].tolist() == [3, 0, 1, 2]
+
+    linhas, total = consultar(indice, coluna="B", decrescente=True)
+    assert total == 4
+    # decrescente: texto, depois números do maior ao menor; o vazio continua no fim
+    assert linhas["A"].tolist() == [1, 3, 4, 2]
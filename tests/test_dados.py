@@ -0,0 +1,33 @@
+from recap import dados, envelhecimento
+from tests.conftest import abas_exemplo, gravar_planilha
+
+
+def _soma_saldo(abas):
+    return float(abas["CARTEIRA PLANEJAMENTO CAL COM"]["SALDO EE"].sum())
+
+
+def _valores(caminho):
+    return {
+        "soma": dados.derivado("teste:soma", _soma_saldo, caminho),
+        "carteira": envelhecimento.envelhecimento(caminho)["faixas"]["carteira"].tolist(),
+        "ultimo": dados.indice_kpi(caminho)["indicadores"]["TEMPO DE PLANEJAMENTO"]["valor"],
+    }
+
+
+def test_versao_anterior_servida_ate_a_troca(planilha):
+    v1 = _valores(planilha)
+    versao1 = dados.versao(planilha)
+
+    gravar_planilha(planilha, abas_exemplo(saldo_final=500.0, tempo_final=20.0))
+    # stale-while-revalidate: até a nova versão ficar pronta, sai a anterior
+    assert _valores(planilha) == v1
+    assert dados.versao(planilha) == versao1
+
+    dados._atualizar(planilha)
+    assert dados.versao(planilha) != versao1
+    quente = _valores(planilha)
+    assert quente != v1
+
+    # os derivados refeitos na recarga batem com uma carga a frio da nova versão
+    dados._cache.clear()
+    assert _valores(planilha) == quente
@@ -0,0 +1,34 @@
+import numpy as np
+
+from recap import dados, envelhecimento
+from tests.conftest import abas_exemplo, gravar_planilha
+
+
+def test_restantes_baixa_as_coortes_mais_antigas_primeiro():
+    resto, carteira = envelhecimento.restantes([10, 5, -8, 3])
+    np.testing.assert_allclose(carteira, [10, 15, 7, 10])
+    # a saída de 8 consome só a primeira coorte (10 -> 2)
+    np.testing.assert_allclose(resto[2], [2, 5, 0, 0])
+    np.testing.assert_allclose(resto[3], [2, 5, 0, 3])
+
+
+def test_carteira_com_piso_em_zero():
+    resto, carteira = envelhecimento.restantes([4, -10, 6])
+    np.testing.assert_allclose(carteira, [4, 0, 6])
+    np.testing.assert_allclose(resto[1], [0, 0, 0])
+    np.testing.assert_allclose(resto[2], [0, 0, 6])
+
+
+def test_figura_refeita_na_recarga_em_segundo_plano(planilha):
+    faixas = envelhecimento.envelhecimento(planilha)["faixas"]
+    antes = envelhecimento.figura(planilha)
+    assert faixas["carteira"].iloc[-1] == 11.0
+
+    gravar_planilha(planilha, abas_exemplo(saldo_final=500.0))
+    dados._atualizar(planilha)
+
+    depois = envelhecimento.figura(planilha)
+    assert depois is not antes
+    assert envelhecimento.envelhecimento(planilha)["faixas"]["carteira"].iloc[-1] == 506.0
+    total = sum(traco.y[-1] for traco in depois.data if traco.type == "bar")
+    assert total == 506.0
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from recap.kpis import ultimo_valido
+
+
+def test_ultimo_valido_ignora_linhas_sem_valor_ou_meta():
+    df = pd.DataFrame({
+        "SEMANA": ["2025.03", "2025.01", "2025.02", "2025.04", "2025.05"],
+        "VALOR": [7.0, 5.0, 6.0, np.nan, 9.0],
+        "META": [10.0, 10.0, 10.0, 10.0, np.nan],
+    })
+    kpi = ultimo_valido(df, "VALOR", "META")
+    # ordenado pela semana, não pela posição na aba
+    assert kpi == {"valor": 7.0, "meta": 10.0, "semana": "2025.03", "semana_id": 202503, "anterior": 6.0}
+
+
+def test_ultimo_valido_sem_linhas_validas():
+    df = pd.DataFrame({"SEMANA": ["2025.01"], "VALOR": [np.nan], "META": [10.0]})
+    assert ultimo_valido(df, "VALOR", "META") is None
+
+
+def test_ultimo_valido_sem_anterior():
+    df = pd.DataFrame({"SEMANA": ["2025.01"], "VALOR": [4.0], "META": [10.0]})
+    assert ultimo_valido(df, "VALOR", "META")["anterior"] is None
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from recap.projecoes import CAMPOS, controle_series
+
+
+def _historico(n, semente):
+    rng = np.random.default_rng(semente)
+    valores = rng.normal(10, 2, n)
+    valores[3::14] = np.nan  # buracos na série
+    return pd.DataFrame({"valor": valores, "data": pd.date_range("2024-01-01", periods=n, freq="7D")})
+
+
+def _comparar(obtido, esperado):
+    assert obtido.keys() == esperado.keys()
+    for aba in esperado:
+        assert len(obtido[aba]) == len(esperado[aba])
+        for campo in ["valor", *CAMPOS]:
+            np.testing.assert_allclose(
+                obtido[aba][campo].to_numpy(dtype=float), esperado[aba][campo].to_numpy(dtype=float),
+                rtol=1e-9, atol=1e-9, err_msg=f"{aba}.{campo}",
+            )
+
+
+def test_incremental_igual_ao_calculo_completo():
+    completo = {"A": _historico(40, 1), "B": _historico(25, 2), "C": _historico(12, 3)}
+    # versão anterior: semanas a menos no fim de A e B, C igual
+    antes = {"A": completo["A"].iloc[:30], "B": completo["B"].iloc[:24], "C": completo["C"]}
+    anteriores = controle_series(antes)
+
+    incremental = controle_series(completo, anteriores)
+    _comparar(incremental, controle_series(completo))
+    # a aba sem mudanças é reaproveitada como estava
+    assert incremental["C"] is anteriores["C"]
+
+
+def test_linha_antiga_alterada_recalcula_a_serie():
+    antes = {"A": _historico(30, 4)}
+    anteriores = controle_series(antes)
+    depois = {"A": antes["A"].copy()}
+    depois["A"].loc[5, "valor"] = 50.0
+    _comparar(controle_series(depois, anteriores), controle_series(depois))
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from recap.status import avaliar, indice_semanas, normalizar
+
+
+def test_normalizar_percentual_em_fracao():
+    valores = normalizar([0.95, 1.5, 1.51, 97.0, np.nan], True)
+    # até 1,5 é fração; acima disso já está em 0–100
+    np.testing.assert_allclose(valores, [95.0, 150.0, 1.51, 97.0, np.nan])
+
+
+def test_normalizar_so_percentuais():
+    np.testing.assert_allclose(normalizar([0.5, 1.5], False), [0.5, 1.5])
+    np.testing.assert_allclose(normalizar([0.5, 0.5], np.array([True, False])), [50.0, 0.5])
+
+
+def test_avaliar_maior_e_menor():
+    r = avaliar(
+        valores=[0.9, 96.0, 12.0, np.nan],
+        metas=[0.95, 0.95, 10.0, 10.0],
+        maior=np.array([True, True, False, False]),
+        percentual=np.array([True, True, False, False]),
+        unidades=np.array(["%", "%", " dias", " dias"]),
+        casas=1, casas_meta=0,
+    )
+    assert r["valido"].tolist() == [True, True, True, False]
+    assert r["ok"].tolist() == [False, True, False, False]
+    assert r["valor_fmt"].tolist() == ["90.0%", "96.0%", "12.0 dias", "–"]
+    assert r["meta_fmt"].tolist() == ["95%", "95%", "10 dias", "10 dias"]
+
+
+def test_indice_semanas_formatos():
+    chaves = indice_semanas(["2025.1", "2025.01", "2025.10", "9/2025", "2025-W09", " 2024.52 ", "abc", None])
+    assert chaves.tolist()[:6] == [202510, 202501, 202510, 202509, 202509, 202452]
+    assert chaves.iloc[6:].isna().all()
+
+
+def test_indice_semanas_recorre_a_data():
+    datas = pd.to_datetime(["2025-03-03", "2025-03-10"])
+    assert indice_semanas(["x", "2025.02"], datas).tolist() == [202510, 202502]
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from recap import xlsx
+
+
+def test_ler_abas_igual_ao_read_excel(planilha):
+    esperado = pd.read_excel(planilha, sheet_name=None)
+    lido = xlsx.ler_abas(planilha)
+    assert list(lido) == list(esperado)
+    for aba, df in esperado.items():
+        pd.testing.assert_frame_equal(lido[aba], df)
+
+
+def test_ler_abas_colunas_e_ultimas(planilha):
+    aba = "CARTEIRA PLANEJAMENTO CAL COM"
+    lido = xlsx.ler_abas(planilha, abas=[aba], colunas={aba: ["SEMANA", "SALDO EE"]}, ultimas=2)
+    esperado = pd.read_excel(planilha, sheet_name=aba, usecols=["SEMANA", "SALDO EE"]).tail(2)
+    pd.testing.assert_frame_equal(lido[aba], esperado.reset_index(drop=True))
+
+
+def test_leitura_paralela_igual_a_serial(planilha, monkeypatch):
+    monkeypatch.setattr(xlsx, "LIMIAR_PARALELO", 0)
+    paralela = xlsx.ler_abas(planilha, processos=2)
+    serial = xlsx.ler_abas(planilha)
+    assert list(paralela) == list(serial)
+    for aba, df in serial.items():
+        pd.testing.assert_frame_equal(paralela[aba], df)